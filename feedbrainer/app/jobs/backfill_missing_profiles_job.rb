@@ -8,10 +8,25 @@ class BackfillMissingProfilesJob < ApplicationJob
                     .limit(100)
     
     if sources.any?
-      Rails.logger.info("BackfillMissingProfilesJob: Found #{sources.count} sources with missing profiles. Enqueueing sync jobs.")
-      
-      sources.each do |source|
-        SyncSourceProfileJob.perform_later(source.id)
+      Rails.logger.info("BackfillMissingProfilesJob: Found #{sources.count} sources with missing profiles. Fetching in one batch.")
+
+      result = SkytorchClient.get_profiles(sources.map(&:atproto_did))
+      if result[:success]
+        updated = 0
+        sources.each do |source|
+          profile = result[:profiles][source.atproto_did]
+          next if profile.blank?
+
+          source.update!(profile: profile)
+          updated += 1
+        end
+        Rails.logger.info("BackfillMissingProfilesJob: Updated #{updated} profiles; #{result[:missing].length} not found or failed.")
+      else
+        # Fall back to per-source jobs, which retry on their own
+        Rails.logger.error("BackfillMissingProfilesJob: Batch profile fetch failed: #{result[:error]}. Enqueueing sync jobs.")
+        sources.each do |source|
+          SyncSourceProfileJob.perform_later(source.id)
+        end
       end
     else
       Rails.logger.info("BackfillMissingProfilesJob: No missing profiles found.")
@@ -1,6 +1,20 @@
 class ProcessArticleEmbeddingsJob < ApplicationJob
   queue_as :default
 
+  # Raised when skytorch fails, so the job is retried with the article's old data intact
+  class AnalysisError < StandardError; end
+
+  retry_on AnalysisError, wait: :exponentially_longer, attempts: 5
+
+  REDIS_LOCK = Mutex.new
+
+  # One connection per process, shared by all job threads (the client is thread-safe)
+  def self.redis
+    REDIS_LOCK.synchronize do
+      @redis ||= Redis.new(url: ENV.fetch("REDIS_URL", "redis://redis:6379/0"))
+    end
+  end
+
   def perform(article_id)
     article = Article.find(article_id)
 
@@ -13,41 +27,43 @@ class ProcessArticleEmbeddingsJob < ApplicationJob
       return
     end
 
-    # Ensure idempotency by clearing existing data
-    article.article_chunks.destroy_all
-    article.article_entities.destroy_all
-
-    # Step 2: Chunk the cleaned text
-    chunks = ArticleChunkingService.call(cleaned_text)
-    if chunks.empty?
-      Rails.logger.warn("No chunks created for article #{article_id}")
+    # With a stream configured, skytorch's embed worker chunks and embeds
+    # cleaned_text in large batches; only entities are extracted here
+    if embed_stream.present?
+      enqueue_stream_embedding(article)
       return
     end
 
-    # Step 3: Generate embeddings for each chunk and store
+    # Step 2: Chunk, embed and extract entities in a single skytorch call.
+    # Existing chunks and entities stay until it succeeds.
     model_version = "all-MiniLM-L6-v2"
-    chunks.each do |chunk_data|
-      embedding_result = SkytorchClient.generate_embedding(chunk_data[:text], model_name: model_version)
+    analysis = SkytorchClient.analyze_article(cleaned_text, model_name: model_version)
+    raise AnalysisError, "Failed to analyze article #{article_id}: #{analysis[:error]}" unless analysis[:success]
+
+    chunks = analysis[:chunks]
+    Rails.logger.warn("No chunks created for article #{article_id}") if chunks.empty?
+
+    # Step 3: Replace chunks and entities together, so a failure keeps the old ones
+    ActiveRecord::Base.transaction do
+      article.article_chunks.destroy_all
+      article.article_entities.destroy_all
 
-      if embedding_result[:success]
+      chunks.each do |chunk_data|
         ArticleChunk.create!(
           article: article,
-          chunk_index: chunk_data[:chunk_index],
-          text: chunk_data[:text],
-          embedding_vector: embedding_result[:embedding],
-          embedding_version: embedding_result[:model_version],
-          token_count: chunk_data[:token_count],
-          checksum: chunk_data[:checksum]
+          chunk_index: chunk_data["chunk_index"],
+          text: chunk_data["text"],
+          embedding_vector: chunk_data["embedding"],
+          embedding_version: analysis[:model_version],
+          token_count: chunk_data["token_count"],
+          checksum: chunk_data["checksum"]
         )
-      else
-        Rails.logger.error("Failed to generate embedding for chunk #{chunk_data[:chunk_index]} of article #{article_id}: #{embedding_result[:error]}")
       end
+
+      store_entities(article, analysis[:entities])
     end
 
     Rails.logger.info("Processed #{chunks.size} chunks for article #{article_id}")
-
-    # Step 4: Extract entities and store
-    extract_and_store_entities(article, cleaned_text)
   rescue ActiveRecord::RecordNotFound => e
     Rails.logger.error("Article #{article_id} not found: #{e.message}")
   rescue => e
@@ -58,16 +74,27 @@ class ProcessArticleEmbeddingsJob < ApplicationJob
 
   private
 
-  def extract_and_store_entities(article, cleaned_text)
-    entities_result = SkytorchClient.extract_entities(cleaned_text)
+  def embed_stream
+    ENV["SKYTORCH_EMBED_STREAM"]
+  end
+
+  def enqueue_stream_embedding(article)
+    entities = SkytorchClient.extract_entities(article.cleaned_text)
+    raise AnalysisError, "Failed to extract entities for article #{article.id}: #{entities[:error]}" unless entities[:success]
 
-    unless entities_result[:success]
-      Rails.logger.error("Failed to extract entities for article #{article.id}: #{entities_result[:error]}")
-      return
+    # The worker re-chunks articles that have no chunk rows
+    ActiveRecord::Base.transaction do
+      article.article_chunks.destroy_all
+      article.article_entities.destroy_all
+      store_entities(article, entities[:entities])
     end
 
-    entities = entities_result[:entities] || []
-    return if entities.empty?
+    self.class.redis.xadd(embed_stream, { article_id: article.id })
+    Rails.logger.info("Queued article #{article.id} on #{embed_stream} for embedding")
+  end
+
+  def store_entities(article, entities)
+    return if entities.blank?
 
     # Group entities by name and type to calculate frequency
     entity_groups = entities.group_by { |e| [e["text"], e["label"]] }
@@ -1,6 +1,7 @@
 require "net/http"
 require "uri"
 require "json"
+require "base64"
 
 class SkytorchClient
   def self.generate_embedding(text, model_name: "all-MiniLM-L6-v2")
@@ -11,6 +12,10 @@ class SkytorchClient
     new.extract_entities(text)
   end
 
+  def self.analyze_article(text, model_name: "all-MiniLM-L6-v2")
+    new.analyze_article(text, model_name: model_name)
+  end
+
   def self.get_followers(did, limit: 100, cursor: nil)
     new.get_followers(did, limit: limit, cursor: cursor)
   end
@@ -19,10 +24,22 @@ class SkytorchClient
     new.get_follows(did, limit: limit, cursor: cursor)
   end
 
+  def self.each_follow(did, cursor: nil, max_records: nil, &block)
+    new.each_follow(did, cursor: cursor, max_records: max_records, &block)
+  end
+
+  def self.each_follower(did, cursor: nil, max_records: nil, &block)
+    new.each_follower(did, cursor: cursor, max_records: max_records, &block)
+  end
+
   def self.get_profile(did)
     new.get_profile(did)
   end
 
+  def self.get_profiles(dids)
+    new.get_profiles(dids)
+  end
+
   def initialize
     @base_url = ENV.fetch("SKYTORCH_URL", "http://skytorch:5000")
   end
@@ -98,6 +115,47 @@ class SkytorchClient
     }
   end
 
+  # Chunks, embeds and extracts entities from cleaned article text in one call.
+  def analyze_article(text, model_name: "all-MiniLM-L6-v2")
+    uri = URI.parse("#{@base_url}/api/v1/articles/analyze?format=base64")
+    http = Net::HTTP.new(uri.host, uri.port)
+    http.open_timeout = 30
+    http.read_timeout = 120
+
+    request = Net::HTTP::Post.new(uri.request_uri)
+    request["Content-Type"] = "application/json"
+    request.body = {
+      text: text,
+      model_name: model_name
+    }.to_json
+
+    response = http.request(request)
+
+    if response.code.to_i >= 200 && response.code.to_i < 300
+      data = JSON.parse(response.body)
+      chunks = (data["chunks"] || []).map do |chunk|
+        chunk.merge("embedding" => decode_vector(chunk["embedding"], data["dtype"]))
+      end
+      {
+        success: true,
+        chunks: chunks,
+        entities: data["entities"] || [],
+        model_version: data["model_version"]
+      }
+    else
+      {
+        success: false,
+        error: "HTTP #{response.code}: #{response.body}"
+      }
+    end
+  rescue => e
+    Rails.logger.error("SkytorchClient.analyze_article error: #{e.message}")
+    {
+      success: false,
+      error: e.message
+    }
+  end
+
   def get_followers(did, limit: 100, cursor: nil)
     params = { did: did, limit: limit }
     params[:cursor] = cursor if cursor
@@ -172,6 +230,19 @@ class SkytorchClient
     }
   end
 
+  # Streams every profile the user follows, yielding each profile hash as it
+  # arrives. Returns the crawl summary: count, resume cursor and whether the
+  # whole graph was read.
+  def each_follow(did, cursor: nil, max_records: nil, &block)
+    stream_graph("follows", did, cursor: cursor, max_records: max_records, &block)
+  end
+
+  # Streams every profile following the user, yielding each profile hash as
+  # it arrives. Returns the crawl summary like each_follow.
+  def each_follower(did, cursor: nil, max_records: nil, &block)
+    stream_graph("followers", did, cursor: cursor, max_records: max_records, &block)
+  end
+
   def get_profile(did)
     uri = URI.parse("#{@base_url}/api/v1/profile")
     uri.query = URI.encode_www_form({ did: did })
@@ -204,5 +275,120 @@ class SkytorchClient
       error: e.message
     }
   end
-end
 
+  # Looks up many profiles in one call. Returns profiles keyed by DID, plus
+  # the DIDs that had no profile.
+  def get_profiles(dids)
+    uri = URI.parse("#{@base_url}/api/v1/profiles")
+    http = Net::HTTP.new(uri.host, uri.port)
+    http.open_timeout = 30
+    http.read_timeout = 60
+
+    request = Net::HTTP::Post.new(uri.request_uri)
+    request["Content-Type"] = "application/json"
+    request.body = { dids: dids }.to_json
+
+    response = http.request(request)
+
+    if response.code.to_i >= 200 && response.code.to_i < 300
+      data = JSON.parse(response.body)
+      profiles = dids.zip(data["profiles"] || []).each_with_object({}) do |(did, profile), found|
+        found[did] = profile if profile
+      end
+      {
+        success: true,
+        profiles: profiles,
+        missing: data["missing"] || [],
+        errors: data["errors"] || {}
+      }
+    else
+      {
+        success: false,
+        error: "HTTP #{response.code}: #{response.body}"
+      }
+    end
+  rescue => e
+    Rails.logger.error("SkytorchClient.get_profiles error: #{e.message}")
+    {
+      success: false,
+      error: e.message
+    }
+  end
+
+  private
+
+  def stream_graph(direction, did, cursor: nil, max_records: nil)
+    params = { did: did }
+    params[:cursor] = cursor if cursor
+    params[:max_records] = max_records if max_records
+    uri = URI.parse("#{@base_url}/api/v1/#{direction}/all")
+    uri.query = URI.encode_www_form(params)
+
+    http = Net::HTTP.new(uri.host, uri.port)
+    http.open_timeout = 30
+    http.read_timeout = 60
+
+    request = Net::HTTP::Get.new(uri.request_uri)
+    request["Accept"] = "application/x-ndjson"
+
+    count = 0
+    resume_cursor = cursor
+    summary = nil
+    error = nil
+
+    http.request(request) do |response|
+      unless response.code.to_i >= 200 && response.code.to_i < 300
+        error = "HTTP #{response.code}: #{response.body}"
+        break
+      end
+
+      buffer = +""
+      response.read_body do |chunk|
+        buffer << chunk
+        while (newline = buffer.index("\n"))
+          line = buffer.slice!(0..newline).strip
+          next if line.empty?
+
+          record = JSON.parse(line)
+          if record.key?("summary")
+            summary = record["summary"]
+          elsif record.key?("cursor")
+            resume_cursor = record["cursor"]
+          else
+            yield record
+            count += 1
+          end
+        end
+      end
+    end
+
+    return { success: false, error: error, count: count, cursor: resume_cursor, complete: false } if error
+    # A stream cut off before its summary line is incomplete; resume from the last cursor
+    return { success: false, error: "Stream ended early", count: count, cursor: resume_cursor, complete: false } if summary.nil?
+
+    {
+      success: summary["error"].nil?,
+      error: summary["error"],
+      count: count,
+      cursor: summary["cursor"],
+      complete: summary["complete"]
+    }
+  rescue => e
+    Rails.logger.error("SkytorchClient.each_#{direction.chomp("s")} error: #{e.message}")
+    {
+      success: false,
+      error: e.message,
+      count: count || 0,
+      cursor: resume_cursor,
+      complete: false
+    }
+  end
+
+  # Decodes a base64 packed little-endian float32 vector into an array of floats.
+  def decode_vector(encoded, dtype)
+    return nil if encoded.nil?
+    raise ArgumentError, "Unsupported embedding dtype: #{dtype}" unless dtype == "float32"
+
+    Base64.strict_decode64(encoded).unpack("e*")
+  end
+end
@@ -14,44 +14,31 @@ class UserSyncService
   def sync_new_followers(open_news_did)
     Rails.logger.info("Starting sync of new followers for DID: #{open_news_did}")
     new_users_count = 0
-    cursor = nil
 
-    loop do
-      result = SkytorchClient.get_followers(open_news_did, limit: 100, cursor: cursor)
+    result = SkytorchClient.each_follower(open_news_did) do |follower|
+      did = follower["did"]
+      next if did.blank?
 
-      unless result[:success]
-        Rails.logger.error("Failed to fetch followers: #{result[:error]}")
-        break
-      end
-
-      followers = result[:data] || []
-      break if followers.empty?
-
-      # Create new users for DIDs not in database
-      followers.each do |follower|
-        did = follower["did"]
-        next if did.blank?
-
-        user = User.find_by(atproto_did: did)
-        
-        if user.nil?
-          # User doesn't exist, create it
-          profile_data = extract_profile_from_follower(follower)
-          user = User.create!(atproto_did: did, profile: profile_data)
-          Rails.logger.info("Created new user with DID: #{did}")
-          new_users_count += 1
-          # The after_create callback will enqueue SyncUserFollowsJob
-        else
-          # Update profile if we have new data
-          profile_data = extract_profile_from_follower(follower)
-          if profile_data.present?
-            user.update(profile: profile_data)
-          end
+      user = User.find_by(atproto_did: did)
+      
+      if user.nil?
+        # User doesn't exist, create it
+        profile_data = extract_profile_from_follower(follower)
+        user = User.create!(atproto_did: did, profile: profile_data)
+        Rails.logger.info("Created new user with DID: #{did}")
+        new_users_count += 1
+        # The after_create callback will enqueue SyncUserFollowsJob
+      else
+        # Update profile if we have new data
+        profile_data = extract_profile_from_follower(follower)
+        if profile_data.present?
+          user.update(profile: profile_data)
         end
       end
+    end
 
-      cursor = result[:cursor]
-      break if cursor.nil? || cursor.empty?
+    unless result[:success]
+      Rails.logger.error("Failed to fetch followers: #{result[:error]}")
     end
 
     Rails.logger.info("Sync complete. New users created: #{new_users_count}")
@@ -67,25 +54,12 @@ class UserSyncService
 
     Rails.logger.info("Starting sync of follows for user #{user.id} (DID: #{user.atproto_did})")
     
-    # Fetch all follows with pagination
+    # Fetch all follows in one streaming call
     all_follows = []
-    cursor = nil
-
-    loop do
-      result = SkytorchClient.get_follows(user.atproto_did, limit: 100, cursor: cursor)
-
-      unless result[:success]
-        Rails.logger.error("Failed to fetch follows for user #{user.id}: #{result[:error]}")
-        break
-      end
-
-      follows = result[:data] || []
-      break if follows.empty?
-
-      all_follows.concat(follows)
+    result = SkytorchClient.each_follow(user.atproto_did) { |follow| all_follows << follow }
 
-      cursor = result[:cursor]
-      break if cursor.nil? || cursor.empty?
+    unless result[:success]
+      Rails.logger.error("Failed to fetch follows for user #{user.id}: #{result[:error]}")
     end
 
     Rails.logger.info("Fetched #{all_follows.length} follows for user #{user.id}")
@@ -132,7 +106,9 @@ class UserSyncService
       Rails.logger.debug("Added follow: #{did}")
     end
 
-    # Remove UserSources for unfollowed accounts
+    # Remove UserSources for unfollowed accounts. A partial crawl can't tell
+    # unfollowed accounts from ones it didn't reach, so keep them until a full one.
+    sources_to_remove = Set.new unless result[:complete]
     if sources_to_remove.any?
       sources_to_remove_ids = Source.where(atproto_did: sources_to_remove.to_a).pluck(:id)
       user.user_sources.where(source_id: sources_to_remove_ids).destroy_all
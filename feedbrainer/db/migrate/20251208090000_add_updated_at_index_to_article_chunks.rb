@@ -0,0 +1,10 @@
+class AddUpdatedAtIndexToArticleChunks < ActiveRecord::Migration[8.0]
+  # Built concurrently so the large chunks table stays writable meanwhile
+  disable_ddl_transaction!
+
+  def change
+    # skytorch's vector index reads changes in (updated_at, id) keyset order
+    # and max(updated_at) on every refresh
+    add_index :article_chunks, [:updated_at, :id], algorithm: :concurrently
+  end
+end
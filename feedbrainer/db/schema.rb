@@ -10,7 +10,7 @@
 #
 # It's strongly recommended that you check this file into your version control system.
 
-ActiveRecord::Schema[8.0].define(version: 2025_12_07_200000) do
+ActiveRecord::Schema[8.0].define(version: 2025_12_08_090000) do
   # These are extensions that must be enabled in order to support this database
   enable_extension "pg_catalog.plpgsql"
   enable_extension "vector"
@@ -28,6 +28,7 @@ ActiveRecord::Schema[8.0].define(version: 2025_12_07_200000) do
     t.index ["article_id", "chunk_index"], name: "index_article_chunks_on_article_id_and_chunk_index", unique: true
     t.index ["article_id"], name: "index_article_chunks_on_article_id"
     t.index ["embedding_vector"], name: "index_article_chunks_on_embedding_vector", opclass: :vector_cosine_ops, using: :ivfflat
+    t.index ["updated_at", "id"], name: "index_article_chunks_on_updated_at_and_id"
   end
 
   create_table "article_entities", force: :cascade do |t|
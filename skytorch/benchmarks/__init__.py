@@ -0,0 +1,4 @@
+"""Offline benchmark suite for skytorch.
+
+Run ``python -m benchmarks --help`` from the skytorch directory.
+"""
@@ -0,0 +1,164 @@
+"""
+Run the offline benchmark suite, or compare results against a baseline.
+
+    python -m benchmarks run --output results.json
+    python -m benchmarks run --suite http --baseline baseline.json
+    python -m benchmarks run --suite vector --vector-rows 1000000
+    python -m benchmarks compare results.json baseline.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# Never reach for the Hugging Face hub: models must already be cached locally
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+from benchmarks.stats import compare, format_comparison, peak_rss_bytes  # noqa: E402
+
+logger = logging.getLogger("benchmarks")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _metadata(args) -> dict:
+    from skytorch.config import get_settings
+
+    settings = get_settings()
+    return {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "suite": args.suite,
+        "embedding_model": settings.embedding_model_name,
+        "embedding_backend": settings.embedding_backend,
+        "model_device": settings.model_device,
+        "model_precision": settings.model_precision,
+        "spacy_model": settings.spacy_model_name,
+        "inference_executor": settings.inference_executor,
+        "inference_max_workers": settings.inference_max_workers,
+    }
+
+
+def _compare_and_report(results: dict, baseline_path: str, threshold: float) -> int:
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, threshold)
+    print(format_comparison(rows), file=sys.stderr)
+    regressions = [row["name"] for row in rows if row["regressed"]]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def run(args) -> int:
+    from skytorch.config import get_settings
+
+    settings = get_settings()
+    results = {"meta": _metadata(args), "results": {}, "peak_rss_bytes": {}}
+
+    if args.suite in ("micro", "all"):
+        from benchmarks.micro import run_micro
+
+        results["results"].update(run_micro(
+            settings.spacy_model_name,
+            settings.embedding_model_name,
+            iterations=args.iterations,
+            batch_size=args.batch_size,
+        ))
+        results["peak_rss_bytes"]["micro"] = peak_rss_bytes()
+
+    if args.suite in ("http", "all"):
+        from benchmarks.http_load import run_http
+
+        http_results, server = run_http(
+            requests=args.requests,
+            concurrency=args.concurrency,
+            batch_size=args.batch_size,
+            atproto_latency_ms=args.atproto_latency_ms,
+            only=args.only,
+            workers=args.workers,
+        )
+        results["results"].update(http_results)
+        results["server"] = server
+        results["peak_rss_bytes"]["server"] = server["peak_rss_bytes"]
+
+    if args.suite in ("vector", "all"):
+        from benchmarks.vector_search import run_vector_search
+
+        results["results"].update(run_vector_search(
+            rows=args.vector_rows,
+            dim=args.vector_dim,
+            queries=args.vector_queries,
+            k=args.vector_k,
+        ))
+        results["peak_rss_bytes"]["vector"] = peak_rss_bytes()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        logger.info(f"Wrote results to {args.output}")
+    else:
+        print(output)
+
+    if args.baseline:
+        return _compare_and_report(results, args.baseline, args.threshold)
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Offline skytorch benchmarks.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run benchmarks and write JSON results")
+    run_parser.add_argument("--suite", choices=("micro", "http", "vector", "all"), default="all")
+    run_parser.add_argument("--output", "-o", help="Write results here instead of stdout")
+    run_parser.add_argument("--baseline", help="Compare against these saved results; exit 1 on regression")
+    run_parser.add_argument("--threshold", type=float, default=0.1, help="Allowed relative regression (default 0.1)")
+    run_parser.add_argument("--iterations", type=int, default=200, help="Texts per micro-benchmark")
+    run_parser.add_argument("--batch-size", type=int, default=32, help="Texts per batch call or batch request")
+    run_parser.add_argument("--requests", type=int, default=500, help="Requests per HTTP scenario")
+    run_parser.add_argument("--concurrency", type=int, default=16, help="HTTP requests in flight")
+    run_parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the HTTP suite")
+    run_parser.add_argument("--atproto-latency-ms", type=float, default=20.0, help="Delay added by the AT Protocol stub")
+    run_parser.add_argument("--only", nargs="+", help="Only run HTTP scenarios starting with these prefixes")
+    run_parser.add_argument("--vector-rows", type=int, default=100000, help="Synthetic vectors in the vector search suite")
+    run_parser.add_argument("--vector-dim", type=int, default=384, help="Dimension of the synthetic vectors")
+    run_parser.add_argument("--vector-queries", type=int, default=200, help="Queries per vector search benchmark")
+    run_parser.add_argument("--vector-k", type=int, default=10, help="Results per vector search query")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two saved result files")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    if args.command == "compare":
+        with open(args.current) as f:
+            current = json.load(f)
+        return _compare_and_report(current, args.baseline, args.threshold)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""Local stub of the Bluesky XRPC endpoints skytorch calls, for offline benchmarks."""
+
+import argparse
+import asyncio
+import base64
+import json
+import re
+import socket
+import threading
+import time
+from typing import Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+HANDLE_DOMAIN = "bench.test"
+
+_ACTOR_NUMBER = re.compile(r"(\d+)")
+
+
+def actor_did(number: int) -> str:
+    return f"did:plc:bench{number:06d}"
+
+
+def actor_handle(number: int) -> str:
+    return f"user{number}.{HANDLE_DOMAIN}"
+
+
+def _actor_number(actor: str) -> Optional[int]:
+    """Map a stub DID or handle back to its number."""
+    if not (actor.startswith("did:plc:bench") or actor.endswith(f".{HANDLE_DOMAIN}")):
+        return None
+    match = _ACTOR_NUMBER.search(actor)
+    return int(match.group(1)) if match else None
+
+
+def _jwt(subject: str, lifetime: int) -> str:
+    def segment(value: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+    claims = {"sub": subject, "exp": int(time.time()) + lifetime, "iat": int(time.time())}
+    return f"{segment({'alg': 'HS256', 'typ': 'JWT'})}.{segment(claims)}.stub"
+
+
+def _profile(number: int) -> dict:
+    return {
+        "did": actor_did(number),
+        "handle": actor_handle(number),
+        "displayName": f"Bench User {number}",
+        "description": "Covers city hall, transit and the regional economy. Posts are my own.",
+        "avatar": f"https://cdn.example.test/avatar/{number}.jpg",
+        "banner": f"https://cdn.example.test/banner/{number}.jpg",
+        "followersCount": 1000 + number % 5000,
+        "followsCount": 200 + number % 800,
+        "postsCount": 50 + number % 10000,
+    }
+
+
+def create_stub_app(latency_ms: float = 20.0, graph_size: int = 2000, rate_limit: int = 100000, window: int = 60):
+    """
+    Build the stub XRPC app.
+
+    Every stub account follows, and is followed by, ``graph_size`` other
+    stub accounts. Responses carry ``RateLimit-*`` headers advertising
+    ``rate_limit`` requests per ``window`` seconds, but the stub never
+    throttles.
+
+    Args:
+        latency_ms: Delay added to every response, standing in for network and AppView time
+        graph_size: Follows and followers per account
+        rate_limit: Advertised requests per window
+        window: Advertised rate limit window in seconds
+    """
+    state = {"requests": 0}
+
+    def respond(body: dict, status_code: int = 200) -> JSONResponse:
+        state["requests"] += 1
+        return JSONResponse(body, status_code=status_code, headers={
+            "RateLimit-Limit": str(rate_limit),
+            "RateLimit-Remaining": str(rate_limit - 1),
+            "RateLimit-Reset": str(int(time.time()) + window),
+            "RateLimit-Policy": f"{rate_limit};w={window}",
+        })
+
+    def error(status_code: int, name: str, message: str) -> JSONResponse:
+        return respond({"error": name, "message": message}, status_code)
+
+    async def delay():
+        if latency_ms > 0:
+            await asyncio.sleep(latency_ms / 1000.0)
+
+    def authorized(request: Request) -> bool:
+        return request.headers.get("authorization", "").startswith("Bearer ")
+
+    async def create_session(request: Request):
+        await delay()
+        body = await request.json()
+        identifier = body.get("identifier", "bench")
+        return respond({
+            "did": actor_did(0),
+            "handle": identifier,
+            "accessJwt": _jwt(actor_did(0), 7200),
+            "refreshJwt": _jwt(actor_did(0), 86400),
+        })
+
+    async def refresh_session(request: Request):
+        await delay()
+        if not authorized(request):
+            return error(401, "AuthMissing", "Authentication Required")
+        return respond({
+            "did": actor_did(0),
+            "handle": f"bench.{HANDLE_DOMAIN}",
+            "accessJwt": _jwt(actor_did(0), 7200),
+            "refreshJwt": _jwt(actor_did(0), 86400),
+        })
+
+    def graph(direction: str):
+        async def handler(request: Request):
+            await delay()
+            if not authorized(request):
+                return error(401, "AuthMissing", "Authentication Required")
+            number = _actor_number(request.query_params.get("actor", ""))
+            if number is None:
+                return error(400, "InvalidRequest", "Profile not found")
+            limit = min(100, int(request.query_params.get("limit", "50")))
+            offset = int(request.query_params.get("cursor") or 0)
+            end = min(graph_size, offset + limit)
+            # Neighbours are numbered after the actor so graphs of different actors differ
+            profiles = [_profile(number + 1 + index) for index in range(offset, end)]
+            body = {"subject": _profile(number), direction: profiles}
+            if end < graph_size:
+                body["cursor"] = str(end)
+            return respond(body)
+        return handler
+
+    async def get_profile(request: Request):
+        await delay()
+        number = _actor_number(request.query_params.get("actor", ""))
+        if number is None:
+            return error(400, "InvalidRequest", "Profile not found")
+        return respond(_profile(number))
+
+    async def get_profiles(request: Request):
+        await delay()
+        actors = request.query_params.getlist("actors")
+        if len(actors) > 25:
+            return error(400, "InvalidRequest", "actors must not have more than 25 elements")
+        numbers = [_actor_number(actor) for actor in actors]
+        return respond({"profiles": [_profile(number) for number in numbers if number is not None]})
+
+    async def resolve_handle(request: Request):
+        await delay()
+        handle = request.query_params.get("handle", "")
+        number = _actor_number(handle) if handle.endswith(f".{HANDLE_DOMAIN}") else None
+        if number is None:
+            return error(400, "InvalidRequest", "Unable to resolve handle")
+        return respond({"did": actor_did(number)})
+
+    async def stats(request: Request):
+        return JSONResponse(state)
+
+    app = Starlette(routes=[
+        Route("/xrpc/com.atproto.server.createSession", create_session, methods=["POST"]),
+        Route("/xrpc/com.atproto.server.refreshSession", refresh_session, methods=["POST"]),
+        Route("/xrpc/app.bsky.graph.getFollows", graph("follows")),
+        Route("/xrpc/app.bsky.graph.getFollowers", graph("followers")),
+        Route("/xrpc/app.bsky.actor.getProfile", get_profile),
+        Route("/xrpc/app.bsky.actor.getProfiles", get_profiles),
+        Route("/xrpc/com.atproto.identity.resolveHandle", resolve_handle),
+        Route("/_stats", stats),
+    ])
+    app.state.stub = state
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StubServer:
+    """Run the stub app with uvicorn on a background thread, as a context manager."""
+
+    def __init__(self, port: Optional[int] = None, **options):
+        self.port = port or free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.app = create_stub_app(**options)
+        self._server = uvicorn.Server(uvicorn.Config(
+            self.app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="off"
+        ))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def requests(self) -> int:
+        return self.app.state.stub["requests"]
+
+    def __enter__(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.run, name="atproto-stub", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"AT Protocol stub failed to start on port {self.port}")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a stub of the Bluesky XRPC endpoints skytorch uses.")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Delay added to every response")
+    parser.add_argument("--graph-size", type=int, default=2000, help="Follows and followers per account")
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_stub_app(latency_ms=args.latency_ms, graph_size=args.graph_size),
+        host="127.0.0.1",
+        port=args.port,
+    )
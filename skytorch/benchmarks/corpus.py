@@ -0,0 +1,94 @@
+"""Fixture corpus of news-length texts used by every benchmark."""
+
+import random
+from typing import Dict, List
+
+# Short posts, roughly 10-40 words
+SHORT_POSTS = [
+    "Breaking: wildfire forces evacuations north of Sacramento as winds pick up overnight.",
+    "The Federal Reserve held interest rates steady on Wednesday, citing cooling inflation.",
+    "Polls close in two hours. Turnout in Maricopa County is already above 2020 levels.",
+    "NASA confirms the Artemis launch window has moved to March after a valve issue.",
+    "Just in: the Supreme Court agreed to hear the Texas border buoy case next term.",
+    "Storm update: 200,000 customers without power across Ohio and western Pennsylvania.",
+    "Apple shares fell 3% in early trading after the EU opened a new antitrust probe.",
+    "Lionel Messi scored twice as Inter Miami beat Orlando City 3-1 on Saturday night.",
+    "The WHO says measles cases in Europe rose thirtyfold last year, urging vaccination.",
+    "Reporting from Kyiv: air raid sirens sounded for three hours before dawn today.",
+    "City council approves the new bike lane network after a four-hour public hearing.",
+    "Researchers at the University of Oslo published new data on Arctic sea ice loss.",
+]
+
+# Paragraphs, roughly 60-120 words
+PARAGRAPHS = [
+    "A new transit line connecting the airport to downtown opened this morning after years of delays. "
+    "Mayor Karen Bass called it a turning point for the region's economy, while riders said the "
+    "trip now takes half as long as the bus. The Metropolitan Transportation Authority expects "
+    "forty thousand daily boardings by the end of the year, though critics noted the project ran "
+    "more than a billion dollars over budget.",
+    "The company reported quarterly revenue of $4.2 billion, beating analyst expectations, while "
+    "warning that supply chain disruptions could weigh on margins for the rest of the year. Chief "
+    "executive Lisa Su told investors that demand for data center chips remained strong. Shares rose "
+    "six percent in after-hours trading on the Nasdaq.",
+    "Lawmakers in the European Parliament approved sweeping rules for artificial intelligence on "
+    "Tuesday. The regulation bans some uses outright, such as social scoring, and imposes "
+    "transparency requirements on general-purpose models. Industry groups said the rules were too "
+    "vague, while civil liberties organizations argued they did not go far enough.",
+    "Firefighters in British Columbia battled more than three hundred active blazes on Sunday as "
+    "temperatures climbed above forty degrees. Officials in Kelowna ordered the evacuation of "
+    "several neighbourhoods and opened emergency shelters at the Prospera Place arena. The Canadian "
+    "Armed Forces have been asked to help with logistics.",
+    "The Senate passed the bipartisan infrastructure bill by a vote of 69 to 30, sending it to the "
+    "House of Representatives. Senator Kyrsten Sinema, one of the lead negotiators, said the "
+    "package would repair roads and bridges in every state. Speaker Nancy Pelosi has said the House "
+    "will take it up alongside a larger budget bill.",
+    "Scientists at CERN announced that the Large Hadron Collider will restart next month after a "
+    "three-year upgrade. The improvements will allow the accelerator to collide protons at record "
+    "energies, and physicists in Geneva hope the new data will shed light on dark matter and the "
+    "properties of the Higgs boson.",
+    "Heavy rain caused flash flooding across southern Brazil, killing at least 39 people and "
+    "displacing tens of thousands. President Luiz Inacio Lula da Silva flew over the affected areas "
+    "in Rio Grande do Sul and promised federal aid. Meteorologists warned that more storms were "
+    "expected later in the week.",
+    "The Toronto Raptors traded their starting point guard to the New York Knicks on Thursday in "
+    "exchange for two first-round draft picks. The move signals a rebuild for the franchise, which "
+    "has missed the playoffs two years running. Knicks fans greeted the news with celebrations "
+    "outside Madison Square Garden.",
+]
+
+# Number of paragraphs in each generated article
+_ARTICLE_PARAGRAPHS = (6, 8, 10, 12)
+
+
+def _articles(count: int, seed: int) -> List[str]:
+    """Build full-length articles by shuffling paragraphs, deterministically for a seed."""
+    rng = random.Random(seed)
+    articles = []
+    for index in range(count):
+        paragraphs = [rng.choice(PARAGRAPHS) for _ in range(_ARTICLE_PARAGRAPHS[index % len(_ARTICLE_PARAGRAPHS)])]
+        articles.append("\n\n".join(paragraphs))
+    return articles
+
+
+def load_corpus(seed: int = 0) -> Dict[str, List[str]]:
+    """
+    Return the benchmark corpus by length class.
+
+    Returns:
+        Mapping of ``short``, ``paragraph`` and ``article`` to texts
+    """
+    return {
+        "short": list(SHORT_POSTS),
+        "paragraph": list(PARAGRAPHS),
+        "article": _articles(8, seed),
+    }
+
+
+def unique_texts(texts: List[str], count: int, salt: str = "") -> List[str]:
+    """
+    Cycle through ``texts`` to ``count`` items, each made unique.
+
+    A numbered suffix keeps repeated texts from being served by the
+    embedding cache.
+    """
+    return [f"{texts[index % len(texts)]} [{salt}{index}]" for index in range(count)]
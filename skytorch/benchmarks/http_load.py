@@ -0,0 +1,248 @@
+"""End-to-end HTTP load benchmarks against a local skytorch server."""
+
+import asyncio
+import itertools
+import logging
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+from benchmarks.atproto_stub import StubServer, actor_did, actor_handle, free_port
+from benchmarks.corpus import load_corpus, unique_texts
+from benchmarks.stats import peak_rss_bytes, summarize
+
+logger = logging.getLogger(__name__)
+
+# Directory containing the skytorch package, where uvicorn is started
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# (method, path, request kwargs) for the i-th request of a scenario
+RequestBuilder = Callable[[int], Tuple[str, str, dict]]
+
+
+class Scenario(NamedTuple):
+    name: str
+    build: RequestBuilder
+    needs_models: bool = False
+    items_per_request: int = 1
+    # Fraction of the configured request count to run, for expensive scenarios
+    scale: float = 1.0
+
+
+def scenarios(batch_size: int = 32) -> List[Scenario]:
+    """Requests exercising the NLP endpoints and the AT Protocol endpoints through the stub."""
+    corpus = load_corpus()
+    short = unique_texts(corpus["short"], 10000, "s")
+    paragraphs = unique_texts(corpus["paragraph"], 10000 * batch_size, "p")
+    articles = unique_texts(corpus["article"], 1000, "a")
+
+    def batch(index: int) -> List[dict]:
+        return [{"text": text} for text in paragraphs[index * batch_size:(index + 1) * batch_size]]
+
+    return [
+        Scenario("http.health", lambda i: ("GET", "/health/live", {})),
+        Scenario("http.embeddings.short", lambda i: (
+            "POST", "/api/v1/embeddings", {"json": {"text": short[i % len(short)], "bypass_cache": True}}
+        ), needs_models=True),
+        Scenario("http.embeddings.cached", lambda i: (
+            "POST", "/api/v1/embeddings", {"json": {"text": short[0]}}
+        ), needs_models=True),
+        Scenario("http.embeddings_batch.json", lambda i: (
+            "POST", "/api/v1/embeddings/batch", {"json": {"items": batch(i), "bypass_cache": True}}
+        ), needs_models=True, items_per_request=batch_size, scale=0.25),
+        Scenario("http.embeddings_batch.base64", lambda i: (
+            "POST", "/api/v1/embeddings/batch?format=base64", {"json": {"items": batch(i), "bypass_cache": True}}
+        ), needs_models=True, items_per_request=batch_size, scale=0.25),
+        Scenario("http.entities.paragraph", lambda i: (
+            "POST", "/api/v1/entities", {"json": {"text": paragraphs[i % len(paragraphs)]}}
+        ), needs_models=True),
+        Scenario("http.articles_analyze", lambda i: (
+            "POST", "/api/v1/articles/analyze", {"json": {"text": articles[i % len(articles)], "bypass_cache": True}}
+        ), needs_models=True, scale=0.1),
+        Scenario("http.profile", lambda i: (
+            "GET", "/api/v1/profile", {"params": {"did": actor_did(1000 + i)}}
+        )),
+        Scenario("http.profile.cached", lambda i: (
+            "GET", "/api/v1/profile", {"params": {"did": actor_did(1)}}
+        )),
+        Scenario("http.profiles_batch", lambda i: (
+            "POST", "/api/v1/profiles", {"json": {"dids": [actor_did(100000 + i * 100 + n) for n in range(100)]}}
+        ), items_per_request=100, scale=0.25),
+        Scenario("http.resolve_handle", lambda i: (
+            "GET", "/api/v1/resolve_handle", {"params": {"handle": actor_handle(200000 + i)}}
+        )),
+        Scenario("http.follows_page", lambda i: (
+            "GET", "/api/v1/follows", {"params": {"did": actor_did(300000 + i), "limit": 100}}
+        ), items_per_request=100),
+        Scenario("http.follows_all", lambda i: (
+            "GET", "/api/v1/follows/all", {"params": {"did": actor_did(400000 + i)}}
+        ), scale=0.05),
+    ]
+
+
+async def _send(client: httpx.AsyncClient, request: Tuple[str, str, dict]) -> httpx.Response:
+    method, path, kwargs = request
+    return await client.request(method, path, **kwargs)
+
+
+async def _run_load(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int) -> dict:
+    """Issue ``requests`` requests from ``concurrency`` workers; latency includes reading the whole body."""
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors = 0
+    items = 0
+
+    async def worker():
+        nonlocal errors, items
+        while True:
+            index = next(counter)
+            if index >= requests:
+                return
+            request = scenario.build(index)
+            started = time.perf_counter()
+            try:
+                response = await _send(client, request)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            if response.status_code >= 400:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            if request[1].endswith("/all"):
+                # Streamed profiles, one per line, plus cursor and summary lines
+                items += sum(1 for line in response.text.splitlines() if line.startswith('{"did"'))
+            else:
+                items += scenario.items_per_request
+
+    # Untimed requests first, so connection setup and first-call costs stay out of the numbers
+    warmup_indices = range(requests, requests + concurrency)
+    await asyncio.gather(*(_send(client, scenario.build(index)) for index in warmup_indices), return_exceptions=True)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, items=items, errors=errors)
+
+
+class AppServer:
+    """A skytorch uvicorn subprocess pointed at the AT Protocol stub, as a context manager."""
+
+    def __init__(self, atproto_url: str, workers: int = 1, env: Optional[Dict[str, str]] = None):
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.workers = workers
+        self.env = {
+            **os.environ,
+            "ATPROTO_SERVICE_URL": atproto_url,
+            "ATPROTO_HANDLE": "bench.bench.test",
+            "ATPROTO_PASSWORD": "bench",
+            "ATPROTO_SESSION_STORE": "none",
+            # Pacing is benchmarked through the stub's advertised limit, not the default
+            "ATPROTO_RATE_LIMIT": "100000",
+            "ATPROTO_RATE_BURST": "1000",
+            # Offline: no Redis, no model downloads
+            "EMBEDDING_CACHE_REDIS_ENABLED": "false",
+            "PROFILE_CACHE_REDIS_ENABLED": "false",
+            "HANDLE_CACHE_REDIS_ENABLED": "false",
+            "HF_HUB_OFFLINE": "1",
+            "TRANSFORMERS_OFFLINE": "1",
+            **(env or {}),
+        }
+        self.process: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> "AppServer":
+        self.process = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "skytorch.main:app",
+                "--host", "127.0.0.1", "--port", str(self.port),
+                "--workers", str(self.workers), "--log-level", "warning",
+            ],
+            cwd=PROJECT_DIR,
+            env=self.env,
+        )
+        return self
+
+    def wait_ready(self, timeout: float = 300.0) -> dict:
+        """Wait for warm-up to finish and return the readiness report."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"skytorch exited with status {self.process.returncode}")
+            try:
+                response = httpx.get(f"{self.url}/health/ready", timeout=5)
+                if response.status_code == 200:
+                    return response.json()
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.25)
+        raise RuntimeError(f"skytorch was not ready after {timeout:.0f}s")
+
+    def peak_rss_bytes(self) -> Optional[int]:
+        return peak_rss_bytes(self.process.pid) if self.process else None
+
+    def __exit__(self, *exc_info):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=20)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def run_http(
+    requests: int = 500,
+    concurrency: int = 16,
+    batch_size: int = 32,
+    atproto_latency_ms: float = 20.0,
+    only: Optional[List[str]] = None,
+    workers: int = 1,
+) -> Tuple[Dict[str, dict], dict]:
+    """
+    Start the stub and a skytorch server, then load each scenario in turn.
+
+    Scenarios that need NLP models are skipped when warm-up reports the
+    models unavailable.
+
+    Args:
+        requests: Requests per scenario, before the scenario's scale
+        concurrency: Requests in flight at once
+        batch_size: Texts per batch embedding request
+        atproto_latency_ms: Delay the stub adds to each XRPC response
+        only: Run only scenarios whose name starts with one of these prefixes
+        workers: uvicorn worker processes
+
+    Returns:
+        Tuple of (results by scenario name, server info with readiness and peak RSS)
+    """
+    results: Dict[str, dict] = {}
+    with StubServer(latency_ms=atproto_latency_ms) as stub, AppServer(stub.url, workers=workers) as app:
+        ready = app.wait_ready()
+        models_available = ready.get("warmup", {}).get("models_available", False)
+
+        async def run_all():
+            limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+            async with httpx.AsyncClient(base_url=app.url, limits=limits, timeout=120) as client:
+                for scenario in scenarios(batch_size):
+                    if only and not any(scenario.name.startswith(prefix) for prefix in only):
+                        continue
+                    if scenario.needs_models and not models_available:
+                        results[scenario.name] = {"skipped": "NLP models not available"}
+                        continue
+                    count = max(concurrency, int(requests * scenario.scale))
+                    logger.info(f"Running {scenario.name} ({count} requests, concurrency {concurrency})")
+                    results[scenario.name] = await _run_load(client, scenario, count, concurrency)
+
+        asyncio.run(run_all())
+        server = {
+            "workers": workers,
+            "warmup": ready.get("warmup"),
+            # The parent process only; with several workers each has its own RSS
+            "peak_rss_bytes": app.peak_rss_bytes(),
+            "atproto_stub_requests": stub.requests,
+        }
+    return results, server
@@ -0,0 +1,114 @@
+"""In-process micro-benchmarks of the NLP functions."""
+
+import logging
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.corpus import load_corpus, unique_texts
+from benchmarks.stats import summarize
+
+logger = logging.getLogger(__name__)
+
+
+def _time_calls(fn: Callable[[str], object], texts: List[str], warmup: int) -> dict:
+    for text in texts[:warmup]:
+        fn(text)
+    latencies = []
+    started = time.perf_counter()
+    for text in texts:
+        call_started = time.perf_counter()
+        fn(text)
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def _time_batches(fn: Callable[[List[str]], object], texts: List[str], batch_size: int, warmup: int) -> dict:
+    batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    for batch in batches[:warmup]:
+        fn(batch)
+    latencies = []
+    started = time.perf_counter()
+    for batch in batches:
+        call_started = time.perf_counter()
+        fn(batch)
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started, items=len(texts))
+
+
+def run_micro(
+    spacy_model: str,
+    sentence_model: str,
+    iterations: int = 200,
+    batch_size: int = 32,
+    warmup: int = 5,
+) -> Dict[str, dict]:
+    """
+    Benchmark embedding and entity extraction over each corpus length class.
+
+    Models are loaded before timing starts, so results measure inference
+    only. A benchmark whose model or dependency is unavailable is recorded
+    as skipped rather than failing the suite.
+
+    Args:
+        spacy_model: spacy model for extract_named_entities
+        sentence_model: Sentence transformer model for the embedding benchmarks
+        iterations: Texts per benchmark (articles use a quarter as many)
+        batch_size: Texts per generate_embedding_batch call
+        warmup: Untimed calls before each benchmark
+
+    Returns:
+        Mapping of benchmark name to summary
+    """
+    from skytorch.nlp import (
+        extract_named_entities,
+        generate_embedding,
+        generate_embedding_batch,
+        get_sentence_transformer,
+        get_spacy_model,
+    )
+
+    results: Dict[str, dict] = {}
+    corpus = load_corpus()
+
+    suites = {
+        "embedding": (
+            lambda: get_sentence_transformer(sentence_model),
+            {
+                "generate_embedding": lambda texts: _time_calls(
+                    lambda text: generate_embedding(text, sentence_model), texts, warmup
+                ),
+                "generate_embedding_batch": lambda texts: _time_batches(
+                    lambda batch: generate_embedding_batch(batch, sentence_model, batch_size=batch_size),
+                    texts,
+                    batch_size,
+                    warmup=1,
+                ),
+            },
+        ),
+        "entities": (
+            lambda: get_spacy_model(spacy_model),
+            {
+                "extract_named_entities": lambda texts: _time_calls(
+                    lambda text: extract_named_entities(text, spacy_model), texts, warmup
+                ),
+            },
+        ),
+    }
+
+    for suite, (load, benchmarks) in suites.items():
+        try:
+            load()
+        except (ImportError, OSError) as e:
+            logger.warning(f"Skipping {suite} micro-benchmarks: {e}")
+            for name in benchmarks:
+                for kind in corpus:
+                    results[f"micro.{name}.{kind}"] = {"skipped": str(e)}
+            continue
+
+        for name, benchmark in benchmarks.items():
+            for kind, texts in corpus.items():
+                count = max(batch_size, iterations // 4 if kind == "article" else iterations)
+                logger.info(f"Running micro.{name}.{kind} ({count} texts)")
+                results[f"micro.{name}.{kind}"] = benchmark(unique_texts(texts, count))
+
+    return results
@@ -0,0 +1,135 @@
+"""Latency summaries, peak RSS and baseline comparison for benchmark results."""
+
+import math
+import os
+import resource
+from typing import Dict, List, Optional
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(q / 100.0 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, rank))]
+
+
+def summarize(latencies: List[float], elapsed: float, items: Optional[int] = None, errors: int = 0) -> dict:
+    """
+    Summarize one benchmark run.
+
+    Args:
+        latencies: Seconds taken by each successful operation
+        elapsed: Wall-clock seconds for the whole run
+        items: Items processed, when an operation handles more than one
+        errors: Operations that failed
+
+    Returns:
+        Dict with operation and item throughput and p50/p95/p99 latency in milliseconds
+    """
+    values = sorted(latencies)
+    operations = len(values)
+    items = operations if items is None else items
+    return {
+        "operations": operations,
+        "items": items,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 4),
+        "throughput_per_second": round(operations / elapsed, 2) if elapsed > 0 else 0.0,
+        "items_per_second": round(items / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(values, 50) * 1000, 3),
+            "p95": round(percentile(values, 95) * 1000, 3),
+            "p99": round(percentile(values, 99) * 1000, 3),
+            "mean": round(sum(values) / operations * 1000, 3) if operations else 0.0,
+            "max": round(values[-1] * 1000, 3) if values else 0.0,
+        },
+    }
+
+
+def peak_rss_bytes(pid: Optional[int] = None) -> Optional[int]:
+    """
+    Peak resident set size of a process.
+
+    Args:
+        pid: Process to inspect (defaults to this one)
+
+    Returns:
+        High-water RSS in bytes, or None if it can't be read
+    """
+    try:
+        with open(f"/proc/{pid or os.getpid()}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if pid is None:
+        # ru_maxrss is in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return None
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.1) -> List[Dict]:
+    """
+    Compare benchmark results against a saved baseline.
+
+    A benchmark regresses when its throughput drops, or its p95 latency
+    grows, by more than ``threshold`` (a fraction). Benchmarks missing from
+    either side or skipped are reported but never count as regressions.
+
+    Returns:
+        One row per benchmark with the relative changes and a ``regressed`` flag
+    """
+    rows = []
+    current_results = current.get("results", {})
+    baseline_results = baseline.get("results", {})
+    for name in sorted(set(current_results) | set(baseline_results)):
+        now, before = current_results.get(name), baseline_results.get(name)
+        row = {"name": name, "status": "ok", "regressed": False}
+        if now is None or before is None:
+            row["status"] = "new" if before is None else "missing"
+        elif now.get("skipped") or before.get("skipped"):
+            row["status"] = "skipped"
+        else:
+            throughput_change = _change(now["throughput_per_second"], before["throughput_per_second"])
+            p95_change = _change(now["latency_ms"]["p95"], before["latency_ms"]["p95"])
+            row.update({
+                "throughput": now["throughput_per_second"],
+                "baseline_throughput": before["throughput_per_second"],
+                "throughput_change": throughput_change,
+                "p95_ms": now["latency_ms"]["p95"],
+                "baseline_p95_ms": before["latency_ms"]["p95"],
+                "p95_change": p95_change,
+            })
+            if (throughput_change is not None and throughput_change < -threshold) or (
+                p95_change is not None and p95_change > threshold
+            ):
+                row["status"] = "regressed"
+                row["regressed"] = True
+        rows.append(row)
+    return rows
+
+
+def _change(now: float, before: float) -> Optional[float]:
+    if not before:
+        return None
+    return round((now - before) / before, 4)
+
+
+def format_comparison(rows: List[Dict]) -> str:
+    """Render comparison rows as a fixed-width table."""
+    lines = [f"{'benchmark':<44} {'throughput':>12} {'change':>8} {'p95 ms':>10} {'change':>8}  status"]
+    for row in rows:
+        if "throughput" not in row:
+            lines.append(f"{row['name']:<44} {'':>12} {'':>8} {'':>10} {'':>8}  {row['status']}")
+            continue
+        lines.append(
+            f"{row['name']:<44} {row['throughput']:>12.2f} {_percent(row['throughput_change']):>8} "
+            f"{row['p95_ms']:>10.2f} {_percent(row['p95_change']):>8}  {row['status']}"
+        )
+    return "\n".join(lines)
+
+
+def _percent(change: Optional[float]) -> str:
+    return "n/a" if change is None else f"{change * 100:+.1f}%"
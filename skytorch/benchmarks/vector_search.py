@@ -0,0 +1,119 @@
+"""Vector index search latency and recall against float32 brute force, on synthetic embeddings."""
+
+import logging
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.stats import summarize
+from skytorch.vector_index import HAS_HNSWLIB, VectorIndex
+
+logger = logging.getLogger(__name__)
+
+
+def synthetic_embeddings(rows: int, dim: int, latent_dim: int = 48, clusters: int = 256, seed: int = 0) -> np.ndarray:
+    """
+    Unit vectors around random topic centres in a low-dimensional subspace.
+
+    Sentence embeddings occupy far fewer dimensions than they have, and
+    approximate search depends on that; uniformly random vectors are
+    nearly equidistant and would make every graph index look broken.
+    """
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, latent_dim)).astype(np.float32)
+    latent = centres[rng.integers(0, clusters, rows)] + 0.5 * rng.standard_normal((rows, latent_dim)).astype(np.float32)
+    projection = rng.standard_normal((latent_dim, dim)).astype(np.float32) / np.sqrt(latent_dim)
+    vectors = latent @ projection + 0.05 * rng.standard_normal((rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _recall(found: List[int], expected: np.ndarray) -> float:
+    return len(set(found) & set(expected.tolist())) / len(expected) if len(expected) else 1.0
+
+
+def _time_searches(index: VectorIndex, queries: np.ndarray, truth: List[np.ndarray], k: int, **options) -> dict:
+    index.search(queries[0], k, **options)
+    latencies = []
+    recalls = []
+    started = time.perf_counter()
+    for query, expected in zip(queries, truth):
+        call_started = time.perf_counter()
+        hits, method = index.search(query, k, **options)
+        latencies.append(time.perf_counter() - call_started)
+        recalls.append(_recall([hit.chunk_id for hit in hits], expected))
+    summary = summarize(latencies, time.perf_counter() - started)
+    summary["recall_at_k"] = round(float(np.mean(recalls)), 4)
+    summary["method"] = method
+    return summary
+
+
+def run_vector_search(
+    rows: int = 100000,
+    dim: int = 384,
+    queries: int = 200,
+    k: int = 10,
+    ann_ef_search: Optional[List[int]] = None,
+) -> Dict[str, dict]:
+    """
+    Benchmark exact float32 and float16 search and, with hnswlib, HNSW search.
+
+    Ground truth is the float32 brute-force top-k (a full matrix-vector
+    product and sort), so float32 exact search should score recall 1.0 and
+    the others show what float16 storage and graph search give up.
+
+    Args:
+        rows: Indexed vectors
+        dim: Vector dimension
+        queries: Timed queries per benchmark
+        k: Results per query
+        ann_ef_search: HNSW candidate list sizes to benchmark
+
+    Returns:
+        Mapping of benchmark name to summary with ``recall_at_k`` added
+    """
+    vectors = synthetic_embeddings(rows, dim)
+    rng = np.random.default_rng(1)
+    picks = vectors[rng.integers(0, rows, queries)]
+    query_vectors = picks + 0.1 * rng.standard_normal(picks.shape).astype(np.float32)
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+
+    chunk_ids = np.arange(1, rows + 1)
+    article_ids = chunk_ids // 8
+    chunk_indexes = chunk_ids % 8
+
+    latencies = []
+    truth = []
+    started = time.perf_counter()
+    for query in query_vectors:
+        call_started = time.perf_counter()
+        truth.append(chunk_ids[np.argsort(-(vectors @ query))[:k]])
+        latencies.append(time.perf_counter() - call_started)
+    results = {"vector_bruteforce_sort": {**summarize(latencies, time.perf_counter() - started), "recall_at_k": 1.0}}
+
+    for dtype in ("float32", "float16"):
+        index = VectorIndex(dtype=dtype)
+        index.add(chunk_ids, article_ids, chunk_indexes, vectors)
+        results[f"vector_exact_{dtype}"] = _time_searches(index, query_vectors, truth, k)
+        results[f"vector_exact_{dtype}"]["vector_bytes"] = index.stats()["vector_bytes"]
+        filtered = list(rng.integers(0, rows // 8, 50))
+        results[f"vector_exact_{dtype}_filtered"] = {
+            key: value for key, value in _time_searches(index, query_vectors, truth, k, article_ids=filtered).items()
+            if key != "recall_at_k"
+        }
+
+    if not HAS_HNSWLIB:
+        results["vector_hnsw"] = {"skipped": "hnswlib is not installed"}
+        return results
+
+    index = VectorIndex(dtype="float16", ann="hnsw", ann_min_size=0)
+    index.add(chunk_ids, article_ids, chunk_indexes, vectors)
+    build_started = time.perf_counter()
+    index.sync_ann()
+    build_seconds = time.perf_counter() - build_started
+    for ef_search in ann_ef_search or [32, 64, 128]:
+        index.hnsw_ef_search = ef_search
+        summary = _time_searches(index, query_vectors, truth, k)
+        summary["build_seconds"] = round(build_seconds, 2)
+        results[f"vector_hnsw_ef{ef_search}"] = summary
+    return results
@@ -1,83 +1,765 @@
 """AT Protocol (Bluesky) client utilities."""
 
+import asyncio
+import heapq
+import itertools
+import logging
 import os
-from typing import Optional
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
 
 try:
-    from atproto import Client
-    HAS_ATPROTO = True
+    import redis.asyncio as aioredis
+    HAS_REDIS = True
 except ImportError:
-    HAS_ATPROTO = False
-    Client = None
+    HAS_REDIS = False
+    aioredis = None
+
+from skytorch import metrics
+from skytorch.atproto_session import SessionStore, create_session_store, token_expiry
+from skytorch.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# XRPC errors meaning the access token must be refreshed
+_TOKEN_ERRORS = ("ExpiredToken", "InvalidToken")
+
+# Scheduler lanes: lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+_LANES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BULK: "bulk"}
+
+_POLICY_WINDOW = re.compile(r"w=(\d+)")
+
+
+class AtprotoError(Exception):
+    """An XRPC error response from the AT Protocol service."""
+
+    def __init__(self, status_code: int, error: Optional[str], message: Optional[str]):
+        self.status_code = status_code
+        self.error = error
+        self.message = message
+        super().__init__(f"{error or 'XRPCError'}: {message or f'HTTP {status_code}'}")
+
+    @property
+    def is_token_error(self) -> bool:
+        return self.error in _TOKEN_ERRORS or "Token could not be verified" in (self.message or "")
+
+
+def _header_int(headers: httpx.Headers, name: str) -> Optional[int]:
+    try:
+        return int(headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+# Refill the bucket, apply a token cap and pause, then optionally take a
+# token. Returns seconds until a token can be taken ("0" when one was).
+_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local take = ARGV[4] == "1"
+local cap = tonumber(ARGV[5])
+local pause_until = tonumber(ARGV[6])
+
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated", "paused_until")
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+local paused = math.max(tonumber(state[3]) or 0, pause_until)
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+if cap >= 0 then
+    tokens = math.min(tokens, cap)
+end
+
+local wait = 0
+if now < paused then
+    wait = paused - now
+elseif tokens >= 1 then
+    if take then
+        tokens = tokens - 1
+    end
+elseif rate > 0 then
+    wait = (1 - tokens) / rate
+else
+    wait = 1
+end
+
+redis.call("HSET", KEYS[1], "tokens", tokens, "updated", now, "paused_until", paused)
+redis.call("EXPIRE", KEYS[1], 3600)
+return tostring(wait)
+"""
+
+
+class SharedRateBucket:
+    """
+    Token bucket and pause state kept in Redis for one account.
+
+    The upstream rate limit applies to the account, not to a process, so
+    every worker and replica logged in as the same handle draws from this
+    one bucket. Redis failures are logged and reported to the caller, which
+    falls back to its own bucket.
+    """
+
+    def __init__(self, redis_url: str, key: str, timeout: float = 0.5):
+        self.key = key
+        self._redis = aioredis.from_url(redis_url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self.errors = 0
+
+    async def update(
+        self,
+        rate: float,
+        burst: int,
+        take: bool = False,
+        cap: Optional[int] = None,
+        pause_until: float = 0.0,
+    ) -> Optional[float]:
+        """
+        Refill the shared bucket and optionally take a token from it.
+
+        Args:
+            rate: Tokens added per second
+            burst: Most tokens the bucket holds
+            take: Take a token if one is available
+            cap: Lower the bucket to at most this many tokens
+            pause_until: Unix time until which no token may be taken
+
+        Returns:
+            Seconds until a token is available (0 if one was taken), or
+            None if Redis could not be reached
+        """
+        try:
+            wait = await self._redis.eval(
+                _BUCKET_SCRIPT, 1, self.key,
+                rate, burst, time.time(), "1" if take else "0", -1 if cap is None else cap, pause_until,
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Shared AT Protocol rate limit unavailable, using this process's bucket: {e}")
+            return None
+        return float(wait)
+
+
+class UpstreamScheduler:
+    """
+    Pace upstream calls with a token bucket that follows the service's rate limit.
+
+    The bucket starts at ``rate`` requests per second with room for ``burst``
+    back-to-back requests. Every response's ``RateLimit-*`` headers retune it:
+    the rate follows the advertised policy (times ``headroom``), the bucket
+    never holds more tokens than the service says remain, and once the
+    remaining count hits zero, or on a 429, calls pause until the window
+    resets. Waiting calls are released by priority lane, then in arrival
+    order, so interactive lookups overtake queued bulk crawls.
+
+    With a SharedRateBucket, tokens, the remaining-count cap and pauses
+    live in Redis and are shared with every other process using the same
+    account; the lanes stay per process. If Redis is unreachable the
+    process falls back to its own bucket.
+
+    ``clock`` is the monotonic time source for refills and pauses; tests
+    pass a fake one.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 20,
+        headroom: float = 0.9,
+        shared: Optional[SharedRateBucket] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.headroom = headroom
+        self.shared = shared
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = self._clock()
+        self._paused_until = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        # Cap and pause observed since the shared bucket was last updated
+        self._shared_cap: Optional[int] = None
+        self._shared_pause_until = 0.0
+
+        self.requests = 0
+        self.throttled = 0
+        self.pauses = 0
+        self.waits = {lane: 0 for lane in _LANES.values()}
+        self.wait_seconds = {lane: 0.0 for lane in _LANES.values()}
+        self.max_wait_seconds = {lane: 0.0 for lane in _LANES.values()}
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _can_take(self) -> bool:
+        return self._clock() >= self._paused_until and self._tokens >= 1
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE):
+        """Wait for a request slot in the given lane."""
+        started = self._clock()
+        self._refill()
+        if self.shared is None and not self._waiters and self._can_take():
+            self._tokens -= 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+            self._schedule()
+            await future
+
+        lane = _LANES.get(priority, "bulk")
+        waited = self._clock() - started
+        self.requests += 1
+        self.waits[lane] += 1
+        self.wait_seconds[lane] += waited
+        self.max_wait_seconds[lane] = max(self.max_wait_seconds[lane], waited)
+
+    def _dispatch(self):
+        self._wakeup = None
+        self._refill()
+        while self._waiters and self._can_take():
+            _, _, future = heapq.heappop(self._waiters)
+            # Skip callers that gave up while queued
+            if future.done():
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+        self._schedule()
+
+    def _take_local(self) -> float:
+        """Take a token from this process's bucket; returns seconds to wait if there was none."""
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate if self.rate > 0 else 1.0
+
+    async def _dispatch_shared(self):
+        """Push observed caps and pauses to the shared bucket and release waiters as it hands out tokens."""
+        try:
+            while True:
+                while self._waiters and self._waiters[0][2].done():
+                    heapq.heappop(self._waiters)
+                cap, pause_until = self._shared_cap, self._shared_pause_until
+                if not self._waiters and cap is None and not pause_until:
+                    return
+                self._shared_cap, self._shared_pause_until = None, 0.0
+
+                paused = self._paused_until - self._clock()
+                take = bool(self._waiters) and paused <= 0
+                wait = await self.shared.update(self.rate, self.burst, take=take, cap=cap, pause_until=pause_until)
+                if wait is None and take:
+                    wait = self._take_local()
+                if take and wait == 0:
+                    # The token is spent even if this caller gave up while Redis answered
+                    if self._waiters:
+                        _, _, future = heapq.heappop(self._waiters)
+                        if not future.done():
+                            future.set_result(None)
+                elif self._waiters:
+                    await asyncio.sleep(max(paused, wait or 0.0))
+        finally:
+            self._dispatcher = None
+
+    def _schedule(self):
+        """Arrange for _dispatch to run when the next waiter can go."""
+        if self.shared is not None:
+            if self._dispatcher is None:
+                self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch_shared())
+            return
+        if not self._waiters:
+            return
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        now = self._clock()
+        delay = max(self._paused_until - now, (1 - self._tokens) / self.rate if self.rate > 0 else 1.0, 0.0)
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def pause(self, seconds: float):
+        """Hold every lane for ``seconds``."""
+        until = self._clock() + seconds
+        self._shared_pause_until = max(self._shared_pause_until, time.time() + seconds)
+        if until > self._paused_until:
+            self._paused_until = until
+            self.pauses += 1
+            logger.warning(f"AT Protocol rate limit reached, pausing upstream calls for {seconds:.1f}s")
+        self._schedule()
+
+    def observe(self, response: httpx.Response) -> Optional[float]:
+        """
+        Update the bucket from a response's rate limit headers.
+
+        Returns:
+            Seconds to wait before retrying if the response was a 429, else None
+        """
+        headers = response.headers
+        limit = _header_int(headers, "ratelimit-limit")
+        remaining = _header_int(headers, "ratelimit-remaining")
+        reset = _header_int(headers, "ratelimit-reset")
+        window = _POLICY_WINDOW.search(headers.get("ratelimit-policy", ""))
+
+        # Tokens earned so far accrue at the old rate, before it is retuned
+        self._refill()
+        if limit is not None:
+            self.limit = limit
+            if window:
+                self.rate = max(limit / int(window.group(1)) * self.headroom, 0.01)
+        if remaining is not None:
+            self.remaining = remaining
+            self._tokens = min(self._tokens, float(remaining))
+            self._shared_cap = remaining
+        reset_in = None
+        if reset is not None:
+            self.reset_at = float(reset)
+            reset_in = max(0.0, reset - time.time())
+
+        if response.status_code == 429:
+            self.throttled += 1
+            retry_after = _header_int(headers, "retry-after")
+            delay = retry_after if retry_after is not None else (reset_in if reset_in is not None else 1.0)
+            self.pause(delay)
+            return delay
+        if remaining == 0 and reset_in:
+            self.pause(reset_in)
+        return None
+
+    def stats(self) -> dict:
+        """Return bucket state, upstream rate limit headers and per-lane wait times."""
+        self._refill()
+        queued = {lane: 0 for lane in _LANES.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                queued[_LANES.get(priority, "bulk")] += 1
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "shared": self.shared is not None,
+            "shared_errors": self.shared.errors if self.shared is not None else 0,
+            "tokens": self._tokens,
+            "paused_for_seconds": max(0.0, self._paused_until - self._clock()),
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "pauses": self.pauses,
+            "upstream_limit": self.limit,
+            "upstream_remaining": self.remaining,
+            "upstream_reset_at": self.reset_at,
+            "lanes": {
+                lane: {
+                    "queued": queued[lane],
+                    "requests": self.waits[lane],
+                    "total_wait_seconds": self.wait_seconds[lane],
+                    "max_wait_seconds": self.max_wait_seconds[lane],
+                    "avg_wait_seconds": (self.wait_seconds[lane] / self.waits[lane]) if self.waits[lane] else 0.0,
+                }
+                for lane in _LANES.values()
+            },
+        }
+
+
+def _request_key(nsid: str, params: Dict[str, Any]) -> Tuple:
+    return (nsid,) + tuple(
+        (name, tuple(value) if isinstance(value, list) else value) for name, value in sorted(params.items())
+    )
+
+
+class AtprotoClient:
+    """
+    Async XRPC client for the AT Protocol with a pooled HTTP connection.
+
+    One instance is shared by every request in the process: requests reuse
+    keep-alive connections from a bounded pool, and the session is created
+    and refreshed under a lock so concurrent callers never log in twice.
+
+    Sessions live in a SessionStore shared with other workers, so a process
+    adopts the stored session rather than logging in, and logins and
+    refreshes are serialized across processes. Access tokens are refreshed
+    once they are within ``refresh_margin`` seconds of expiry, preferring
+    the refresh token over a full login. Calls that still fail with an
+    expired or invalid token refresh the session once and retry.
+
+    Queries are paced by an UpstreamScheduler, retried after 429s, and
+    identical queries already in flight are coalesced into one upstream call.
+    """
+
+    def __init__(
+        self,
+        handle: str,
+        password: str,
+        service_url: str = "https://bsky.social",
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        scheduler: Optional[UpstreamScheduler] = None,
+        max_retries: int = 3,
+        session_store: Optional[SessionStore] = None,
+        refresh_margin: float = 300.0,
+    ):
+        self.handle = handle
+        self._password = password
+        self._http = httpx.AsyncClient(
+            base_url=f"{service_url.rstrip('/')}/xrpc/",
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            follow_redirects=True,
+        )
+        self._session_lock = asyncio.Lock()
+        self._access_jwt: Optional[str] = None
+        self._refresh_jwt: Optional[str] = None
+        self._access_expires_at: Optional[float] = None
+        self.session_store = session_store or SessionStore()
+        self.refresh_margin = refresh_margin
+        # Bumped on every new token so waiters can tell someone else refreshed
+        self._session_generation = 0
+        self.did: Optional[str] = None
+        self.scheduler = scheduler or UpstreamScheduler()
+        self.max_retries = max_retries
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}
+        self.coalesced = 0
+        self.session_counts = {"created": 0, "refreshed": 0, "adopted": 0}
+
+    @staticmethod
+    def _raise_for_error(response: httpx.Response):
+        if response.is_success:
+            return
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        raise AtprotoError(response.status_code, body.get("error"), body.get("message") or response.text or None)
+
+    def _store_session(self, session: Dict[str, Any]):
+        self._access_jwt = session["accessJwt"]
+        self._refresh_jwt = session["refreshJwt"]
+        self._access_expires_at = token_expiry(self._access_jwt)
+        self.did = session.get("did", self.did)
+        self._session_generation += 1
+
+    def _is_fresh(self, access_jwt: Optional[str]) -> bool:
+        """Whether an access token is usable for more than the refresh margin."""
+        if not access_jwt:
+            return False
+        expires_at = token_expiry(access_jwt)
+        # Tokens without a readable expiry are used until the service rejects them
+        return expires_at is None or expires_at - time.time() > self.refresh_margin
+
+    def _stored_session(self, stored: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not stored or stored.get("handle") != self.handle or not stored.get("accessJwt"):
+            return None
+        return stored
+
+    async def _save_session(self):
+        await self.session_store.save({
+            "handle": self.handle,
+            "did": self.did,
+            "accessJwt": self._access_jwt,
+            "refreshJwt": self._refresh_jwt,
+        })
+
+    async def login(self):
+        """Create a new session with the handle and app password."""
+        async with self._session_lock:
+            async with self.session_store.lock():
+                await self._create_session()
+
+    async def _create_session(self):
+        response = await self._http.post(
+            "com.atproto.server.createSession",
+            json={"identifier": self.handle, "password": self._password},
+        )
+        self._raise_for_error(response)
+        self._store_session(response.json())
+        self.session_counts["created"] += 1
+        await self._save_session()
+        logger.info(f"AT Protocol session created for {self.handle}")
+
+    async def _renew_session(self, rejected_jwt: Optional[str]):
+        """
+        Replace the current access token, holding the shared store lock.
+
+        A fresh token another process already stored is adopted as is;
+        otherwise the newest known refresh token is spent, falling back to
+        a full login if the refresh fails.
+
+        Args:
+            rejected_jwt: Access token the service just rejected, never adopted again
+        """
+        async with self.session_store.lock():
+            stored = self._stored_session(await self.session_store.load())
+            if stored and stored["accessJwt"] not in (rejected_jwt, self._access_jwt) and self._is_fresh(stored["accessJwt"]):
+                self._store_session(stored)
+                self.session_counts["adopted"] += 1
+                return
+
+            # Refresh tokens rotate, so the stored one is the newest if another process refreshed
+            refresh_jwt = (stored or {}).get("refreshJwt") or self._refresh_jwt
+            if refresh_jwt:
+                response = await self._http.post(
+                    "com.atproto.server.refreshSession",
+                    headers={"Authorization": f"Bearer {refresh_jwt}"},
+                )
+                try:
+                    self._raise_for_error(response)
+                    self._store_session(response.json())
+                    self.session_counts["refreshed"] += 1
+                    await self._save_session()
+                    logger.debug(f"AT Protocol session refreshed for {self.handle}")
+                    return
+                except AtprotoError as e:
+                    logger.info(f"AT Protocol session refresh failed ({e}), logging in again")
+            await self._create_session()
+
+    async def _refresh_session(self, stale_generation: int):
+        """Refresh the session unless another caller already did since ``stale_generation``."""
+        async with self._session_lock:
+            if self._session_generation != stale_generation:
+                return
+            await self._renew_session(rejected_jwt=self._access_jwt)
+
+    async def ensure_session(self):
+        """
+        Make sure a usable access token is held, without logging in if possible.
+
+        A process starting cold adopts the session other workers stored; a
+        token close to expiry is refreshed ahead of time so no call has to
+        fail first.
+        """
+        if self._is_fresh(self._access_jwt):
+            return
+        async with self._session_lock:
+            if self._is_fresh(self._access_jwt):
+                return
+            if self._access_jwt is None:
+                # Cheap path for a cold start: no lock needed just to read
+                stored = self._stored_session(await self.session_store.load())
+                if stored and self._is_fresh(stored["accessJwt"]):
+                    self._store_session(stored)
+                    self.session_counts["adopted"] += 1
+                    logger.info(f"AT Protocol session for {self.handle} loaded from the session store")
+                    return
+            await self._renew_session(rejected_jwt=None)
+
+    def session_stats(self) -> dict:
+        """Return how sessions were obtained and when the access token expires."""
+        return {
+            "store": type(self.session_store).__name__,
+            "access_expires_in_seconds": (
+                self._access_expires_at - time.time() if self._access_expires_at is not None else None
+            ),
+            **self.session_counts,
+        }
+
+    async def query(self, nsid: str, priority: int = PRIORITY_INTERACTIVE, **params) -> Dict[str, Any]:
+        """
+        Call an XRPC query (GET) method.
+
+        Concurrent calls with the same method and parameters share one
+        upstream request; the returned dict is shared and must not be mutated.
+
+        Args:
+            nsid: Method NSID, e.g. ``app.bsky.graph.getFollows``
+            priority: Scheduler lane, PRIORITY_INTERACTIVE or PRIORITY_BULK
+            **params: Query parameters; None values are omitted
+
+        Returns:
+            Decoded JSON response body
+
+        Raises:
+            AtprotoError: For XRPC error responses
+            httpx.HTTPError: For network errors and timeouts
+        """
+        params = {name: value for name, value in params.items() if value is not None}
+        key = _request_key(nsid, params)
+        shared = self._in_flight.get(key)
+        if shared is not None:
+            self.coalesced += 1
+        else:
+            shared = asyncio.ensure_future(self._query(nsid, params, priority))
+            self._in_flight[key] = shared
+            shared.add_done_callback(lambda task: self._query_done(key, task))
+        # One caller giving up must not cancel the request for the others
+        return await asyncio.shield(shared)
+
+    def _query_done(self, key: Tuple, task: asyncio.Future):
+        """Forget a finished shared query and mark its error as seen, even if every caller gave up."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def _query(self, nsid: str, params: Dict[str, Any], priority: int) -> Dict[str, Any]:
+        await self.ensure_session()
+
+        refreshed = False
+        retries = 0
+        while True:
+            await self.scheduler.acquire(priority)
+            generation = self._session_generation
+            started = time.perf_counter()
+            try:
+                response = await self._http.get(
+                    nsid, params=params, headers={"Authorization": f"Bearer {self._access_jwt}"}
+                )
+            except httpx.HTTPError as e:
+                metrics.observe_upstream(nsid, time.perf_counter() - started, type(e).__name__)
+                raise
+            metrics.observe_upstream(
+                nsid, time.perf_counter() - started, None if response.is_success else str(response.status_code)
+            )
+            retry_after = self.scheduler.observe(response)
+            if retry_after is not None and retries < self.max_retries:
+                # The scheduler is paused until the window resets; acquire waits it out
+                retries += 1
+                continue
+            try:
+                self._raise_for_error(response)
+            except AtprotoError as e:
+                if not refreshed and e.is_token_error:
+                    refreshed = True
+                    await self._refresh_session(generation)
+                    continue
+                raise
+            return response.json()
+
+    async def get_follows(
+        self, actor: str, limit: int = 100, cursor: Optional[str] = None, priority: int = PRIORITY_BULK
+    ) -> Dict[str, Any]:
+        return await self.query("app.bsky.graph.getFollows", priority=priority, actor=actor, limit=limit, cursor=cursor)
+
+    async def get_followers(
+        self, actor: str, limit: int = 100, cursor: Optional[str] = None, priority: int = PRIORITY_BULK
+    ) -> Dict[str, Any]:
+        return await self.query("app.bsky.graph.getFollowers", priority=priority, actor=actor, limit=limit, cursor=cursor)
+
+    async def resolve_handle(self, handle: str) -> Dict[str, Any]:
+        return await self.query("com.atproto.identity.resolveHandle", handle=handle)
+
+    async def get_profile(self, actor: str) -> Dict[str, Any]:
+        return await self.query("app.bsky.actor.getProfile", actor=actor)
+
+    async def get_profiles(self, actors: List[str]) -> Dict[str, Any]:
+        return await self.query("app.bsky.actor.getProfiles", actors=actors)
+
+    async def aclose(self):
+        """Close pooled connections."""
+        await self._http.aclose()
+
+
+def create_shared_rate_bucket(enabled: bool, handle: str, redis_url: Optional[str]) -> Optional[SharedRateBucket]:
+    """
+    Build the Redis rate bucket for an account, if ATPROTO_RATE_SHARED is on.
+
+    Returns:
+        SharedRateBucket, or None to pace this process on its own
+    """
+    if not enabled:
+        return None
+    if not HAS_REDIS or not redis_url:
+        logger.warning("redis is not available, the AT Protocol rate limit will be paced per process")
+        return None
+    return SharedRateBucket(redis_url, f"skytorch:atproto:ratelimit:{handle.lower()}")
 
 
 # Global client instance (lazy loaded)
-_atproto_client: Optional[object] = None
+_atproto_client: Optional[AtprotoClient] = None
 
 
-def get_atproto_client(
+async def get_atproto_client(
     handle: Optional[str] = None,
     password: Optional[str] = None,
     force_refresh: bool = False
-) -> Optional[object]:
+) -> Optional[AtprotoClient]:
     """
-    Get or create an AT Protocol client.
-    
+    Get or create the shared AT Protocol client.
+
     Args:
         handle: Bluesky handle (e.g., 'user.bsky.social')
         password: App password for authentication
         force_refresh: Force re-authentication even if client exists
-        
+
     Returns:
         Authenticated AT Protocol client, or None if credentials not provided
-        
+
     Raises:
-        ImportError: If atproto is not installed
+        AtprotoError: If logging in fails
     """
     global _atproto_client
-    
-    if not HAS_ATPROTO:
-        raise ImportError(
-            "atproto is not installed. Install it with: pip install atproto"
-        )
-    
+
     # Use environment variables if not provided
     handle = handle or os.getenv("ATPROTO_HANDLE")
     password = password or os.getenv("ATPROTO_PASSWORD")
-    
+
     if not handle or not password:
         return None
-    
-    # Force refresh or create new client if needed
-    if force_refresh or _atproto_client is None:
-        _atproto_client = Client()
-        _atproto_client.login(handle, password)
-    
+
+    if _atproto_client is None:
+        settings = get_settings()
+        _atproto_client = AtprotoClient(
+            handle,
+            password,
+            service_url=settings.atproto_service_url,
+            max_connections=settings.atproto_max_connections,
+            max_keepalive_connections=settings.atproto_max_keepalive_connections,
+            timeout=settings.atproto_timeout,
+            connect_timeout=settings.atproto_connect_timeout,
+            scheduler=UpstreamScheduler(
+                rate=settings.atproto_rate_limit,
+                burst=settings.atproto_rate_burst,
+                headroom=settings.atproto_rate_headroom,
+                shared=create_shared_rate_bucket(settings.atproto_rate_shared, handle, settings.redis_url),
+            ),
+            max_retries=settings.atproto_max_retries,
+            session_store=create_session_store(
+                settings.atproto_session_store,
+                handle,
+                redis_url=settings.redis_url,
+                path=settings.atproto_session_file,
+            ),
+            refresh_margin=settings.atproto_session_refresh_margin,
+        )
+
+    if force_refresh:
+        await _atproto_client.login()
+
     return _atproto_client
 
 
-def reset_atproto_client():
+async def reset_atproto_client():
     """
-    Reset the global AT Protocol client, forcing re-authentication on next use.
-    Use this when you get InvalidToken errors.
+    Close the global AT Protocol client, forcing re-authentication on next use.
     """
     global _atproto_client
-    _atproto_client = None
+    client, _atproto_client = _atproto_client, None
+    if client is not None:
+        await client.aclose()
 
 
-def initialize_atproto_client():
+async def initialize_atproto_client():
     """
-    Initialize AT Protocol client at startup if credentials are available.
+    Establish the AT Protocol session at startup if credentials are available.
+
+    A session stored by another worker or an earlier run is reused, so
+    restarts don't log in again.
     """
     try:
-        client = get_atproto_client()
+        client = await get_atproto_client()
         if client:
-            import logging
-            logger = logging.getLogger(__name__)
+            await client.ensure_session()
             logger.info("AT Protocol client initialized successfully")
-    except (ImportError, Exception) as e:
+    except Exception as e:
         # Log warning but don't fail startup
-        import logging
-        logger = logging.getLogger(__name__)
         logger.warning(f"AT Protocol client not available: {e}")
-
@@ -0,0 +1,185 @@
+"""Persistent AT Protocol sessions shared across worker processes and restarts."""
+
+import asyncio
+import base64
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+try:
+    import redis.asyncio as aioredis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+SESSION_STORE_REDIS = "redis"
+SESSION_STORE_FILE = "file"
+SESSION_STORE_NONE = "none"
+
+# Longest anyone waits on another process's login or refresh
+_LOCK_TIMEOUT = 30.0
+
+
+def token_expiry(jwt: Optional[str]) -> Optional[float]:
+    """
+    Read the ``exp`` claim of a JWT without verifying it.
+
+    Returns:
+        Expiry as a Unix timestamp, or None if the token has no readable expiry
+    """
+    if not jwt:
+        return None
+    try:
+        payload = jwt.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class SessionStore:
+    """
+    Shared storage for one account's session tokens.
+
+    ``lock`` serializes logins and refreshes across every process using the
+    store, so a rotated refresh token is only ever spent once. The base
+    class keeps nothing and locks nothing, for single-process deployments.
+    """
+
+    async def load(self) -> Optional[Dict[str, Any]]:
+        return None
+
+    async def save(self, session: Dict[str, Any]):
+        pass
+
+    @contextlib.asynccontextmanager
+    async def lock(self) -> AsyncIterator[None]:
+        yield
+
+
+class RedisSessionStore(SessionStore):
+    """Keep the session in Redis, guarded by a Redis lock."""
+
+    def __init__(self, redis_url: str, key: str, timeout: float = 2.0):
+        self.key = key
+        self._redis = aioredis.from_url(redis_url, socket_timeout=timeout, socket_connect_timeout=timeout)
+
+    async def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            value = await self._redis.get(self.key)
+        except Exception as e:
+            logger.warning(f"Could not load AT Protocol session from Redis: {e}")
+            return None
+        return json.loads(value) if value else None
+
+    async def save(self, session: Dict[str, Any]):
+        # Keep the session until its refresh token would have expired anyway
+        expires_at = token_expiry(session.get("refreshJwt"))
+        ttl = int(expires_at - time.time()) if expires_at else None
+        try:
+            await self._redis.set(self.key, json.dumps(session), ex=ttl if ttl and ttl > 0 else None)
+        except Exception as e:
+            logger.warning(f"Could not save AT Protocol session to Redis: {e}")
+
+    @contextlib.asynccontextmanager
+    async def lock(self) -> AsyncIterator[None]:
+        lock = self._redis.lock(f"{self.key}:lock", timeout=_LOCK_TIMEOUT, blocking_timeout=_LOCK_TIMEOUT)
+        try:
+            acquired = await lock.acquire()
+        except Exception as e:
+            # Redis being down must not stop this process from logging in
+            logger.warning(f"Could not take AT Protocol session lock: {e}")
+            acquired = False
+        try:
+            yield
+        finally:
+            if acquired:
+                try:
+                    await lock.release()
+                except Exception as e:
+                    logger.warning(f"Could not release AT Protocol session lock: {e}")
+
+
+class FileSessionStore(SessionStore):
+    """Keep the session in a JSON file, guarded by an flock on a sibling lock file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    async def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load AT Protocol session from {self.path}: {e}")
+            return None
+
+    async def save(self, session: Dict[str, Any]):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # The file holds credentials; write it private and swap it in atomically
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(session, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save AT Protocol session to {self.path}: {e}")
+
+    @contextlib.asynccontextmanager
+    async def lock(self) -> AsyncIterator[None]:
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        except OSError as e:
+            logger.warning(f"Could not open AT Protocol session lock: {e}")
+            yield
+            return
+        try:
+            deadline = time.monotonic() + _LOCK_TIMEOUT
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        logger.warning("Timed out waiting for AT Protocol session lock")
+                        break
+                    await asyncio.sleep(0.05)
+            yield
+        finally:
+            os.close(fd)
+
+
+def create_session_store(kind: str, handle: str, redis_url: Optional[str] = None, path: Optional[str] = None) -> SessionStore:
+    """
+    Build the session store selected by ATPROTO_SESSION_STORE.
+
+    Args:
+        kind: redis, file or none
+        handle: Account the session belongs to
+        redis_url: Redis URL for the redis store
+        path: Session file for the file store
+
+    Raises:
+        ValueError: If the store kind is unknown
+    """
+    if kind == SESSION_STORE_REDIS:
+        if not HAS_REDIS or not redis_url:
+            logger.warning("redis is not available, AT Protocol sessions will not be shared")
+            return SessionStore()
+        return RedisSessionStore(redis_url, f"skytorch:atproto:session:{handle.lower()}")
+    if kind == SESSION_STORE_FILE:
+        return FileSessionStore(path)
+    if kind == SESSION_STORE_NONE:
+        return SessionStore()
+    raise ValueError(f"Unknown ATPROTO_SESSION_STORE {kind!r}; expected redis, file or none")
@@ -0,0 +1,347 @@
+"""
+Re-embed ``article_chunks`` whose ``embedding_version`` differs from the current model's.
+
+    python -m skytorch.backfill
+    python -m skytorch.backfill --shards 4 --shard 0    # one of four parallel processes
+
+Rows are scanned in ``id`` order with keyset pagination (``id > last_id``),
+so every page costs the same no matter how far the scan has got. Each page
+is embedded in length-sorted batches and written back with one bulk
+``UPDATE ... FROM (VALUES ...)`` per page. After every committed page the
+position is saved to a checkpoint file, so a killed run picks up where it
+left off. Shards cover disjoint ``id`` ranges and keep their own
+checkpoints, so they can run side by side.
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+from skytorch.config import get_settings
+from skytorch.embed_worker import HAS_PSYCOPG2, embed_chunks, execute_values, psycopg2, vector_literal
+
+logger = logging.getLogger("skytorch.backfill")
+
+ID_RANGE_SQL = "SELECT min(id), max(id) FROM article_chunks"
+
+COUNT_SQL = """
+    SELECT count(*) FROM article_chunks
+    WHERE id > %s AND id <= %s AND embedding_version IS DISTINCT FROM %s
+"""
+
+PAGE_SQL = """
+    SELECT id, text FROM article_chunks
+    WHERE id > %s AND id <= %s AND embedding_version IS DISTINCT FROM %s
+    ORDER BY id
+    LIMIT %s
+"""
+
+UPDATE_SQL = """
+    UPDATE article_chunks AS chunks SET
+        embedding_vector = page.embedding_vector::vector,
+        embedding_version = page.embedding_version,
+        updated_at = now()
+    FROM (VALUES %s) AS page (id, embedding_vector, embedding_version)
+    WHERE chunks.id = page.id
+"""
+
+
+class BackfillRow(NamedTuple):
+    """A chunk to re-embed."""
+    id: int
+    text: str
+
+
+def shard_range(min_id: int, max_id: int, shards: int, shard: int) -> Tuple[int, int]:
+    """
+    The ``(after_id, last_id)`` range shard ``shard`` of ``shards`` covers.
+
+    Ranges split ``[min_id, max_id]`` into equal widths; a shard owns ids
+    with ``after_id < id <= last_id``.
+
+    Raises:
+        ValueError: If ``shard`` is not in ``[0, shards)``
+    """
+    if shards < 1 or not 0 <= shard < shards:
+        raise ValueError(f"Shard {shard} is out of range for {shards} shards")
+    width = max_id - min_id + 1
+    after_id = min_id - 1 + width * shard // shards
+    last_id = min_id - 1 + width * (shard + 1) // shards
+    return after_id, last_id
+
+
+def format_duration(seconds: float) -> str:
+    """Render seconds as e.g. ``2h05m`` or ``4m30s``."""
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+
+class Checkpoint:
+    """The last committed ``id`` of one shard, kept in a JSON file written atomically."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def load(self) -> Optional[dict]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, state: dict):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix(".tmp")
+        with open(temporary, "w") as f:
+            json.dump(state, f)
+        os.replace(temporary, self.path)
+
+
+class Backfill:
+    """
+    Re-embed one shard of ``article_chunks`` to ``target_version``.
+
+    Each page is read, embedded and written in its own transaction; the
+    checkpoint moves only after the write commits.
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        model_name: str,
+        target_version: str,
+        after_id: int,
+        last_id: int,
+        checkpoint: Checkpoint,
+        page_size: int = 2048,
+        batch_size: int = 128,
+        progress_interval: float = 10.0,
+        label: str = "backfill",
+    ):
+        """
+        Args:
+            database_url: Postgres holding ``article_chunks``
+            model_name: Sentence transformer model to embed with
+            target_version: ``embedding_version`` written with the new vectors
+            after_id: Start after this id (exclusive)
+            last_id: Stop at this id (inclusive)
+            checkpoint: Where the position is saved and resumed from
+            page_size: Rows read, embedded and written per transaction
+            batch_size: Texts per forward pass
+            progress_interval: Seconds between progress lines
+            label: Name of this shard in progress lines
+
+        Raises:
+            ImportError: If psycopg2 is not installed
+        """
+        if not HAS_PSYCOPG2:
+            raise ImportError("psycopg2 is not installed. Install it with: pip install psycopg2-binary")
+
+        self.database_url = database_url
+        self.model_name = model_name
+        self.target_version = target_version
+        self.after_id = after_id
+        self.last_id = last_id
+        self.checkpoint = checkpoint
+        self.page_size = max(1, page_size)
+        self.batch_size = max(1, batch_size)
+        self.progress_interval = progress_interval
+        self.label = label
+
+        self.rows = 0
+        self._should_exit = False
+
+    def stop(self, *args):
+        """Finish the current page, save the checkpoint, then exit."""
+        self._should_exit = True
+
+    def _resume_position(self) -> int:
+        state = self.checkpoint.load()
+        if not state:
+            return self.after_id
+        if state.get("target_version") != self.target_version or state.get("last_id") != self.last_id:
+            logger.warning(f"Ignoring checkpoint {self.checkpoint.path}: it is for a different version or id range")
+            return self.after_id
+        self.rows = state.get("rows", 0)
+        logger.info(f"{self.label}: resuming after id {state['position']} ({self.rows} rows already done)")
+        return max(self.after_id, state["position"])
+
+    def _fetch_page(self, conn, position: int) -> List[BackfillRow]:
+        with conn.cursor() as cur:
+            cur.execute(PAGE_SQL, (position, self.last_id, self.target_version, self.page_size))
+            rows = [BackfillRow(*row) for row in cur.fetchall()]
+        conn.rollback()
+        return rows
+
+    def _write_page(self, conn, rows: List[BackfillRow], vectors):
+        values = [(row.id, vector_literal(vector), self.target_version) for row, vector in zip(rows, vectors)]
+        with conn:
+            with conn.cursor() as cur:
+                execute_values(cur, UPDATE_SQL, values, template="(%s, %s, %s)", page_size=len(values))
+
+    def _report(self, done: int, remaining: int, started: float, position: int):
+        elapsed = time.monotonic() - started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        left = max(0, remaining - done)
+        eta = format_duration(left / rate) if rate > 0 else "unknown"
+        percent = done / remaining * 100 if remaining else 100.0
+        logger.info(
+            f"{self.label}: {done}/{remaining} rows ({percent:.1f}%), {rate:.0f} rows/s, "
+            f"ETA {eta}, at id {position}"
+        )
+
+    def run(self) -> int:
+        """
+        Re-embed the shard, checkpointing after every page.
+
+        Returns:
+            Process exit status
+        """
+        from skytorch.nlp import get_sentence_transformer
+
+        get_sentence_transformer(self.model_name)
+        position = self._resume_position()
+        conn = psycopg2.connect(self.database_url)
+        try:
+            with conn.cursor() as cur:
+                cur.execute(COUNT_SQL, (position, self.last_id, self.target_version))
+                remaining = cur.fetchone()[0]
+            conn.rollback()
+            logger.info(
+                f"{self.label}: {remaining} rows in ids ({position}, {self.last_id}] to re-embed as {self.target_version}"
+            )
+
+            done = 0
+            started = time.monotonic()
+            next_report = started + self.progress_interval
+            while not self._should_exit:
+                rows = self._fetch_page(conn, position)
+                if not rows:
+                    break
+
+                # Shortest first, so forward batches pad as little as possible
+                by_length = sorted(rows, key=lambda row: len(row.text))
+                self._write_page(conn, by_length, embed_chunks(by_length, self.model_name, self.batch_size))
+
+                position = rows[-1].id
+                done += len(rows)
+                self.rows += len(rows)
+                self.checkpoint.save({
+                    "target_version": self.target_version,
+                    "after_id": self.after_id,
+                    "last_id": self.last_id,
+                    "position": position,
+                    "rows": self.rows,
+                    "updated_at": time.time(),
+                })
+                if time.monotonic() >= next_report:
+                    self._report(done, remaining, started, position)
+                    next_report = time.monotonic() + self.progress_interval
+
+            self._report(done, remaining, started, position)
+            if self._should_exit:
+                logger.info(f"{self.label}: stopped at id {position}; run again to resume")
+            else:
+                logger.info(f"{self.label}: done, {self.rows} rows re-embedded in total")
+        finally:
+            conn.close()
+        return 0
+
+
+def main() -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        prog="python -m skytorch.backfill",
+        description="Re-embed article chunks whose embedding_version differs from the current model's.",
+    )
+    parser.add_argument("--model-name", default=settings.embedding_model_name)
+    parser.add_argument("--target-version", help="embedding_version to write (default: the model's version)")
+    parser.add_argument("--shards", type=int, default=1, help="Split the id range into this many shards")
+    parser.add_argument("--shard", type=int, default=0, help="Which shard this process runs (0-based)")
+    parser.add_argument("--start-id", type=int, help="Only ids above this (overrides sharding)")
+    parser.add_argument("--end-id", type=int, help="Only ids up to this (overrides sharding)")
+    parser.add_argument("--page-size", type=int, default=2048, help="Rows per read/embed/write transaction")
+    parser.add_argument("--batch-size", type=int, default=128, help="Texts per forward pass")
+    parser.add_argument(
+        "--checkpoint-dir", default=os.path.expanduser("~/.cache/skytorch/backfill"),
+        help="Where shard checkpoints are kept",
+    )
+    parser.add_argument("--restart", action="store_true", help="Ignore any saved checkpoint")
+    parser.add_argument("--progress-interval", type=float, default=10.0, help="Seconds between progress lines")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    if not HAS_PSYCOPG2:
+        logger.error("psycopg2 is not installed. Install it with: pip install psycopg2-binary")
+        return 1
+
+    from skytorch.nlp import embedding_model_version
+
+    target_version = args.target_version or embedding_model_version(args.model_name)
+
+    if args.start_id is not None or args.end_id is not None:
+        name = f"range-{args.start_id}-{args.end_id}"
+    else:
+        name = f"shard-{args.shard}-of-{args.shards}"
+    checkpoint = Checkpoint(Path(args.checkpoint_dir) / f"{target_version.replace('/', '_')}-{name}.json")
+    if args.restart and checkpoint.path.exists():
+        checkpoint.path.unlink()
+
+    state = checkpoint.load()
+    if state and state.get("target_version") == target_version:
+        # Keep the range the shard started with, even if rows were added since
+        after_id, last_id = state["after_id"], state["last_id"]
+    else:
+        conn = psycopg2.connect(settings.database_url)
+        try:
+            with conn.cursor() as cur:
+                cur.execute(ID_RANGE_SQL)
+                min_id, max_id = cur.fetchone()
+        finally:
+            conn.close()
+        if min_id is None:
+            logger.info("article_chunks is empty; nothing to do")
+            return 0
+        try:
+            after_id, last_id = shard_range(min_id, max_id, args.shards, args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.start_id is not None:
+            after_id = args.start_id
+        if args.end_id is not None:
+            last_id = args.end_id
+
+    label = f"shard {args.shard}/{args.shards}" if args.shards > 1 else "backfill"
+    backfill = Backfill(
+        settings.database_url,
+        args.model_name,
+        target_version,
+        after_id,
+        last_id,
+        checkpoint,
+        page_size=args.page_size,
+        batch_size=args.batch_size,
+        progress_interval=args.progress_interval,
+        label=label,
+    )
+    signal.signal(signal.SIGTERM, backfill.stop)
+    signal.signal(signal.SIGINT, backfill.stop)
+    return backfill.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
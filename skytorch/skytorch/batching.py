@@ -0,0 +1,160 @@
+"""Dynamic micro-batching for concurrent single-text embedding requests."""
+
+import asyncio
+import logging
+from collections import Counter
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+from skytorch.config import get_settings
+from skytorch.executor import get_inference_executor
+from skytorch.nlp import generate_embedding_batch
+
+logger = logging.getLogger(__name__)
+
+# Flush reasons reported in stats
+FLUSH_MAX_BATCH_SIZE = "max_batch_size"
+FLUSH_MAX_WAIT = "max_wait"
+
+
+class MicroBatcher:
+    """
+    Collect concurrent single-text embedding requests into batched encode calls.
+
+    Requests are queued per model. A queue is flushed as soon as it holds
+    ``max_batch_size`` texts, or ``max_wait_ms`` after its first text arrived,
+    whichever comes first. Each flush runs one batched encode on the inference
+    executor and resolves every caller's future with its own vector.
+    """
+
+    def __init__(
+        self,
+        encode_batch: Callable[[List[str], str], List[List[float]]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        """
+        Args:
+            encode_batch: Picklable function taking (texts, model_name) and returning vectors in order
+            max_batch_size: Flush a queue once it holds this many texts
+            max_wait_ms: Flush a queue this long after its first text arrived
+        """
+        self.encode_batch = encode_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+
+        self._pending: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+
+        self.flush_reasons: Counter = Counter()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    async def submit(self, text: str, model_name: str) -> List[float]:
+        """
+        Queue a text for embedding and wait for its vector.
+
+        Args:
+            text: Input text to generate embedding for
+            model_name: Name of the sentence transformer model to use
+
+        Returns:
+            Embedding vector for ``text``
+
+        Raises:
+            ValueError: If text is empty or invalid
+        """
+        if not text or not text.strip():
+            raise ValueError("Text cannot be empty")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(model_name, [])
+        pending.append((text, future))
+
+        if len(pending) >= self.max_batch_size:
+            self._flush(model_name, FLUSH_MAX_BATCH_SIZE)
+        elif len(pending) == 1:
+            self._timers[model_name] = loop.call_later(
+                self.max_wait_ms / 1000.0, self._flush, model_name, FLUSH_MAX_WAIT
+            )
+
+        return await future
+
+    def _flush(self, model_name: str, reason: str):
+        """Hand the queued texts for a model to a background encode task."""
+        timer = self._timers.pop(model_name, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self._pending.pop(model_name, None)
+        if not batch:
+            return
+
+        self.flush_reasons[reason] += 1
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+        task = asyncio.ensure_future(self._run_batch(model_name, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, model_name: str, batch: List[Tuple[str, asyncio.Future]]):
+        """Encode one flushed batch and resolve its callers' futures."""
+        texts = [text for text, _ in batch]
+        try:
+            embeddings = await get_inference_executor().run(self.encode_batch, texts, model_name)
+        except Exception as e:
+            logger.warning(f"Micro-batch of {len(texts)} texts for {model_name} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), embedding in zip(batch, embeddings):
+            # Callers that disconnected have already cancelled their future
+            if not future.done():
+                future.set_result(embedding)
+
+    def stats(self) -> dict:
+        """Return batching counters, including how often each flush reason fired."""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": self.batches,
+            "items": self.items,
+            "average_batch_size": (self.items / self.batches) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "flush_reasons": {
+                FLUSH_MAX_BATCH_SIZE: self.flush_reasons[FLUSH_MAX_BATCH_SIZE],
+                FLUSH_MAX_WAIT: self.flush_reasons[FLUSH_MAX_WAIT],
+            },
+            "queued": {model: len(items) for model, items in self._pending.items()},
+        }
+
+
+# Global batcher instance (lazy loaded)
+_embedding_batcher: Optional[MicroBatcher] = None
+
+
+def get_embedding_batcher() -> MicroBatcher:
+    """
+    Get or create the micro-batcher used by the single-text embeddings endpoint.
+
+    Returns:
+        Shared MicroBatcher configured from settings
+    """
+    global _embedding_batcher
+
+    if _embedding_batcher is None:
+        settings = get_settings()
+        _embedding_batcher = MicroBatcher(
+            partial(generate_embedding_batch, batch_size=settings.embedding_batch_size),
+            max_batch_size=settings.embedding_microbatch_max_size,
+            max_wait_ms=settings.embedding_microbatch_max_wait_ms,
+        )
+
+    return _embedding_batcher
@@ -0,0 +1,230 @@
+"""Token-length bucketing for batched embedding inference, to cut padding waste."""
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+
+def parse_boundaries(value: str) -> Tuple[int, ...]:
+    """
+    Parse comma-separated bucket upper bounds in tokens, e.g. ``16,32,64,128,256``.
+
+    Raises:
+        ValueError: If a bound is not a positive integer
+    """
+    boundaries = sorted({int(item) for item in value.split(",") if item.strip()})
+    if any(boundary <= 0 for boundary in boundaries):
+        raise ValueError(f"Bucket boundaries must be positive token counts: {value!r}")
+    return tuple(boundaries)
+
+
+def bucket_label(length: int, boundaries: Sequence[int]) -> str:
+    """Name of the bucket a token length falls in, e.g. ``<=64``, or ``>256`` past the last bound."""
+    for boundary in boundaries:
+        if length <= boundary:
+            return f"<={boundary}"
+    return f">{boundaries[-1]}" if boundaries else "all"
+
+
+def plan_batches(lengths: Sequence[int], batch_size: int, boundaries: Sequence[int]) -> List[List[int]]:
+    """
+    Group input positions into batches of similar token length.
+
+    Positions are sorted by length and cut into batches of at most
+    ``batch_size``; a batch never spans two buckets, so a short text is
+    never padded to an article chunk's length.
+
+    Returns:
+        Batches of input positions, shortest first
+    """
+    order = sorted(range(len(lengths)), key=lambda index: lengths[index])
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_label = None
+    for index in order:
+        label = bucket_label(lengths[index], boundaries)
+        if current and (label != current_label or len(current) >= batch_size):
+            batches.append(current)
+            current = []
+        current.append(index)
+        current_label = label
+    if current:
+        batches.append(current)
+    return batches
+
+
+def padded_slots(lengths: Sequence[int], batches: Sequence[Sequence[int]]) -> int:
+    """Token slots computed when each batch is padded to its longest member."""
+    return sum(max(lengths[index] for index in batch) * len(batch) for batch in batches if batch)
+
+
+def encode_order_batches(text_lengths: Sequence[int], batch_size: int) -> List[List[int]]:
+    """
+    Batches ``SentenceTransformer.encode`` forms on its own, without bucketing.
+
+    ``encode`` sorts its inputs by character length, longest first, and
+    cuts that order into runs of ``batch_size``.
+
+    Args:
+        text_lengths: Character length of each input text
+        batch_size: Maximum texts per forward pass
+
+    Returns:
+        Batches of input positions
+    """
+    order = sorted(range(len(text_lengths)), key=lambda index: -text_lengths[index])
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+def _take(value: Any, positions: List[int], width: int) -> Any:
+    """Rows ``positions`` of a (batch, sequence) tensor or array, cut to ``width`` tokens."""
+    if getattr(value, "ndim", 0) != 2:
+        return value
+    return value[positions][:, :width]
+
+
+class BucketingStats:
+    """
+    Counters for how much padding bucketing computed across encode calls.
+
+    The baseline is what ``SentenceTransformer.encode`` would have padded
+    on its own, with its length-sorted batches, not batches in request
+    order, which encode never forms.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.batches = 0
+        self.texts = 0
+        self.tokens = 0
+        self.padded_tokens = 0
+        self.unbucketed_padded_tokens = 0
+        self.buckets: Dict[str, Dict[str, int]] = {}
+
+    def record(
+        self,
+        lengths: Sequence[int],
+        batches: Sequence[Sequence[int]],
+        batch_size: int,
+        boundaries: Sequence[int],
+        text_lengths: Sequence[int],
+    ):
+        """
+        Count one bucketed encode call.
+
+        Args:
+            lengths: Token length of each input
+            batches: Batches the call ran, as input positions
+            batch_size: Maximum texts per forward pass
+            boundaries: Bucket upper bounds in tokens
+            text_lengths: Character length of each input, which orders encode's own batches
+        """
+        unbucketed = encode_order_batches(text_lengths, batch_size)
+        with self._lock:
+            self.calls += 1
+            self.batches += len(batches)
+            self.texts += len(lengths)
+            self.tokens += sum(lengths)
+            self.padded_tokens += padded_slots(lengths, batches)
+            self.unbucketed_padded_tokens += padded_slots(lengths, unbucketed)
+            for batch in batches:
+                bucket = self.buckets.setdefault(
+                    bucket_label(lengths[batch[0]], boundaries), {"batches": 0, "texts": 0, "tokens": 0}
+                )
+                bucket["batches"] += 1
+                bucket["texts"] += len(batch)
+                bucket["tokens"] += sum(lengths[index] for index in batch)
+
+    def stats(self) -> dict:
+        """Return padding ratios with bucketing and with encode's own batching, and per-bucket counts."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "batches": self.batches,
+                "texts": self.texts,
+                "tokens": self.tokens,
+                "padded_tokens": self.padded_tokens,
+                "unbucketed_padded_tokens": self.unbucketed_padded_tokens,
+                # Share of computed token slots that were padding
+                "padding_ratio": (1 - self.tokens / self.padded_tokens) if self.padded_tokens else 0.0,
+                "unbucketed_padding_ratio": (
+                    (1 - self.tokens / self.unbucketed_padded_tokens) if self.unbucketed_padded_tokens else 0.0
+                ),
+                # Negative when splitting at bucket bounds padded more than encode would have
+                "padded_tokens_saved": self.unbucketed_padded_tokens - self.padded_tokens,
+                "buckets": {label: dict(bucket) for label, bucket in self.buckets.items()},
+            }
+
+
+def encode_bucketed(
+    model: Any,
+    texts: List[str],
+    forward,
+    batch_size: int = 32,
+    boundaries: Sequence[int] = (16, 32, 64, 128, 256),
+    normalize: bool = True,
+    stats: Optional[BucketingStats] = None,
+) -> "np.ndarray":
+    """
+    Embed texts in token-length buckets, returning vectors in input order.
+
+    The texts are tokenized once with the model's own ``tokenize``, which
+    right-pads every row to the longest text. Each batch then takes its
+    rows and cuts the columns to its own longest member, so the forward
+    pass only sees the padding that batch actually needs.
+
+    Args:
+        model: Encoder with a ``tokenize`` method returning padded (batch, sequence) features
+        texts: Input texts
+        forward: Callable running one batch of features through ``model``, returning float32 embeddings
+        batch_size: Maximum texts per forward pass
+        boundaries: Bucket upper bounds in tokens
+        normalize: L2-normalize the embeddings
+        stats: Where to record padding statistics
+
+    Returns:
+        float32 ``(len(texts), dim)`` matrix in input order
+    """
+    features = model.tokenize(texts)
+    lengths = [int(length) for length in features["attention_mask"].sum(1).tolist()]
+    batches = plan_batches(lengths, max(1, batch_size), boundaries)
+
+    embeddings = None
+    for batch in batches:
+        width = max(lengths[index] for index in batch)
+        vectors = forward(model, {name: _take(value, batch, width) for name, value in features.items()})
+        if embeddings is None:
+            embeddings = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+        embeddings[batch] = vectors
+
+    if embeddings is None:
+        return np.zeros((0, 0), dtype=np.float32)
+    if normalize:
+        embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+    if stats is not None:
+        stats.record(lengths, batches, max(1, batch_size), boundaries, [len(text) for text in texts])
+    return embeddings
+
+
+# Global stats instance (lazy loaded)
+_bucketing_stats: Optional[BucketingStats] = None
+_stats_lock = threading.Lock()
+
+
+def get_bucketing_stats() -> BucketingStats:
+    """Get the process-wide bucketing statistics."""
+    global _bucketing_stats
+
+    if _bucketing_stats is None:
+        with _stats_lock:
+            if _bucketing_stats is None:
+                _bucketing_stats = BucketingStats()
+
+    return _bucketing_stats
@@ -0,0 +1,149 @@
+"""Paragraph- and sentence-aware article chunking with real tokenizer counts."""
+
+import hashlib
+import re
+from typing import Callable, List, NamedTuple, Tuple
+
+# Same paragraph rule as feedbrainer's ArticleChunkingService
+_PARAGRAPH_BREAK = re.compile(r"\n\n+")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+_WHITESPACE = re.compile(r"\s+")
+
+# (start, end, token_count) of a piece of the source text
+_Span = Tuple[int, int, int]
+
+
+class Chunk(NamedTuple):
+    """A chunk of article text and where it sits in the source text."""
+    chunk_index: int
+    text: str
+    token_count: int
+    checksum: str
+    start: int
+    end: int
+
+
+def _split_spans(text: str, separator: re.Pattern, start: int, end: int) -> List[Tuple[int, int]]:
+    """Split ``text[start:end]`` on ``separator``, returning whitespace-trimmed non-empty spans."""
+    boundaries = []
+    position = start
+    for match in separator.finditer(text, start, end):
+        boundaries.append((position, match.start()))
+        position = match.end()
+    boundaries.append((position, end))
+
+    spans = []
+    for span_start, span_end in boundaries:
+        while span_start < span_end and text[span_start].isspace():
+            span_start += 1
+        while span_end > span_start and text[span_end - 1].isspace():
+            span_end -= 1
+        if span_start < span_end:
+            spans.append((span_start, span_end))
+    return spans
+
+
+def _counted(text: str, spans: List[Tuple[int, int]], count_tokens) -> List[_Span]:
+    counts = count_tokens([text[start:end] for start, end in spans])
+    return [(start, end, count) for (start, end), count in zip(spans, counts)]
+
+
+def _pack_words(text: str, start: int, end: int, count_tokens, target_tokens: int) -> List[_Span]:
+    """Break a sentence longer than the target into runs of whole words."""
+    words = _counted(text, _split_spans(text, _WHITESPACE, start, end), count_tokens)
+    pieces: List[_Span] = []
+    piece_start, piece_end, piece_tokens = None, None, 0
+    for word_start, word_end, word_tokens in words:
+        if piece_start is not None and piece_tokens + word_tokens > target_tokens:
+            pieces.append((piece_start, piece_end, piece_tokens))
+            piece_start, piece_tokens = None, 0
+        if piece_start is None:
+            piece_start = word_start
+        piece_end = word_end
+        piece_tokens += word_tokens
+    if piece_start is not None:
+        pieces.append((piece_start, piece_end, piece_tokens))
+    return pieces
+
+
+def _split_paragraph(
+    text: str, start: int, end: int, count_tokens, target_tokens: int, overlap_tokens: int
+) -> List[_Span]:
+    """Split a long paragraph into overlapping windows of whole sentences."""
+    units: List[_Span] = []
+    for sentence in _counted(text, _split_spans(text, _SENTENCE_BREAK, start, end), count_tokens):
+        if sentence[2] <= target_tokens:
+            units.append(sentence)
+        else:
+            units.extend(_pack_words(text, sentence[0], sentence[1], count_tokens, target_tokens))
+
+    windows: List[_Span] = []
+    first = 0
+    while first < len(units):
+        last = first
+        tokens = 0
+        while last < len(units) and (last == first or tokens + units[last][2] <= target_tokens):
+            tokens += units[last][2]
+            last += 1
+        windows.append((units[first][0], units[last - 1][1], tokens))
+        if last >= len(units):
+            break
+
+        # Start the next window with trailing sentences of this one, up to the
+        # overlap budget, but always move forward by at least one sentence.
+        next_first = last
+        overlap = 0
+        while next_first - 1 > first and overlap + units[next_first - 1][2] <= overlap_tokens:
+            overlap += units[next_first - 1][2]
+            next_first -= 1
+        first = next_first
+
+    return windows
+
+
+def chunk_text(
+    text: str,
+    count_tokens: Callable[[List[str]], List[int]],
+    target_tokens: int = 256,
+    overlap_ratio: float = 0.12,
+) -> List[Chunk]:
+    """
+    Split cleaned article text into embedding-sized chunks.
+
+    Paragraphs that fit within ``target_tokens`` become one chunk each.
+    Longer paragraphs are split into windows of whole sentences that overlap
+    by about ``overlap_ratio`` of the target; sentences that alone exceed the
+    target are split on word boundaries.
+
+    Args:
+        text: Cleaned article text
+        count_tokens: Function returning the token count of each text in a list
+        target_tokens: Maximum tokens per chunk
+        overlap_ratio: Fraction of ``target_tokens`` repeated between windows
+
+    Returns:
+        Chunks in document order, with character offsets into ``text`` and
+        SHA-256 checksums of the chunk text
+    """
+    overlap_tokens = int(target_tokens * overlap_ratio)
+    spans: List[_Span] = []
+    for start, end, tokens in _counted(
+        text, _split_spans(text, _PARAGRAPH_BREAK, 0, len(text)), count_tokens
+    ):
+        if tokens <= target_tokens:
+            spans.append((start, end, tokens))
+        else:
+            spans.extend(_split_paragraph(text, start, end, count_tokens, target_tokens, overlap_tokens))
+
+    chunks = []
+    for chunk_index, (start, end, tokens) in enumerate(spans):
+        chunk = text[start:end]
+        chunks.append(Chunk(
+            chunk_index=chunk_index,
+            text=chunk,
+            token_count=tokens,
+            checksum=hashlib.sha256(chunk.encode("utf-8")).hexdigest(),
+            start=start,
+            end=end,
+        ))
+    return chunks
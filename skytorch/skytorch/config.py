@@ -18,6 +18,7 @@ class Settings(BaseSettings):
     # Application
     environment: str = os.getenv("ENVIRONMENT", "development")
     debug: bool = os.getenv("DEBUG", "false").lower() == "true"
+    skytorch_role: str = os.getenv("SKYTORCH_ROLE", "all")  # all, nlp (models) or graph (AT Protocol only)
 
     # Database
     postgres_host: str = os.getenv("POSTGRES_HOST", "postgres")
@@ -37,6 +38,128 @@ class Settings(BaseSettings):
     # Redis
     redis_url: str = os.getenv("REDIS_URL", "redis://redis:6379/0")
 
+    # Models
+    spacy_model_name: str = os.getenv("SPACY_MODEL_NAME", "en_core_web_sm")
+    embedding_model_name: str = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+    embedding_model_revision: str = os.getenv("EMBEDDING_MODEL_REVISION", "")  # Hub commit hash or tag pinning EMBEDDING_MODEL_NAME
+    warmup_enabled: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    warmup_max_attempts: int = int(os.getenv("WARMUP_MAX_ATTEMPTS", "5"))  # then /health/live fails so the instance is restarted
+    warmup_retry_backoff: float = float(os.getenv("WARMUP_RETRY_BACKOFF", "2"))  # seconds, doubled after each failed attempt
+    model_device: str = os.getenv("MODEL_DEVICE", "cpu")
+    model_precision: str = os.getenv("MODEL_PRECISION", "float32")  # float32, float16 or bfloat16
+    embedding_backend: str = os.getenv("EMBEDDING_BACKEND", "torch")  # torch, torch_int8, onnx or onnx_int8
+    embedding_backends: str = os.getenv("EMBEDDING_BACKENDS", "")  # per-model overrides, e.g. "all-MiniLM-L6-v2=onnx_int8"
+    onnx_export_dir: str = os.getenv("ONNX_EXPORT_DIR", os.path.expanduser("~/.cache/skytorch/onnx"))
+    model_memory_budget_mb: int = int(os.getenv("MODEL_MEMORY_BUDGET_MB", "4096"))  # 0 = unlimited
+    model_preload: str = os.getenv("MODEL_PRELOAD", "")  # e.g. "spacy:en_core_web_sm,sentence_transformer:all-MiniLM-L6-v2"
+    allowed_models: str = os.getenv("ALLOWED_MODELS", "")  # sentence transformers requests may name, besides EMBEDDING_MODEL_NAME, MODEL_PRELOAD and EMBEDDING_BACKENDS
+
+    # Embeddings
+    embedding_batch_size: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+    embedding_batch_max_items: int = int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", "256"))
+    embedding_microbatch_enabled: bool = os.getenv("EMBEDDING_MICROBATCH_ENABLED", "true").lower() == "true"
+    embedding_microbatch_max_size: int = int(os.getenv("EMBEDDING_MICROBATCH_MAX_SIZE", "32"))
+    embedding_microbatch_max_wait_ms: float = float(os.getenv("EMBEDDING_MICROBATCH_MAX_WAIT_MS", "5"))
+    embedding_length_bucketing: bool = os.getenv("EMBEDDING_LENGTH_BUCKETING", "true").lower() == "true"
+    embedding_bucket_boundaries: str = os.getenv("EMBEDDING_BUCKET_BOUNDARIES", "16,32,64,128,256")  # token-length bucket upper bounds
+    embedding_stream_batch_size: int = int(os.getenv("EMBEDDING_STREAM_BATCH_SIZE", "64"))
+    embedding_stream_pipeline_depth: int = int(os.getenv("EMBEDDING_STREAM_PIPELINE_DEPTH", "2"))
+    embedding_stream_progress_every: int = int(os.getenv("EMBEDDING_STREAM_PROGRESS_EVERY", "1000"))
+
+    # Article analysis
+    chunk_target_tokens: int = int(os.getenv("CHUNK_TARGET_TOKENS", "256"))
+    chunk_overlap_ratio: float = float(os.getenv("CHUNK_OVERLAP_RATIO", "0.12"))
+    analyze_max_chars: int = int(os.getenv("ANALYZE_MAX_CHARS", "200000"))
+
+    # Embedding worker (python -m skytorch.embed_worker)
+    embed_worker_stream: str = os.getenv("EMBED_WORKER_STREAM", "skytorch:articles:embed")
+    embed_worker_group: str = os.getenv("EMBED_WORKER_GROUP", "skytorch-embed")
+    embed_worker_consumer: str = os.getenv("EMBED_WORKER_CONSUMER", "")  # defaults to hostname-pid
+    embed_worker_read_count: int = int(os.getenv("EMBED_WORKER_READ_COUNT", "64"))  # articles per batch
+    embed_worker_batch_size: int = int(os.getenv("EMBED_WORKER_BATCH_SIZE", "128"))  # texts per forward pass
+    embed_worker_block_ms: int = int(os.getenv("EMBED_WORKER_BLOCK_MS", "5000"))
+    embed_worker_claim_idle_ms: int = int(os.getenv("EMBED_WORKER_CLAIM_IDLE_MS", "300000"))
+    embed_worker_max_deliveries: int = int(os.getenv("EMBED_WORKER_MAX_DELIVERIES", "5"))
+
+    # Vector search
+    vector_index_enabled: bool = os.getenv("VECTOR_INDEX_ENABLED", "false").lower() == "true"
+    vector_index_embedding_version: str = os.getenv("VECTOR_INDEX_EMBEDDING_VERSION", "")  # defaults to the embedding model's version
+    vector_index_dtype: str = os.getenv("VECTOR_INDEX_DTYPE", "float16")  # float16 or float32
+    vector_index_snapshot_dir: str = os.getenv("VECTOR_INDEX_SNAPSHOT_DIR", "")  # empty disables snapshots
+    vector_index_mmap: bool = os.getenv("VECTOR_INDEX_MMAP", "true").lower() == "true"
+    vector_index_refresh_interval: float = float(os.getenv("VECTOR_INDEX_REFRESH_INTERVAL", "60"))  # seconds; 0 loads once
+    vector_index_refresh_overlap: float = float(os.getenv("VECTOR_INDEX_REFRESH_OVERLAP", "120"))  # seconds re-read behind the watermark for late commits
+    vector_index_reconcile_interval: float = float(os.getenv("VECTOR_INDEX_RECONCILE_INTERVAL", "3600"))  # seconds between id scans for deleted chunks; 0 disables
+    vector_index_rebuild_interval: float = float(os.getenv("VECTOR_INDEX_REBUILD_INTERVAL", "86400"))  # seconds between full rebuilds and re-saved snapshots; 0 disables
+    vector_index_page_size: int = int(os.getenv("VECTOR_INDEX_PAGE_SIZE", "10000"))
+    vector_index_max_k: int = int(os.getenv("VECTOR_INDEX_MAX_K", "1000"))
+    vector_index_ann: str = os.getenv("VECTOR_INDEX_ANN", "none")  # none or hnsw
+    vector_index_ann_min_size: int = int(os.getenv("VECTOR_INDEX_ANN_MIN_SIZE", "100000"))  # rows before the HNSW graph is built
+    vector_index_hnsw_m: int = int(os.getenv("VECTOR_INDEX_HNSW_M", "16"))
+    vector_index_hnsw_ef_construction: int = int(os.getenv("VECTOR_INDEX_HNSW_EF_CONSTRUCTION", "200"))
+    vector_index_hnsw_ef_search: int = int(os.getenv("VECTOR_INDEX_HNSW_EF_SEARCH", "64"))
+
+    # Named entity recognition
+    ner_entities_only: bool = os.getenv("NER_ENTITIES_ONLY", "true").lower() == "true"
+    ner_batch_size: int = int(os.getenv("NER_BATCH_SIZE", "64"))
+    ner_n_process: int = int(os.getenv("NER_N_PROCESS", "1"))
+    ner_batch_max_items: int = int(os.getenv("NER_BATCH_MAX_ITEMS", "256"))
+
+    # Embedding cache
+    embedding_cache_enabled: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    embedding_cache_redis_enabled: bool = os.getenv("EMBEDDING_CACHE_REDIS_ENABLED", "true").lower() == "true"
+    embedding_cache_local_max_items: int = int(os.getenv("EMBEDDING_CACHE_LOCAL_MAX_ITEMS", "10000"))
+    embedding_cache_local_ttl: int = int(os.getenv("EMBEDDING_CACHE_LOCAL_TTL", "3600"))
+    embedding_cache_redis_ttl: int = int(os.getenv("EMBEDDING_CACHE_REDIS_TTL", "604800"))
+    embedding_cache_dtype: str = os.getenv("EMBEDDING_CACHE_DTYPE", "float32")  # float32 or float16
+
+    # Inference executor
+    inference_executor: str = os.getenv("INFERENCE_EXECUTOR", "thread")  # thread or process
+    inference_max_workers: int = int(os.getenv("INFERENCE_MAX_WORKERS", "2"))
+    inference_max_queue: int = int(os.getenv("INFERENCE_MAX_QUEUE", "64"))
+    inference_retry_after: int = int(os.getenv("INFERENCE_RETRY_AFTER", "1"))
+
+    # Pre-fork server
+    prefork_workers: int = int(os.getenv("PREFORK_WORKERS", "1"))
+    prefork_torch_threads: int = int(os.getenv("PREFORK_TORCH_THREADS", "0"))  # per worker; 0 = CPU count / workers
+    prefork_memory_report_interval: float = float(os.getenv("PREFORK_MEMORY_REPORT_INTERVAL", "0"))  # seconds; 0 disables
+
+    # Metrics
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # AT Protocol
+    atproto_service_url: str = os.getenv("ATPROTO_SERVICE_URL", "https://bsky.social")
+    atproto_max_connections: int = int(os.getenv("ATPROTO_MAX_CONNECTIONS", "20"))
+    atproto_max_keepalive_connections: int = int(os.getenv("ATPROTO_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    atproto_timeout: float = float(os.getenv("ATPROTO_TIMEOUT", "10"))
+    atproto_connect_timeout: float = float(os.getenv("ATPROTO_CONNECT_TIMEOUT", "5"))
+    atproto_rate_limit: float = float(os.getenv("ATPROTO_RATE_LIMIT", "10"))  # requests/second until the service advertises its limit
+    atproto_rate_burst: int = int(os.getenv("ATPROTO_RATE_BURST", "20"))
+    atproto_rate_headroom: float = float(os.getenv("ATPROTO_RATE_HEADROOM", "0.9"))  # fraction of the advertised limit to use
+    atproto_rate_shared: bool = os.getenv("ATPROTO_RATE_SHARED", "true").lower() == "true"  # one Redis token bucket for every worker and replica
+    atproto_max_retries: int = int(os.getenv("ATPROTO_MAX_RETRIES", "3"))  # retries after a 429
+    atproto_session_store: str = os.getenv("ATPROTO_SESSION_STORE", "redis")  # redis, file or none
+    atproto_session_file: str = os.getenv("ATPROTO_SESSION_FILE", os.path.expanduser("~/.cache/skytorch/atproto_session.json"))
+    atproto_session_refresh_margin: int = int(os.getenv("ATPROTO_SESSION_REFRESH_MARGIN", "300"))  # seconds before access token expiry
+
+    # Profile cache
+    profile_cache_enabled: bool = os.getenv("PROFILE_CACHE_ENABLED", "true").lower() == "true"
+    profile_cache_redis_enabled: bool = os.getenv("PROFILE_CACHE_REDIS_ENABLED", "true").lower() == "true"
+    profile_cache_local_max_items: int = int(os.getenv("PROFILE_CACHE_LOCAL_MAX_ITEMS", "50000"))
+    profile_cache_local_ttl: int = int(os.getenv("PROFILE_CACHE_LOCAL_TTL", "600"))
+    profile_cache_redis_ttl: int = int(os.getenv("PROFILE_CACHE_REDIS_TTL", "3600"))
+    profile_batch_max_items: int = int(os.getenv("PROFILE_BATCH_MAX_ITEMS", "1000"))
+    profile_fetch_concurrency: int = int(os.getenv("PROFILE_FETCH_CONCURRENCY", "4"))
+
+    # Handle resolution cache
+    handle_cache_enabled: bool = os.getenv("HANDLE_CACHE_ENABLED", "true").lower() == "true"
+    handle_cache_redis_enabled: bool = os.getenv("HANDLE_CACHE_REDIS_ENABLED", "true").lower() == "true"
+    handle_cache_local_max_items: int = int(os.getenv("HANDLE_CACHE_LOCAL_MAX_ITEMS", "100000"))
+    handle_cache_ttl: int = int(os.getenv("HANDLE_CACHE_TTL", "86400"))
+    handle_cache_negative_ttl: int = int(os.getenv("HANDLE_CACHE_NEGATIVE_TTL", "300"))
+    handle_batch_max_items: int = int(os.getenv("HANDLE_BATCH_MAX_ITEMS", "1000"))
+    handle_resolve_concurrency: int = int(os.getenv("HANDLE_RESOLVE_CONCURRENCY", "8"))
+
     # CORS
     cors_origins: list = ["*"]
 
@@ -0,0 +1,513 @@
+"""
+Redis stream worker that embeds article chunks and writes the vectors straight to Postgres.
+
+    python -m skytorch.embed_worker
+
+Producers add article IDs to the stream, e.g. from Rails:
+
+    XADD skytorch:articles:embed * article_id 123
+
+Workers read through a consumer group, so any number of them share the
+stream and each article is handled by one of them. A batch of articles
+is loaded with two queries, embedded in large batches and written back
+in one multi-row upsert per batch. Messages are acknowledged only after
+that transaction commits. If a batch fails it is retried in halves, so an
+article that fails on its own is moved to the ``<stream>:dead`` stream
+and the rest of its batch is still written. Messages a crashed worker
+left unacknowledged, or left while Postgres was down, are claimed by
+another worker once idle for ``EMBED_WORKER_CLAIM_IDLE_MS``. After
+``EMBED_WORKER_MAX_DELIVERIES`` attempts a message is dead-lettered.
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from skytorch.config import get_settings
+
+try:
+    import psycopg2
+    from psycopg2.extras import execute_values
+    HAS_PSYCOPG2 = True
+except ImportError:
+    HAS_PSYCOPG2 = False
+    psycopg2 = None
+    execute_values = None
+
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+    redis = None
+
+logger = logging.getLogger("skytorch.embed_worker")
+
+# (message id, fields) as returned by XREADGROUP / XCLAIM
+Message = Tuple[str, Dict[str, str]]
+
+LOAD_CHUNKS_SQL = """
+    SELECT article_id, chunk_index, text, token_count, checksum,
+           embedding_vector IS NULL OR embedding_version IS DISTINCT FROM %s AS needs_embedding
+    FROM article_chunks
+    WHERE article_id = ANY(%s)
+    ORDER BY article_id, chunk_index
+"""
+
+LOAD_ARTICLES_SQL = """
+    SELECT id, cleaned_text FROM articles WHERE id = ANY(%s) AND cleaned_text IS NOT NULL
+"""
+
+UPSERT_CHUNKS_SQL = """
+    INSERT INTO article_chunks
+        (article_id, chunk_index, text, token_count, checksum, embedding_vector, embedding_version, created_at, updated_at)
+    VALUES %s
+    ON CONFLICT (article_id, chunk_index) DO UPDATE SET
+        embedding_vector = EXCLUDED.embedding_vector,
+        embedding_version = EXCLUDED.embedding_version,
+        updated_at = EXCLUDED.updated_at
+"""
+
+UPSERT_CHUNKS_TEMPLATE = "(%s, %s, %s, %s, %s, %s::vector, %s, now(), now())"
+
+
+class ChunkRow(NamedTuple):
+    """An article chunk to embed."""
+    article_id: int
+    chunk_index: int
+    text: str
+    token_count: int
+    checksum: str
+
+
+def vector_literal(vector: Sequence[float]) -> str:
+    """Format a vector as a pgvector text literal, e.g. ``[0.1,-0.2]``."""
+    return "[" + ",".join(f"{float(value):.8g}" for value in vector) + "]"
+
+
+def parse_article_ids(messages: Sequence[Message]) -> Tuple[List[int], List[str]]:
+    """
+    Pull article IDs out of stream messages.
+
+    Returns:
+        Tuple of (distinct article IDs in message order, IDs of messages without a valid ``article_id``)
+    """
+    article_ids: Dict[int, None] = {}
+    invalid: List[str] = []
+    for message_id, fields in messages:
+        value = (fields or {}).get("article_id", "")
+        if value.isdigit():
+            article_ids[int(value)] = None
+        else:
+            invalid.append(message_id)
+    return list(article_ids), invalid
+
+
+def load_chunks(conn, article_ids: List[int], model_version: str) -> Tuple[List[ChunkRow], List[int]]:
+    """
+    Load the chunks of ``article_ids`` that still need embedding with ``model_version``.
+
+    Articles with no chunk rows yet are chunked here from ``cleaned_text``
+    with the same chunker as ``/api/v1/articles/analyze``.
+
+    Returns:
+        Tuple of (chunks to embed, article IDs with nothing to embed)
+    """
+    from skytorch.nlp import chunk_article_text
+
+    settings = get_settings()
+    rows: List[ChunkRow] = []
+    chunked = set()
+    with conn.cursor() as cur:
+        cur.execute(LOAD_CHUNKS_SQL, (model_version, article_ids))
+        for article_id, chunk_index, text, token_count, checksum, needs_embedding in cur.fetchall():
+            chunked.add(article_id)
+            if needs_embedding:
+                rows.append(ChunkRow(article_id, chunk_index, text, token_count, checksum))
+
+        unchunked = [article_id for article_id in article_ids if article_id not in chunked]
+        if unchunked:
+            cur.execute(LOAD_ARTICLES_SQL, (unchunked,))
+            for article_id, cleaned_text in cur.fetchall():
+                if not cleaned_text.strip():
+                    continue
+                chunks = chunk_article_text(
+                    cleaned_text,
+                    settings.embedding_model_name,
+                    target_tokens=settings.chunk_target_tokens,
+                    overlap_ratio=settings.chunk_overlap_ratio,
+                )
+                rows.extend(
+                    ChunkRow(article_id, chunk.chunk_index, chunk.text, chunk.token_count, chunk.checksum)
+                    for chunk in chunks
+                )
+
+    with_work = {row.article_id for row in rows}
+    return rows, [article_id for article_id in article_ids if article_id not in with_work]
+
+
+def write_embeddings(conn, rows: Sequence[ChunkRow], vectors, model_version: str, page_size: int = 500):
+    """
+    Upsert chunk rows with their vectors in a single transaction.
+
+    Existing rows keep their text and only get a new vector, version and
+    ``updated_at``; rows chunked by the worker are inserted whole.
+    """
+    values = [
+        (row.article_id, row.chunk_index, row.text, row.token_count, row.checksum, vector_literal(vector), model_version)
+        for row, vector in zip(rows, vectors)
+    ]
+    with conn:
+        with conn.cursor() as cur:
+            execute_values(cur, UPSERT_CHUNKS_SQL, values, template=UPSERT_CHUNKS_TEMPLATE, page_size=page_size)
+
+
+def embed_chunks(rows: Sequence[ChunkRow], model_name: str, batch_size: int):
+    """Embed chunk texts, encoding each distinct text once."""
+    from skytorch.nlp import generate_embedding_batch
+
+    positions: Dict[str, int] = {}
+    for row in rows:
+        positions.setdefault(row.text, len(positions))
+    vectors = generate_embedding_batch(list(positions), model_name, batch_size=batch_size, as_numpy=True)
+    return [vectors[positions[row.text]] for row in rows]
+
+
+class EmbedWorker:
+    """
+    Consume article IDs from a Redis stream and write chunk embeddings to Postgres.
+
+    One read of up to ``read_count`` messages is one unit of work: one
+    load, one embedding pass and one transaction, then one XACK. A batch
+    that fails is bisected so only the articles that fail on their own
+    are dead-lettered.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        database_url: str,
+        stream: str = "skytorch:articles:embed",
+        group: str = "skytorch-embed",
+        consumer: Optional[str] = None,
+        model_name: str = "all-MiniLM-L6-v2",
+        read_count: int = 64,
+        batch_size: int = 128,
+        block_ms: int = 5000,
+        claim_idle_ms: int = 300000,
+        max_deliveries: int = 5,
+    ):
+        """
+        Args:
+            redis_url: Redis holding the stream
+            database_url: Postgres holding ``articles`` and ``article_chunks``
+            stream: Stream of ``article_id`` messages
+            group: Consumer group shared by all workers
+            consumer: This worker's name in the group (defaults to host and PID)
+            model_name: Sentence transformer model to embed with
+            read_count: Messages per batch
+            batch_size: Texts per forward pass
+            block_ms: How long a read waits for new messages
+            claim_idle_ms: Idle time after which another worker's unacknowledged messages are claimed
+            max_deliveries: Attempts before a message is moved to the dead-letter stream
+
+        Raises:
+            ImportError: If redis or psycopg2 is not installed
+        """
+        if not HAS_REDIS:
+            raise ImportError("redis is not installed. Install it with: pip install redis")
+        if not HAS_PSYCOPG2:
+            raise ImportError("psycopg2 is not installed. Install it with: pip install psycopg2-binary")
+
+        self.redis = redis.Redis.from_url(redis_url, decode_responses=True)
+        self.database_url = database_url
+        self.stream = stream
+        self.dead_stream = f"{stream}:dead"
+        self.group = group
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.model_name = model_name
+        self.read_count = max(1, read_count)
+        self.batch_size = max(1, batch_size)
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.max_deliveries = max(1, max_deliveries)
+
+        self._conn = None
+        self._should_exit = False
+        self._next_claim = 0.0
+
+        self.batches = 0
+        self.articles = 0
+        self.chunks = 0
+        self.failures = 0
+        self.dead_lettered = 0
+        self.embed_seconds = 0.0
+        self.write_seconds = 0.0
+
+    def _connection(self):
+        if self._conn is None or self._conn.closed:
+            self._conn = psycopg2.connect(self.database_url)
+        return self._conn
+
+    def ensure_group(self):
+        """Create the stream and consumer group if they don't exist yet."""
+        try:
+            self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def _dead_letter(self, message: Message, reason: str):
+        message_id, fields = message
+        self.redis.xadd(self.dead_stream, {**(fields or {}), "message_id": message_id, "error": reason})
+        self.redis.xack(self.stream, self.group, message_id)
+        self.dead_lettered += 1
+        logger.warning(f"Moved message {message_id} to {self.dead_stream}: {reason}")
+
+    def claim_stalled(self) -> List[Message]:
+        """
+        Claim messages other consumers left unacknowledged for ``claim_idle_ms``.
+
+        Messages already delivered ``max_deliveries`` times are moved to the
+        dead-letter stream instead of being retried again.
+        """
+        pending = self.redis.xpending_range(
+            self.stream, self.group, min="-", max="+", count=self.read_count, idle=self.claim_idle_ms
+        )
+        if not pending:
+            return []
+        deliveries = {entry["message_id"]: entry["times_delivered"] for entry in pending}
+        claimed = self.redis.xclaim(
+            self.stream, self.group, self.consumer, min_idle_time=self.claim_idle_ms, message_ids=list(deliveries)
+        )
+
+        messages = []
+        for message_id, fields in claimed:
+            if fields is None:
+                # Trimmed from the stream since it was delivered
+                self.redis.xack(self.stream, self.group, message_id)
+            elif deliveries.get(message_id, 0) >= self.max_deliveries:
+                self._dead_letter((message_id, fields), f"failed {deliveries[message_id]} times")
+            else:
+                messages.append((message_id, fields))
+        return messages
+
+    def read(self) -> List[Message]:
+        """Next batch: stalled messages when due, otherwise new ones (blocking up to ``block_ms``)."""
+        now = time.monotonic()
+        if now >= self._next_claim:
+            self._next_claim = now + self.claim_idle_ms / 1000.0 / 2
+            messages = self.claim_stalled()
+            if messages:
+                return messages
+
+        response = self.redis.xreadgroup(
+            self.group, self.consumer, {self.stream: ">"}, count=self.read_count, block=self.block_ms
+        )
+        return [message for _, stream_messages in response or [] for message in stream_messages]
+
+    def _embed_articles(self, article_ids: List[int], model_version: str) -> int:
+        """
+        Load, embed and store the chunks of ``article_ids`` in one transaction.
+
+        Returns:
+            Number of chunks written
+
+        Raises:
+            Exception: Whatever loading, embedding or writing raised; the
+                transaction is rolled back first
+        """
+        try:
+            conn = self._connection()
+            rows, skipped = load_chunks(conn, article_ids, model_version)
+            conn.rollback()
+
+            if rows:
+                started = time.perf_counter()
+                vectors = embed_chunks(rows, self.model_name, self.batch_size)
+                embed_seconds = time.perf_counter() - started
+
+                started = time.perf_counter()
+                write_embeddings(conn, rows, vectors, model_version)
+                write_seconds = time.perf_counter() - started
+
+                self.embed_seconds += embed_seconds
+                self.write_seconds += write_seconds
+                logger.info(
+                    f"Embedded {len(rows)} chunks of {len(article_ids) - len(skipped)} articles "
+                    f"(embed {embed_seconds:.2f}s, write {write_seconds:.2f}s, "
+                    f"{len(rows) / max(embed_seconds + write_seconds, 1e-9):.0f} chunks/s)"
+                )
+            if skipped:
+                logger.debug(f"Nothing to embed for articles {skipped}")
+            return len(rows)
+        except Exception:
+            if self._conn is not None and not self._conn.closed:
+                try:
+                    self._conn.rollback()
+                except psycopg2.Error:
+                    self._conn.close()
+            raise
+
+    def _process_articles(
+        self, article_ids: List[int], by_article: Dict[int, List[Message]], model_version: str
+    ) -> bool:
+        """
+        Embed ``article_ids`` as one batch, bisecting it on failure.
+
+        Each part that commits is acknowledged right away. An article that
+        fails on its own is moved to the dead-letter stream, so one bad
+        article never holds back the rest of its batch.
+
+        Returns:
+            False if Postgres is unreachable, leaving the remaining messages
+            unacknowledged to be retried after ``claim_idle_ms``
+        """
+        try:
+            chunks = self._embed_articles(article_ids, model_version)
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            self.failures += 1
+            logger.error(f"Postgres unavailable, leaving {len(article_ids)} articles to be retried: {e}")
+            return False
+        except Exception as e:
+            error = e
+        else:
+            self.redis.xack(self.stream, self.group, *(
+                message_id for article_id in article_ids for message_id, _ in by_article[article_id]
+            ))
+            self.articles += len(article_ids)
+            self.chunks += chunks
+            return True
+
+        if len(article_ids) > 1:
+            logger.warning(f"Failed to embed {len(article_ids)} articles, retrying them in halves: {error}")
+            middle = len(article_ids) // 2
+            return (
+                self._process_articles(article_ids[:middle], by_article, model_version)
+                and self._process_articles(article_ids[middle:], by_article, model_version)
+            )
+        self.failures += 1
+        logger.error(f"Failed to embed article {article_ids[0]}", exc_info=error)
+        for message in by_article[article_ids[0]]:
+            self._dead_letter(message, f"{type(error).__name__}: {error}")
+        return True
+
+    def process(self, messages: List[Message]):
+        """
+        Embed and store one batch, acknowledging messages as their articles are written.
+
+        If the batch fails it is split in half and each half retried, down
+        to single articles; only articles that fail on their own are
+        dead-lettered. If Postgres is unreachable the rest of the batch is
+        left unacknowledged and retried after ``claim_idle_ms``.
+        """
+        article_ids, invalid = parse_article_ids(messages)
+        by_article: Dict[int, List[Message]] = {}
+        for message in messages:
+            if message[0] in invalid:
+                self._dead_letter(message, "missing or invalid article_id")
+            else:
+                by_article.setdefault(int(message[1]["article_id"]), []).append(message)
+        if not article_ids:
+            return
+
+        from skytorch.nlp import embedding_model_version
+
+        if self._process_articles(article_ids, by_article, embedding_model_version(self.model_name)):
+            self.batches += 1
+
+    def stop(self, *args):
+        """Finish the current batch, then exit."""
+        self._should_exit = True
+
+    def run(self, once: bool = False) -> int:
+        """
+        Process batches until stopped.
+
+        Args:
+            once: Exit as soon as a read returns no messages, instead of waiting for more
+
+        Returns:
+            Process exit status
+        """
+        from skytorch.nlp import get_sentence_transformer
+
+        self.ensure_group()
+        # Load the model before the first read, so no message waits on it
+        get_sentence_transformer(self.model_name)
+        logger.info(f"Consuming {self.stream} as {self.group}/{self.consumer}")
+
+        while not self._should_exit:
+            try:
+                messages = self.read()
+            except redis.ConnectionError as e:
+                logger.warning(f"Redis unavailable, retrying: {e}")
+                time.sleep(1)
+                continue
+            if not messages:
+                if once:
+                    break
+                continue
+            self.process(messages)
+
+        if self._conn is not None:
+            self._conn.close()
+        logger.info(
+            f"Stopped after {self.batches} batches: {self.articles} articles, {self.chunks} chunks, "
+            f"{self.failures} failures, {self.dead_lettered} dead-lettered"
+        )
+        return 0
+
+    def stats(self) -> dict:
+        """Return batch, article and chunk counters and time spent embedding and writing."""
+        return {
+            "batches": self.batches,
+            "articles": self.articles,
+            "chunks": self.chunks,
+            "failures": self.failures,
+            "dead_lettered": self.dead_lettered,
+            "embed_seconds": self.embed_seconds,
+            "write_seconds": self.write_seconds,
+        }
+
+
+def main() -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        prog="python -m skytorch.embed_worker",
+        description="Embed article chunks for article IDs read from a Redis stream and store them in Postgres.",
+    )
+    parser.add_argument("--stream", default=settings.embed_worker_stream)
+    parser.add_argument("--group", default=settings.embed_worker_group)
+    parser.add_argument("--consumer", default=settings.embed_worker_consumer or None)
+    parser.add_argument("--once", action="store_true", help="Exit when the stream has no more messages")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    worker = EmbedWorker(
+        settings.redis_url,
+        settings.database_url,
+        stream=args.stream,
+        group=args.group,
+        consumer=args.consumer,
+        model_name=settings.embedding_model_name,
+        read_count=settings.embed_worker_read_count,
+        batch_size=settings.embed_worker_batch_size,
+        block_ms=settings.embed_worker_block_ms,
+        claim_idle_ms=settings.embed_worker_claim_idle_ms,
+        max_deliveries=settings.embed_worker_max_deliveries,
+    )
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    return worker.run(once=args.once)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""Inference backends for sentence embedding models: eager torch, int8 torch and ONNX Runtime."""
+
+import logging
+import re
+from pathlib import Path
+from typing import Optional
+
+from skytorch.imports import has_module, timed_import
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+# Imported on first model load; see skytorch.nlp
+HAS_NLP_DEPS = has_module("sentence_transformers")
+HAS_ONNXRUNTIME = has_module("onnxruntime")
+
+logger = logging.getLogger(__name__)
+
+BACKEND_TORCH = "torch"
+BACKEND_TORCH_INT8 = "torch_int8"
+BACKEND_ONNX = "onnx"
+BACKEND_ONNX_INT8 = "onnx_int8"
+BACKENDS = (BACKEND_TORCH, BACKEND_TORCH_INT8, BACKEND_ONNX, BACKEND_ONNX_INT8)
+
+# Backends whose weights differ from the eager float32 model
+QUANTIZED_BACKENDS = (BACKEND_TORCH_INT8, BACKEND_ONNX_INT8)
+
+# News-like texts of varying length used to compare a backend against the
+# eager model.
+PARITY_CORPUS = [
+    "Breaking: wildfire forces evacuations north of Sacramento.",
+    "The Federal Reserve held interest rates steady on Wednesday, citing cooling inflation.",
+    "Researchers at the University of Oslo published a study on Arctic sea ice loss.",
+    "Local election results are in. Turnout was the highest in two decades, officials said.",
+    "A new transit line connecting the airport to downtown opened this morning after years of delays, "
+    "with the mayor calling it a turning point for the region's economy.",
+    "The company reported quarterly revenue of $4.2 billion, beating analyst expectations, "
+    "while warning that supply chain disruptions could weigh on margins for the rest of the year. "
+    "Shares rose 6 percent in after-hours trading.",
+    "Lawmakers in the European Parliament approved sweeping rules for artificial intelligence on Tuesday. "
+    "The regulation bans some uses outright, such as social scoring, and imposes transparency "
+    "requirements on general-purpose models. Industry groups said the rules were too vague, "
+    "while civil liberties organizations argued they did not go far enough to limit biometric surveillance. "
+    "The law will take effect in stages over the next two years.",
+    "ok",
+]
+
+
+def parse_backend_map(value: str) -> dict:
+    """
+    Parse a ``model=backend`` comma-separated mapping.
+
+    Args:
+        value: e.g. ``all-MiniLM-L6-v2=onnx_int8,all-mpnet-base-v2=torch``
+
+    Returns:
+        Mapping of model name to backend
+    """
+    backends = {}
+    for item in value.split(","):
+        model_name, _, backend = item.strip().rpartition("=")
+        if model_name and backend:
+            backends[model_name.strip()] = backend.strip()
+    return backends
+
+
+def _sentence_transformer_class():
+    return timed_import("sentence_transformers").SentenceTransformer
+
+
+def _export_name(model_name: str, revision: Optional[str] = None) -> str:
+    name = model_name if not revision else f"{model_name}@{revision}"
+    return re.sub(r"[^A-Za-z0-9_.@-]+", "__", name)
+
+
+class OnnxSentenceEncoder:
+    """
+    Serve a sentence-transformers model through ONNX Runtime.
+
+    The transformer is exported to ONNX once (and optionally int8-quantized)
+    under ``export_dir``; later loads reuse the exported graph. Tokenization
+    and pooling match the source SentenceTransformer, and ``encode`` takes the
+    same arguments, so this can stand in for it anywhere in skytorch.nlp.
+    """
+
+    def __init__(self, model_name: str, export_dir: str, quantize: bool = False, revision: Optional[str] = None):
+        if not HAS_ONNXRUNTIME:
+            raise ImportError(
+                "onnxruntime is not installed. Install it with: pip install onnxruntime"
+            )
+
+        source = _sentence_transformer_class()(model_name, device="cpu", revision=revision)
+        self.model_name = model_name
+        self.tokenizer = source.tokenizer
+        self.max_seq_length = source.max_seq_length
+        self.pooling = self._pooling_mode(source)
+
+        model_dir = Path(export_dir) / _export_name(model_name, revision)
+        onnx_path = model_dir / "model.onnx"
+        if not onnx_path.exists():
+            self._export(source, onnx_path)
+        if quantize:
+            quantized_path = model_dir / "model_int8.onnx"
+            if not quantized_path.exists():
+                self._quantize(onnx_path, quantized_path)
+            onnx_path = quantized_path
+        del source
+
+        onnxruntime = timed_import("onnxruntime")
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            str(onnx_path), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+        self.onnx_path = str(onnx_path)
+
+    @staticmethod
+    def _pooling_mode(source) -> str:
+        for module in source:
+            if getattr(module, "pooling_mode_cls_token", False):
+                return "cls"
+            if getattr(module, "pooling_mode_mean_tokens", False):
+                return "mean"
+        return "mean"
+
+    def _export(self, source, onnx_path: Path):
+        import torch
+
+        transformer = source[0].auto_model.eval()
+        input_names = [name for name in self.tokenizer.model_input_names]
+
+        class _HiddenStates(torch.nn.Module):
+            def __init__(self, model):
+                super().__init__()
+                self.model = model
+
+            def forward(self, *inputs):
+                return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+        sample = self.tokenizer(["warm up"], return_tensors="pt")
+        onnx_path.parent.mkdir(parents=True, exist_ok=True)
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+        with torch.no_grad():
+            torch.onnx.export(
+                _HiddenStates(transformer),
+                tuple(sample[name] for name in input_names),
+                str(onnx_path),
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+            )
+        logger.info(f"Exported {self.model_name} to ONNX at {onnx_path}")
+
+    def _quantize(self, onnx_path: Path, quantized_path: Path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(str(onnx_path), str(quantized_path), weight_type=QuantType.QInt8)
+        logger.info(f"Quantized {self.model_name} ONNX graph to int8 at {quantized_path}")
+
+    def tokenize(self, texts):
+        """Tokenize like ``SentenceTransformer.tokenize``, returning numpy arrays."""
+        return self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np",
+        )
+
+    def forward(self, features) -> "np.ndarray":
+        """Run a tokenized batch through the graph and pool it into float32 sentence embeddings."""
+        feeds = {name: np.asarray(features[name]).astype(np.int64) for name in self.input_names}
+        hidden = self.session.run(None, feeds)[0]
+        if self.pooling == "cls":
+            pooled = hidden[:, 0]
+        else:
+            mask = np.asarray(features["attention_mask"])[..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled.astype(np.float32)
+
+    def encode(
+        self,
+        sentences,
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        show_progress_bar: bool = False,
+        **kwargs,
+    ):
+        """Encode sentences like ``SentenceTransformer.encode`` with numpy output."""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        batches = [
+            self.forward(self.tokenize(texts[start:start + batch_size]))
+            for start in range(0, len(texts), batch_size)
+        ]
+
+        embeddings = np.concatenate(batches) if batches else np.zeros((0, 0), dtype=np.float32)
+        if normalize_embeddings and len(embeddings):
+            embeddings = embeddings / np.clip(
+                np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None
+            )
+        return embeddings[0] if single else embeddings
+
+
+def forward_features(model, features) -> "np.ndarray":
+    """
+    Run one tokenized, padded batch through a sentence encoder.
+
+    Args:
+        model: Encoder returned by ``load_sentence_encoder``
+        features: Output of ``model.tokenize``, possibly cut to fewer rows and tokens
+
+    Returns:
+        float32 ``(batch, dim)`` sentence embeddings, not normalized
+    """
+    if isinstance(model, OnnxSentenceEncoder):
+        return model.forward(features)
+
+    import torch
+    from sentence_transformers.util import batch_to_device
+
+    with torch.inference_mode():
+        output = model.forward(batch_to_device(dict(features), model.device))
+    return output["sentence_embedding"].float().cpu().numpy()
+
+
+def supports_bucketing(model) -> bool:
+    """Whether ``model.tokenize`` right-pads, so a batch can be cut to its own longest text."""
+    tokenizer = getattr(model, "tokenizer", None)
+    return hasattr(model, "tokenize") and getattr(tokenizer, "padding_side", "right") == "right"
+
+
+def load_sentence_encoder(
+    model_name: str,
+    backend: str,
+    device: str,
+    precision: str,
+    export_dir: str,
+    revision: Optional[str] = None,
+):
+    """
+    Load a sentence embedding model on the requested backend.
+
+    Args:
+        model_name: Name of the sentence transformer model
+        backend: One of BACKENDS
+        device: Torch device (eager torch backend only)
+        precision: float32, float16 or bfloat16 (eager torch backend only)
+        export_dir: Where ONNX exports are written and reused
+        revision: Hub commit hash, branch or tag to load; None loads the latest
+
+    Returns:
+        SentenceTransformer, or an object with the same ``encode``/``tokenizer`` interface
+
+    Raises:
+        ValueError: If the backend is unknown
+        ImportError: If the backend's runtime is not installed
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}' (expected one of: {', '.join(BACKENDS)})")
+
+    if backend in (BACKEND_ONNX, BACKEND_ONNX_INT8):
+        return OnnxSentenceEncoder(
+            model_name, export_dir, quantize=backend == BACKEND_ONNX_INT8, revision=revision
+        )
+
+    if backend == BACKEND_TORCH_INT8:
+        import torch
+
+        # Dynamic quantization is CPU-only and replaces Linear layers in place
+        model = _sentence_transformer_class()(model_name, device="cpu", revision=revision)
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+    model = _sentence_transformer_class()(model_name, device=device, revision=revision)
+    if precision == "float16":
+        model = model.half()
+    elif precision == "bfloat16":
+        import torch
+        model = model.to(torch.bfloat16)
+    return model
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from skytorch.nlp import check_backend_parity
+
+    parser = argparse.ArgumentParser(description="Compare an embedding backend against the eager torch model.")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Sentence transformer model name")
+    parser.add_argument("--backend", required=True, choices=BACKENDS, help="Backend to check")
+    args = parser.parse_args()
+
+    print(json.dumps(check_backend_parity(args.model, args.backend), indent=2))
@@ -0,0 +1,214 @@
+"""Content-addressed embedding cache with an in-process LRU tier and a Redis tier."""
+
+import hashlib
+import logging
+import re
+import unicodedata
+from typing import Optional, Sequence
+
+from skytorch.config import get_settings
+from skytorch.nlp import embedding_model_version
+from skytorch.ttl_cache import LocalTTLCache
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+try:
+    import redis.asyncio as aioredis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keying: NFC unicode, collapsed whitespace, trimmed."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def text_digest(text: str) -> str:
+    """SHA-256 hex digest of the normalized text."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Cache embedding vectors keyed by SHA-256(normalized text), model name and revision.
+
+    Lookups check a bounded in-process LRU first, then Redis. Vectors are
+    stored as packed little-endian float32 or float16 bytes rather than JSON.
+    Redis failures are logged and treated as misses so the cache can never
+    take the embedding endpoints down.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        local_max_items: int = 10000,
+        local_ttl_seconds: int = 3600,
+        redis_ttl_seconds: int = 7 * 24 * 3600,
+        dtype: str = "float32",
+        key_prefix: str = "skytorch:embedding",
+        redis_timeout: float = 0.5,
+    ):
+        """
+        Args:
+            redis_url: Redis URL for the shared tier, or None for local only
+            local_max_items: Maximum vectors held in process
+            local_ttl_seconds: Lifetime of in-process entries (0 = no expiry)
+            redis_ttl_seconds: Lifetime of Redis entries
+            dtype: ``float32`` or ``float16`` storage format
+            key_prefix: Prefix for Redis keys
+            redis_timeout: Socket timeout in seconds for Redis calls
+        """
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported embedding cache dtype: {dtype}")
+
+        self.dtype = dtype
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self.key_prefix = key_prefix
+        self._local = LocalTTLCache(local_max_items, local_ttl_seconds)
+        self._redis = None
+        if redis_url and HAS_REDIS:
+            self._redis = aioredis.from_url(
+                redis_url, socket_timeout=redis_timeout, socket_connect_timeout=redis_timeout
+            )
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.redis_errors = 0
+
+    def key(self, text: str, model_name: str) -> str:
+        """Cache key for a text embedded with a model."""
+        return f"{self.key_prefix}:{embedding_model_version(model_name)}:{text_digest(text)}"
+
+    def _pack(self, vector: Sequence[float]) -> bytes:
+        return np.asarray(vector, dtype="<f4" if self.dtype == "float32" else "<f2").tobytes()
+
+    def _unpack(self, value: bytes):
+        dtype = "<f4" if self.dtype == "float32" else "<f2"
+        return np.frombuffer(value, dtype=dtype).astype(np.float32)
+
+    async def get_many(self, texts: Sequence[str], model_name: str) -> list:
+        """
+        Look up cached vectors for texts.
+
+        Args:
+            texts: Input texts
+            model_name: Name of the sentence transformer model
+
+        Returns:
+            Cached float32 numpy vector for each text, or None for misses, in input order
+        """
+        keys = [self.key(text, model_name) for text in texts]
+        results: list = [None] * len(keys)
+        remote = []
+
+        for index, key in enumerate(keys):
+            value = self._local.get(key)
+            if value is not None:
+                results[index] = self._unpack(value)
+                self.local_hits += 1
+            else:
+                remote.append(index)
+
+        if remote and self._redis is not None:
+            try:
+                values = await self._redis.mget([keys[index] for index in remote])
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Embedding cache Redis lookup failed: {e}")
+                values = [None] * len(remote)
+            for index, value in zip(remote, values):
+                if value is not None:
+                    results[index] = self._unpack(value)
+                    self._local.set(keys[index], value)
+                    self.redis_hits += 1
+
+        self.misses += sum(1 for result in results if result is None)
+        return results
+
+    async def set_many(
+        self, texts: Sequence[str], model_name: str, vectors: Sequence[Sequence[float]]
+    ):
+        """
+        Store vectors for texts in both tiers.
+
+        Args:
+            texts: Input texts
+            model_name: Name of the sentence transformer model
+            vectors: Embedding vector for each text, in the same order
+        """
+        if not texts:
+            return
+
+        items = [(self.key(text, model_name), self._pack(vector)) for text, vector in zip(texts, vectors)]
+        for key, value in items:
+            self._local.set(key, value)
+        self.writes += len(items)
+
+        if self._redis is not None:
+            try:
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    for key, value in items:
+                        pipe.set(key, value, ex=self.redis_ttl_seconds)
+                    await pipe.execute()
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Embedding cache Redis write failed: {e}")
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and tier sizes."""
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "dtype": self.dtype,
+            "redis_enabled": self._redis is not None,
+            "local_items": len(self._local),
+            "local_max_items": self._local.max_items,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": ((self.local_hits + self.redis_hits) / lookups) if lookups else 0.0,
+            "writes": self.writes,
+            "redis_errors": self.redis_errors,
+        }
+
+
+# Global cache instance (lazy loaded)
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Get or create the shared embedding cache.
+
+    Returns:
+        EmbeddingCache configured from settings, or None if caching is disabled
+        or numpy is unavailable
+    """
+    global _embedding_cache
+
+    settings = get_settings()
+    if not settings.embedding_cache_enabled or not HAS_NUMPY:
+        return None
+
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            redis_url=settings.redis_url if settings.embedding_cache_redis_enabled else None,
+            local_max_items=settings.embedding_cache_local_max_items,
+            local_ttl_seconds=settings.embedding_cache_local_ttl,
+            redis_ttl_seconds=settings.embedding_cache_redis_ttl,
+            dtype=settings.embedding_cache_dtype,
+        )
+
+    return _embedding_cache
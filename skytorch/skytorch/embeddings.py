@@ -0,0 +1,72 @@
+"""Embedding generation for the API: cache lookup, then batched inference for misses."""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from skytorch.config import get_settings
+from skytorch.embedding_cache import get_embedding_cache
+from skytorch.executor import get_inference_executor
+from skytorch.nlp import generate_embedding_batch
+
+
+async def embed_texts(
+    texts: List[str],
+    model_name: str,
+    batch_size: Optional[int] = None,
+    bypass_cache: bool = False,
+) -> Tuple["np.ndarray", int]:
+    """
+    Embed texts, serving what it can from the embedding cache.
+
+    Only cache misses are sent through the model, in one batched encode on
+    the inference executor. Fresh vectors are written back to the cache.
+
+    Args:
+        texts: Non-empty input texts
+        model_name: Name of the sentence transformer model to use
+        batch_size: Texts per forward pass (defaults to EMBEDDING_BATCH_SIZE)
+        bypass_cache: Skip cache lookups and writes
+
+    Returns:
+        Tuple of (float32 ``(len(texts), dim)`` matrix in input order, number of cache hits)
+
+    Raises:
+        InferenceQueueFull: If the inference queue is full
+        ImportError: If sentence-transformers is not installed
+        ValueError: If any text is empty
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32), 0
+
+    cache = None if bypass_cache else get_embedding_cache()
+    cached = [None] * len(texts)
+    if cache is not None:
+        cached = await cache.get_many(texts, model_name)
+
+    misses = [index for index, vector in enumerate(cached) if vector is None]
+    fresh = None
+    if misses:
+        miss_texts = [texts[index] for index in misses]
+        fresh = await get_inference_executor().run(
+            generate_embedding_batch,
+            miss_texts,
+            model_name,
+            batch_size=batch_size or get_settings().embedding_batch_size,
+            as_numpy=True,
+        )
+        if cache is not None:
+            await cache.set_many(miss_texts, model_name, fresh)
+
+    if fresh is not None and len(misses) == len(texts):
+        return fresh, 0
+
+    dim = fresh.shape[1] if fresh is not None else len(cached[0])
+    vectors = np.empty((len(texts), dim), dtype=np.float32)
+    for index, vector in enumerate(cached):
+        if vector is not None:
+            vectors[index] = vector
+    if fresh is not None:
+        vectors[misses] = fresh
+
+    return vectors, len(texts) - len(misses)
@@ -0,0 +1,161 @@
+"""Response encodings for embedding vectors: JSON, base64 packed floats and msgpack."""
+
+import base64
+from typing import Any, List, NamedTuple, Optional
+
+from fastapi import Header, HTTPException, Query, status
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+    msgpack = None
+
+
+FORMAT_JSON = "json"
+FORMAT_BASE64 = "base64"
+FORMAT_MSGPACK = "msgpack"
+FORMATS = (FORMAT_JSON, FORMAT_BASE64, FORMAT_MSGPACK)
+
+DTYPES = {"float32": "<f4", "float16": "<f2"}
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+def negotiate_format(requested: Optional[str], accept: Optional[str]) -> str:
+    """
+    Pick the embedding response format.
+
+    An explicit ``format`` query parameter wins; otherwise an ``Accept``
+    header naming msgpack selects msgpack, and anything else gets JSON.
+
+    Raises:
+        HTTPException: 400 for an unknown format, 406 if msgpack is not installed
+    """
+    if requested:
+        fmt = requested.lower()
+        if fmt not in FORMATS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown format '{requested}' (expected one of: {', '.join(FORMATS)})"
+            )
+    elif accept and any(media_type in accept.lower() for media_type in MSGPACK_MEDIA_TYPES):
+        fmt = FORMAT_MSGPACK
+    else:
+        fmt = FORMAT_JSON
+
+    if fmt == FORMAT_MSGPACK and not HAS_MSGPACK:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail="msgpack responses are not available: msgpack is not installed"
+        )
+    return fmt
+
+
+def validate_dtype(dtype: str) -> str:
+    """
+    Check a requested packed-vector dtype.
+
+    Raises:
+        HTTPException: 400 for an unsupported dtype
+    """
+    if dtype not in DTYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown dtype '{dtype}' (expected one of: {', '.join(DTYPES)})"
+        )
+    return dtype
+
+
+def pack_vector(vector: Any, dtype: str = "float32") -> bytes:
+    """Pack a vector as little-endian float32/float16 bytes."""
+    return np.asarray(vector, dtype=DTYPES[dtype]).tobytes()
+
+
+def encode_vector(vector: Any, fmt: str, dtype: str = "float32") -> Any:
+    """
+    Encode one vector for a response body.
+
+    JSON keeps a float array (numpy arrays are serialized natively by the
+    orjson path), base64 gives packed bytes as a string, msgpack gives raw
+    packed bytes.
+    """
+    if vector is None:
+        return None
+    if fmt == FORMAT_BASE64:
+        return base64.b64encode(pack_vector(vector, dtype)).decode("ascii")
+    if fmt == FORMAT_MSGPACK:
+        return pack_vector(vector, dtype)
+    if HAS_ORJSON and HAS_NUMPY:
+        return np.asarray(vector, dtype=np.float32)
+    return vector.tolist() if hasattr(vector, "tolist") else list(vector)
+
+
+def encoding_metadata(fmt: str, dtype: str, dim: Optional[int]) -> dict:
+    """Describe how vectors in the response are encoded, so clients can decode them."""
+    return {
+        "encoding": "array" if fmt == FORMAT_JSON else "bytes",
+        "dtype": "float32" if fmt == FORMAT_JSON else dtype,
+        "byte_order": "little",
+        "dim": dim,
+    }
+
+
+def render(payload: dict, fmt: str) -> Response:
+    """
+    Serialize a response payload in the negotiated format.
+
+    JSON goes through orjson when it is installed, skipping Pydantic
+    re-validation of every float.
+    """
+    if fmt == FORMAT_MSGPACK:
+        return Response(content=msgpack.packb(payload, use_bin_type=True), media_type="application/msgpack")
+    if HAS_ORJSON:
+        return Response(
+            content=orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+            media_type="application/json",
+        )
+    return JSONResponse(content=payload)
+
+
+def vector_dim(vectors: List[Any]) -> Optional[int]:
+    """Length of the first non-null vector, or None if there are none."""
+    for vector in vectors:
+        if vector is not None:
+            return len(vector)
+    return None
+
+
+class EmbeddingFormat(NamedTuple):
+    """Negotiated response format and vector dtype for an embedding request."""
+    format: str
+    dtype: str
+
+
+def embedding_format(
+    response_format: Optional[str] = Query(
+        None,
+        alias="format",
+        description="Response format: json, base64 (packed little-endian floats) or msgpack",
+    ),
+    dtype: str = Query("float32", description="Packed vector dtype for base64/msgpack: float32 or float16"),
+    accept: Optional[str] = Header(None),
+) -> EmbeddingFormat:
+    """FastAPI dependency resolving the embedding response format from query and Accept header."""
+    return EmbeddingFormat(negotiate_format(response_format, accept), validate_dtype(dtype))
@@ -0,0 +1,194 @@
+"""Bounded executor that keeps CPU-bound inference off the asyncio event loop."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from skytorch import metrics
+from skytorch.config import get_settings
+
+
+class InferenceQueueFull(Exception):
+    """Raised when the inference work queue is full and new work is rejected."""
+
+    def __init__(self, retry_after: int, depth: int):
+        self.retry_after = retry_after
+        self.depth = depth
+        super().__init__(f"Inference queue is full ({depth} tasks pending)")
+
+
+def _call_with_start_time(fn: Callable, *args, **kwargs):
+    """Run ``fn`` and return (wall-clock start time, result) so queue wait can be measured."""
+    started_at = time.time()
+    return started_at, fn(*args, **kwargs)
+
+
+class InferenceExecutor:
+    """
+    Run blocking inference calls on a dedicated thread or process pool.
+
+    At most ``max_workers`` tasks run at once and at most ``max_queue`` more
+    wait for a worker. Work submitted beyond that is rejected immediately with
+    InferenceQueueFull so callers can shed load instead of piling up latency.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 2,
+        max_queue: int = 64,
+        retry_after: int = 1,
+        initializer: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Args:
+            kind: ``thread`` or ``process``
+            max_workers: Number of pool workers
+            max_queue: Number of tasks allowed to wait for a free worker
+            retry_after: Seconds suggested to rejected callers before retrying
+            initializer: Run in each worker process before it takes any work (process pools only)
+        """
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+        self.initializer = initializer
+
+        self._pool: Optional[Executor] = None
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=self.initializer)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="inference"
+                )
+        return self._pool
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of tasks waiting for a free worker."""
+        return max(0, self._pending - self.max_workers)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` on the pool and await its result.
+
+        Args:
+            fn: Blocking callable (must be picklable for the process pool)
+
+        Returns:
+            Whatever ``fn`` returns
+
+        Raises:
+            InferenceQueueFull: If the work queue is already full
+        """
+        with self._pending_lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise InferenceQueueFull(self.retry_after, self.queue_depth)
+            self._pending += 1
+        self.submitted += 1
+        submitted_at = time.time()
+        try:
+            future = self._get_pool().submit(partial(_call_with_start_time, fn, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        # A cancelled caller (client disconnect, upstream timeout) doesn't stop
+        # work that already started, so its slot is held until the work ends
+        future.add_done_callback(self._release)
+        try:
+            started_at, result = await asyncio.wrap_future(future)
+        except Exception:
+            self.failed += 1
+            raise
+
+        wait_seconds = max(0.0, started_at - submitted_at)
+        self.completed += 1
+        self.total_wait_seconds += wait_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+        metrics.observe_queue_wait(wait_seconds)
+        return result
+
+    def _release(self, future=None):
+        with self._pending_lock:
+            self._pending -= 1
+
+    def stats(self) -> dict:
+        """Return queue depth, wait times and task counters."""
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": min(self._pending, self.max_workers),
+            "queue_depth": self.queue_depth,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "average_wait_ms": (
+                self.total_wait_seconds / self.completed * 1000.0 if self.completed else 0.0
+            ),
+            "max_wait_ms": self.max_wait_seconds * 1000.0,
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Shut down the worker pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+
+# Global executor instance (lazy loaded)
+_inference_executor: Optional[InferenceExecutor] = None
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """
+    Get or create the shared inference executor.
+
+    Returns:
+        InferenceExecutor configured from settings
+    """
+    global _inference_executor
+
+    if _inference_executor is None:
+        from skytorch.warmup import warm_up_process_worker
+
+        settings = get_settings()
+        _inference_executor = InferenceExecutor(
+            kind=settings.inference_executor,
+            max_workers=settings.inference_max_workers,
+            max_queue=settings.inference_max_queue,
+            retry_after=settings.inference_retry_after,
+            # Each worker process has its own models; warm them before it serves traffic
+            initializer=warm_up_process_worker if settings.warmup_enabled else None,
+        )
+
+    return _inference_executor
+
+
+def shutdown_inference_executor():
+    """Shut down the shared inference executor, if it was started."""
+    global _inference_executor
+
+    if _inference_executor is not None:
+        _inference_executor.shutdown(wait=False)
+        _inference_executor = None
@@ -0,0 +1,144 @@
+"""Social graph crawling over the AT Protocol client."""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+from skytorch.atproto_client import AtprotoClient, AtprotoError
+from skytorch.ndjson import dumps_line
+
+FOLLOWS = "follows"
+FOLLOWERS = "followers"
+
+# Largest page app.bsky.graph.getFollows/getFollowers will return
+PAGE_SIZE = 100
+
+
+def profile_summary(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an AppView profile view to the fields skytorch returns for graph listings."""
+    return {
+        "did": profile["did"],
+        "handle": profile.get("handle"),
+        "display_name": profile.get("displayName"),
+        "avatar": profile.get("avatar"),
+    }
+
+
+async def fetch_graph_page(
+    client: AtprotoClient,
+    direction: str,
+    actor: str,
+    limit: int = PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch one page of an actor's follows or followers.
+
+    Returns:
+        Tuple of (profile summaries, cursor for the next page or None at the end)
+    """
+    if direction == FOLLOWS:
+        result = await client.get_follows(actor=actor, limit=limit, cursor=cursor)
+    else:
+        result = await client.get_followers(actor=actor, limit=limit, cursor=cursor)
+    profiles = [profile_summary(profile) for profile in result.get(direction, [])]
+    return profiles, result.get("cursor") or None
+
+
+async def crawl_graph(
+    client: AtprotoClient,
+    direction: str,
+    actor: str,
+    cursor: Optional[str] = None,
+    max_records: Optional[int] = None,
+    first_page: Optional[Tuple[List[Dict[str, Any]], Optional[str]]] = None,
+) -> AsyncIterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+    """
+    Walk the cursor chain of an actor's follows or followers.
+
+    The request for the next page is issued as soon as the current page
+    arrives, so it is in flight while the caller handles the current page.
+
+    Args:
+        client: AT Protocol client
+        direction: FOLLOWS or FOLLOWERS
+        actor: DID or handle whose graph to crawl
+        cursor: Resume from this cursor instead of the beginning
+        max_records: Stop after this many profiles; the last page is requested
+            with a smaller limit so its cursor still resumes exactly after it
+        first_page: Already-fetched result for ``cursor``, to avoid fetching it again
+
+    Yields:
+        Tuples of (profiles, cursor); the cursor resumes after this page and is
+        None once the graph is exhausted
+    """
+    remaining = max_records
+
+    def fetch(page_cursor: Optional[str]) -> "asyncio.Task":
+        limit = PAGE_SIZE if remaining is None else min(PAGE_SIZE, remaining)
+        return asyncio.create_task(fetch_graph_page(client, direction, actor, limit, page_cursor))
+
+    pending = fetch(cursor) if first_page is None else None
+    try:
+        while True:
+            if pending is not None:
+                page, next_cursor = await pending
+                pending = None
+            else:
+                page, next_cursor = first_page
+
+            if remaining is not None:
+                remaining -= len(page)
+            if next_cursor and page and (remaining is None or remaining > 0):
+                pending = fetch(next_cursor)
+
+            yield page, next_cursor
+            if pending is None:
+                return
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def stream_graph(
+    pages: AsyncIterator[Tuple[List[Dict[str, Any]], Optional[str]]],
+    cursor: Optional[str] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Render crawled graph pages as NDJSON.
+
+    Each profile is one line. After each page a ``{"cursor": ...}`` line
+    records where to resume once everything before it has been processed.
+    The stream ends with a ``{"summary": ...}`` line holding the profile
+    count, the resume cursor, whether the graph was exhausted and, if the
+    crawl failed part way, the error.
+
+    Args:
+        pages: Output of ``crawl_graph``
+        cursor: Cursor the crawl started from
+    """
+    count = 0
+    error = None
+    complete = False
+    try:
+        async for page, next_cursor in pages:
+            for profile in page:
+                yield dumps_line(profile)
+            count += len(page)
+            if next_cursor:
+                cursor = next_cursor
+                yield dumps_line({"cursor": cursor})
+            else:
+                complete = True
+    except (AtprotoError, httpx.HTTPError) as e:
+        error = str(e) or type(e).__name__
+
+    yield dumps_line({
+        "summary": {
+            "count": count,
+            "cursor": None if complete else cursor,
+            "complete": complete,
+            "error": error,
+        }
+    })
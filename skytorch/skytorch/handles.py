@@ -0,0 +1,119 @@
+"""Handle to DID resolution with positive and negative caching."""
+
+import asyncio
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from skytorch.atproto_client import AtprotoClient, AtprotoError
+from skytorch.config import get_settings
+from skytorch.ttl_cache import TieredCache
+
+# Cached in place of a DID for handles that do not resolve
+_NOT_FOUND = ""
+
+
+def normalize_handle(handle: str) -> str:
+    """Handles are case-insensitive and often written with a leading @."""
+    return handle.strip().lstrip("@").lower()
+
+
+# Global cache instance (lazy loaded)
+_handle_cache: Optional[TieredCache] = None
+
+
+def get_handle_cache() -> Optional[TieredCache]:
+    """
+    Get or create the shared handle resolution cache.
+
+    Returns:
+        TieredCache of handle to DID (or "" for not found), or None if caching is disabled
+    """
+    global _handle_cache
+
+    settings = get_settings()
+    if not settings.handle_cache_enabled:
+        return None
+
+    if _handle_cache is None:
+        _handle_cache = TieredCache(
+            "handle",
+            redis_url=settings.redis_url if settings.handle_cache_redis_enabled else None,
+            local_max_items=settings.handle_cache_local_max_items,
+            local_ttl_seconds=settings.handle_cache_ttl,
+            redis_ttl_seconds=settings.handle_cache_ttl,
+        )
+
+    return _handle_cache
+
+
+async def resolve_handles(
+    client: AtprotoClient,
+    handles: Sequence[str],
+    bypass_cache: bool = False,
+    concurrency: int = 8,
+) -> Tuple[List[Optional[str]], Dict[str, Exception], int]:
+    """
+    Resolve handles to DIDs, serving what it can from the handle cache.
+
+    Handles that resolve are cached for HANDLE_CACHE_TTL; handles the
+    service reports as unresolvable are cached as not found for the shorter
+    HANDLE_CACHE_NEGATIVE_TTL (0 disables negative caching). Other failures
+    are not cached. Uncached handles are resolved concurrently, at most
+    ``concurrency`` at a time.
+
+    Args:
+        client: AT Protocol client
+        handles: Handles to resolve
+        bypass_cache: Skip cache lookups (fresh results are still cached)
+        concurrency: Maximum resolveHandle calls in flight
+
+    Returns:
+        Tuple of (DID or None for each handle in input order, exception by
+        normalized handle for lookups that failed, number of cache hits)
+    """
+    normalized = [normalize_handle(handle) for handle in handles]
+    unique = list(dict.fromkeys(normalized))
+    cache = get_handle_cache()
+
+    resolved: Dict[str, str] = {}
+    if cache is not None and not bypass_cache:
+        for handle, did in zip(unique, await cache.get_many(unique)):
+            if did is not None:
+                resolved[handle] = did
+    cache_hits = len(resolved)
+
+    misses = [handle for handle in unique if handle not in resolved]
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    errors: Dict[str, Exception] = {}
+
+    async def resolve(handle: str) -> Optional[str]:
+        async with semaphore:
+            try:
+                result = await client.resolve_handle(handle=handle)
+            except AtprotoError as e:
+                # The service answers 400 for handles that don't resolve
+                if e.status_code == 400 and not e.is_token_error:
+                    return _NOT_FOUND
+                errors[handle] = e
+                return None
+            except Exception as e:
+                errors[handle] = e
+                return None
+        return result["did"]
+
+    if misses:
+        found: Dict[str, str] = {}
+        not_found: Dict[str, str] = {}
+        for handle, did in zip(misses, await asyncio.gather(*(resolve(handle) for handle in misses))):
+            if did == _NOT_FOUND:
+                not_found[handle] = did
+            elif did is not None:
+                found[handle] = did
+        resolved.update(found)
+        resolved.update(not_found)
+        if cache is not None:
+            negative_ttl = get_settings().handle_cache_negative_ttl
+            await cache.set_many(found)
+            if negative_ttl > 0:
+                await cache.set_many(not_found, local_ttl_seconds=negative_ttl, redis_ttl_seconds=negative_ttl)
+
+    return [resolved.get(handle) or None for handle in normalized], errors, cache_hits
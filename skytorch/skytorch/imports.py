@@ -0,0 +1,63 @@
+"""Lazy imports of heavy dependencies, timed so their startup and first-use cost is visible."""
+
+import importlib
+import importlib.util
+import logging
+import sys
+import threading
+import time
+from typing import Any, Dict
+
+from skytorch.memory import current_rss_bytes
+
+logger = logging.getLogger(__name__)
+
+_import_timings: Dict[str, dict] = {}
+_lock = threading.Lock()
+
+
+def has_module(name: str) -> bool:
+    """Whether ``name`` is installed, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def timed_import(name: str) -> Any:
+    """
+    Import a module, recording how long it took and how much RSS it added.
+
+    Modules that are already imported are returned as-is and not recorded,
+    so each entry is the cost actually paid by this process. Nested timed
+    imports are included in the outer module's cost.
+
+    Args:
+        name: Dotted module name
+
+    Returns:
+        The imported module
+
+    Raises:
+        ImportError: If the module or one of its dependencies is missing
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    rss_before = current_rss_bytes()
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    seconds = time.perf_counter() - started
+    rss_added = max(0, current_rss_bytes() - rss_before)
+
+    with _lock:
+        _import_timings.setdefault(name, {"seconds": seconds, "rss_bytes": rss_added})
+    logger.info(f"Imported {name} in {seconds:.2f}s (+{rss_added / 1024 / 1024:.0f} MB)")
+    return module
+
+
+def import_timings() -> Dict[str, dict]:
+    """Return the recorded import costs, in import order."""
+    with _lock:
+        return {name: dict(timing) for name, timing in _import_timings.items()}
@@ -1,17 +1,77 @@
 """Main FastAPI application entry point."""
 
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from skytorch.atproto_client import reset_atproto_client
 from skytorch.config import get_settings
-from skytorch.routers import health, api
+from skytorch.executor import shutdown_inference_executor
+from skytorch.imports import import_timings, timed_import
+from skytorch.metrics import MetricsMiddleware
+from skytorch.routers import health, api, metrics
+from skytorch.warmup import get_warmup_state, run_startup_warmup
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+# Routers mounted under /api/v1 for each SKYTORCH_ROLE. The graph role
+# never imports the NLP router, so spacy, sentence-transformers and torch
+# are never loaded.
+ROLE_ROUTERS = {
+    "all": ("nlp", "graph"),
+    "nlp": ("nlp",),
+    "graph": ("graph",),
+}
+
+if settings.skytorch_role not in ROLE_ROUTERS:
+    raise ValueError(
+        f"Unknown SKYTORCH_ROLE '{settings.skytorch_role}' (expected one of: {', '.join(ROLE_ROUTERS)})"
+    )
+role_routers = ROLE_ROUTERS[settings.skytorch_role]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm models and load the vector index in the background on startup; release the executor and connections on shutdown."""
+    imports_text = ", ".join(
+        f"{name}={timing['seconds']:.2f}s (+{timing['rss_bytes'] / 1024 / 1024:.0f} MB)"
+        for name, timing in import_timings().items()
+    )
+    logger.info(f"Starting in role '{settings.skytorch_role}'; imports: {imports_text or 'none'}")
+
+    warmup_task = None
+    if settings.warmup_enabled:
+        warmup_task = asyncio.create_task(run_startup_warmup(
+            login="graph" in role_routers,
+            load_models="nlp" in role_routers,
+        ))
+    else:
+        get_warmup_state().status = "ready"
+
+    index_task = None
+    if settings.vector_index_enabled and "nlp" in role_routers:
+        from skytorch.vector_index import run_vector_index_sync
+        index_task = asyncio.create_task(run_vector_index_sync())
+
+    yield
+
+    for task in (warmup_task, index_task):
+        if task is not None and not task.done():
+            task.cancel()
+    shutdown_inference_executor()
+    await reset_atproto_client()
+
+
 app = FastAPI(
     title="Skytorch API",
     description="FastAPI application for Skytorch",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -23,9 +83,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so latency includes the rest of the middleware stack
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(health.router, tags=["health"])
+app.include_router(metrics.router, tags=["metrics"])
 app.include_router(api.router, prefix="/api/v1", tags=["api"])
+for router_name in role_routers:
+    app.include_router(timed_import(f"skytorch.routers.{router_name}").router, prefix="/api/v1", tags=[router_name])
 
 
 @app.get("/")
@@ -35,5 +101,6 @@ async def root():
         "name": "Skytorch",
         "version": "0.1.0",
         "status": "running",
+        "role": settings.skytorch_role,
     }
 
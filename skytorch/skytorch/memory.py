@@ -0,0 +1,100 @@
+"""Per-process memory accounting that separates shared model pages from each worker's own memory."""
+
+import os
+from typing import List, Optional, Union
+
+# Set by the pre-fork server to its own PID before forking workers
+PREFORK_PARENT_ENV = "SKYTORCH_PREFORK_PARENT"
+
+# smaps_rollup fields summed into each reported figure
+_UNIQUE_FIELDS = ("Private_Clean", "Private_Dirty")
+_SHARED_FIELDS = ("Shared_Clean", "Shared_Dirty")
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process, or 0 where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def process_memory(pid: Union[int, str] = "self") -> Optional[dict]:
+    """
+    Memory of one process, from ``/proc/<pid>/smaps_rollup``.
+
+    ``uss_bytes`` (unique set size) is memory only this process maps, i.e.
+    what killing it would free. ``pss_bytes`` charges each shared page
+    fractionally to every process mapping it, so PSS summed over the
+    workers is the server's real footprint.
+
+    Args:
+        pid: Process to inspect (defaults to this one)
+
+    Returns:
+        Dict of rss_bytes, pss_bytes, uss_bytes and shared_bytes, or None if
+        the process is gone or smaps_rollup is unavailable
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as smaps:
+            for line in smaps:
+                name, _, value = line.partition(":")
+                parts = value.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    fields[name] = int(parts[0]) * 1024
+    except (OSError, ValueError):
+        return None
+    if "Rss" not in fields:
+        return None
+    return {
+        "pid": os.getpid() if pid == "self" else int(pid),
+        "rss_bytes": fields["Rss"],
+        "pss_bytes": fields.get("Pss", 0),
+        "uss_bytes": sum(fields.get(name, 0) for name in _UNIQUE_FIELDS),
+        "shared_bytes": sum(fields.get(name, 0) for name in _SHARED_FIELDS),
+    }
+
+
+def _child_pids(pid: int) -> List[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            return [int(child) for child in children.read().split()]
+    except (OSError, ValueError):
+        return []
+
+
+def prefork_parent() -> Optional[int]:
+    """PID of the pre-fork server this process is a worker of, or None."""
+    parent = os.getenv(PREFORK_PARENT_ENV)
+    if parent and parent.isdigit() and int(parent) == os.getppid():
+        return int(parent)
+    return None
+
+
+def server_memory() -> dict:
+    """
+    Memory of this process and, under the pre-fork server, of the parent and every worker.
+
+    Returns:
+        Dict with ``process`` (this worker), ``parent`` and ``workers`` (empty
+        when not pre-forked) and ``total_pss_bytes`` / ``total_uss_bytes``
+        over all of them
+    """
+    current = process_memory()
+    parent_pid = prefork_parent()
+    parent = process_memory(parent_pid) if parent_pid else None
+    if parent_pid:
+        workers = [memory for memory in map(process_memory, _child_pids(parent_pid)) if memory]
+    else:
+        workers = []
+
+    everything = ([parent] if parent else []) + (workers or ([current] if current else []))
+    return {
+        "process": current,
+        "parent": parent,
+        "workers": workers,
+        "total_pss_bytes": sum(memory["pss_bytes"] for memory in everything),
+        "total_uss_bytes": sum(memory["uss_bytes"] for memory in everything),
+    }
@@ -0,0 +1,410 @@
+"""Prometheus metrics: request latency, inference stages, upstream calls and component stats."""
+
+import contextlib
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+    HAS_PROMETHEUS = True
+except ImportError:
+    HAS_PROMETHEUS = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+from skytorch.config import get_settings
+from skytorch.memory import server_memory
+
+logger = logging.getLogger(__name__)
+
+ENABLED = HAS_PROMETHEUS and get_settings().metrics_enabled
+
+# Inference stages
+STAGE_TOKENIZE = "tokenize"
+STAGE_FORWARD = "forward"
+STAGE_SERIALIZE = "serialize"
+
+# Route label for requests that matched no route, so probes for random
+# paths can't grow the label set
+UNMATCHED_ROUTE = "unmatched"
+
+if ENABLED:
+    HTTP_IN_PROGRESS = Gauge(
+        "skytorch_http_requests_in_progress",
+        "HTTP requests being served",
+        ["method", "route"],
+        multiprocess_mode="livesum",
+    )
+    HTTP_DURATION = Histogram(
+        "skytorch_http_request_duration_seconds",
+        "HTTP request latency, until the last byte of the response is sent",
+        ["method", "route", "status"],
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+    )
+    INFERENCE_STAGE = Histogram(
+        "skytorch_inference_stage_seconds",
+        "Time spent per model call in each inference stage",
+        ["model", "stage"],
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    )
+    INFERENCE_BATCH_SIZE = Histogram(
+        "skytorch_inference_batch_size",
+        "Texts per model encode call",
+        ["model"],
+        buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+    )
+    INFERENCE_INPUT_TOKENS = Histogram(
+        "skytorch_inference_input_tokens",
+        "Tokens per input text after truncation, including special tokens",
+        ["model"],
+        buckets=(8, 16, 32, 64, 128, 256, 384, 512),
+    )
+    INFERENCE_QUEUE_WAIT = Histogram(
+        "skytorch_inference_queue_wait_seconds",
+        "Time inference work waited for a free executor worker",
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+    )
+    MODEL_LOAD = Histogram(
+        "skytorch_model_load_seconds",
+        "Time taken to load a model",
+        ["kind", "backend"],
+        buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+    )
+    ATPROTO_DURATION = Histogram(
+        "skytorch_atproto_request_duration_seconds",
+        "AT Protocol XRPC call latency, excluding time queued in the scheduler",
+        ["method"],
+        buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    )
+    ATPROTO_ERRORS = Counter(
+        "skytorch_atproto_errors_total",
+        "AT Protocol XRPC calls that failed, by HTTP status or exception type",
+        ["method", "error"],
+    )
+
+# Per-thread tokenize time, so an encode call can split its time into stages
+_stage_local = threading.local()
+
+
+def _add_tokenize_seconds(seconds: float):
+    _stage_local.tokenize_seconds = getattr(_stage_local, "tokenize_seconds", 0.0) + seconds
+
+
+def instrument_encoder(model: Any, model_name: str) -> Any:
+    """
+    Time an embedding model's tokenizer and record input lengths.
+
+    Wraps the model's ``tokenize`` method, which both ``encode`` and
+    bucketed batching call, so ``inference_timer`` can split encode time
+    into tokenization and forward pass.
+
+    Args:
+        model: SentenceTransformer, or a backend with the same ``tokenize``/``encode`` interface
+        model_name: Model label for the metrics
+
+    Returns:
+        The same model
+    """
+    if not ENABLED or not hasattr(model, "tokenize"):
+        return model
+
+    tokenize = model.tokenize
+    input_tokens = INFERENCE_INPUT_TOKENS.labels(model_name)
+
+    def timed_tokenize(texts, *args, **kwargs):
+        started = time.perf_counter()
+        features = tokenize(texts, *args, **kwargs)
+        _add_tokenize_seconds(time.perf_counter() - started)
+        mask = features.get("attention_mask") if hasattr(features, "get") else None
+        if mask is not None:
+            for length in mask.sum(1).tolist():
+                input_tokens.observe(length)
+        return features
+
+    model.tokenize = timed_tokenize
+    return model
+
+
+@contextlib.contextmanager
+def inference_timer(model_name: str, batch_size: int) -> Iterator[None]:
+    """
+    Record the batch size and the tokenize/forward split of one encode call.
+
+    Forward time is the encode time not spent in the instrumented tokenizer.
+    """
+    if not ENABLED:
+        yield
+        return
+    _stage_local.tokenize_seconds = 0.0
+    started = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - started
+    tokenize_seconds = _stage_local.tokenize_seconds
+    INFERENCE_BATCH_SIZE.labels(model_name).observe(batch_size)
+    INFERENCE_STAGE.labels(model_name, STAGE_TOKENIZE).observe(tokenize_seconds)
+    INFERENCE_STAGE.labels(model_name, STAGE_FORWARD).observe(max(0.0, elapsed - tokenize_seconds))
+
+
+@contextlib.contextmanager
+def stage_timer(model_name: str, stage: str) -> Iterator[None]:
+    """Record the time spent in one inference stage, e.g. serializing vectors."""
+    if not ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    yield
+    INFERENCE_STAGE.labels(model_name, stage).observe(time.perf_counter() - started)
+
+
+def observe_queue_wait(seconds: float):
+    if ENABLED:
+        INFERENCE_QUEUE_WAIT.observe(seconds)
+
+
+def observe_model_load(kind: str, backend: str, seconds: float):
+    if ENABLED:
+        MODEL_LOAD.labels(kind, backend).observe(seconds)
+
+
+def observe_upstream(method: str, seconds: float, error: Optional[str] = None):
+    """Record one AT Protocol call; ``error`` is the HTTP status or exception type if it failed."""
+    if not ENABLED:
+        return
+    ATPROTO_DURATION.labels(method).observe(seconds)
+    if error is not None:
+        ATPROTO_ERRORS.labels(method, error).inc()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route in-flight requests and latency.
+
+    Routes are labelled by their path template rather than the raw path.
+    Latency covers the whole response, including streamed bodies.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes = {}
+
+    def _route(self, scope) -> str:
+        key = (scope["method"], scope["path"])
+        route = self._routes.get(key)
+        if route is None:
+            route = UNMATCHED_ROUTE
+            from starlette.routing import Match
+
+            for candidate in scope["app"].router.routes:
+                match, _ = candidate.matches(scope)
+                if match == Match.FULL:
+                    route = getattr(candidate, "path", UNMATCHED_ROUTE)
+                    break
+            if len(self._routes) >= 4096:
+                self._routes.clear()
+            self._routes[key] = route
+        return route
+
+    async def __call__(self, scope, receive, send):
+        if not ENABLED or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._route(scope)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            HTTP_DURATION.labels(method, route, str(status_code)).observe(time.perf_counter() - started)
+
+
+def _loaded(module_name: str, attribute: str):
+    """A component's global instance, without importing (or creating) it if unused."""
+    module = sys.modules.get(module_name)
+    return getattr(module, attribute, None) if module is not None else None
+
+
+def _gauge(name: str, documentation: str, value: float, labels: Optional[dict] = None):
+    family = GaugeMetricFamily(name, documentation, labels=list(labels or {}))
+    family.add_metric(list((labels or {}).values()), value)
+    return family
+
+
+def _counter(name: str, documentation: str, value: float, labels: Optional[dict] = None):
+    family = CounterMetricFamily(name, documentation, labels=list(labels or {}))
+    family.add_metric(list((labels or {}).values()), value)
+    return family
+
+
+class StatsCollector:
+    """
+    Export the counters skytorch components already keep, read at scrape time.
+
+    Covers the inference executor, model registry, micro-batcher, process
+    memory, vector index, caches and AT Protocol scheduler, so none of them pay for metrics on the hot path.
+    Components that were never used in this process are skipped.
+    """
+
+    def collect(self):
+        executor = _loaded("skytorch.executor", "_inference_executor")
+        if executor is not None:
+            stats = executor.stats()
+            yield _gauge("skytorch_inference_queue_depth", "Inference tasks waiting for a worker", stats["queue_depth"])
+            yield _gauge("skytorch_inference_running", "Inference tasks running", stats["running"])
+            yield _gauge("skytorch_inference_workers", "Inference executor workers", stats["max_workers"])
+            for counter in ("submitted", "completed", "failed", "rejected"):
+                yield _counter(f"skytorch_inference_tasks_{counter}", f"Inference tasks {counter}", stats[counter])
+
+        registry = _loaded("skytorch.model_registry", "_model_registry")
+        if registry is not None:
+            stats = registry.stats()
+            labels = ["kind", "name", "device", "precision", "backend"]
+            memory = GaugeMetricFamily("skytorch_model_memory_bytes", "Estimated memory held by a loaded model", labels=labels)
+            load = GaugeMetricFamily("skytorch_model_loaded_seconds", "How long a loaded model took to load", labels=labels)
+            uses = CounterMetricFamily("skytorch_model_uses", "Requests for a loaded model", labels=labels)
+            for model in stats["models"]:
+                values = [model[label] for label in labels]
+                memory.add_metric(values, model["size_bytes"])
+                load.add_metric(values, model["load_seconds"])
+                uses.add_metric(values, model["uses"])
+            yield memory
+            yield load
+            yield uses
+            yield _gauge("skytorch_model_memory_budget_bytes", "Model memory budget (0 is unlimited)", stats["memory_budget_bytes"])
+            yield _counter("skytorch_model_evictions", "Models evicted to stay within the memory budget", stats["evictions"])
+
+        batcher = _loaded("skytorch.batching", "_embedding_batcher")
+        if batcher is not None:
+            stats = batcher.stats()
+            yield _counter("skytorch_microbatch_batches", "Micro-batches flushed", stats["batches"])
+            yield _counter("skytorch_microbatch_items", "Texts embedded through the micro-batcher", stats["items"])
+            flushes = CounterMetricFamily("skytorch_microbatch_flushes", "Micro-batch flushes by reason", labels=["reason"])
+            for reason, count in stats["flush_reasons"].items():
+                flushes.add_metric([reason], count)
+            yield flushes
+
+        bucketing = _loaded("skytorch.bucketing", "_bucketing_stats")
+        if bucketing is not None:
+            stats = bucketing.stats()
+            yield _counter("skytorch_bucketing_tokens", "Real tokens in bucketed embedding batches", stats["tokens"])
+            yield _counter("skytorch_bucketing_padded_tokens", "Token slots computed for bucketed embedding batches", stats["padded_tokens"])
+            yield _counter(
+                "skytorch_bucketing_unbucketed_padded_tokens",
+                "Token slots SentenceTransformer.encode's own length-sorted batches would have computed",
+                stats["unbucketed_padded_tokens"],
+            )
+            yield _gauge("skytorch_bucketing_padding_ratio", "Share of computed token slots that were padding", stats["padding_ratio"])
+
+        index = _loaded("skytorch.vector_index", "_vector_index")
+        if index is not None:
+            stats = index.stats()
+            yield _gauge("skytorch_vector_index_chunks", "Chunks in the vector index", stats["chunks"])
+            yield _gauge("skytorch_vector_index_deleted_rows", "Tombstoned vector index rows awaiting the next rebuild", stats["deleted_rows"])
+            yield _gauge("skytorch_vector_index_vector_bytes", "Bytes of vectors in the vector index", stats["vector_bytes"])
+            yield _gauge("skytorch_vector_index_ann_rows", "Rows covered by the HNSW graph", stats["ann_rows"])
+            yield _counter("skytorch_vector_index_searches", "Vector index searches", stats["searches"])
+            yield _counter("skytorch_vector_index_ann_searches", "Vector index searches answered from the HNSW graph", stats["ann_searches"])
+
+        memory = server_memory()
+        processes = [("parent", memory["parent"])] if memory["parent"] else []
+        processes += [("worker", worker) for worker in memory["workers"] or [memory["process"]] if worker]
+        if processes:
+            labels = ["role", "pid"]
+            unique = GaugeMetricFamily("skytorch_process_unique_memory_bytes", "Memory mapped only by this process (USS)", labels=labels)
+            proportional = GaugeMetricFamily(
+                "skytorch_process_proportional_memory_bytes", "Memory charged to this process, shared pages split (PSS)", labels=labels
+            )
+            shared = GaugeMetricFamily("skytorch_process_shared_memory_bytes", "Memory shared with other processes", labels=labels)
+            for role, process in processes:
+                values = [role, str(process["pid"])]
+                unique.add_metric(values, process["uss_bytes"])
+                proportional.add_metric(values, process["pss_bytes"])
+                shared.add_metric(values, process["shared_bytes"])
+            yield unique
+            yield proportional
+            yield shared
+
+        caches = {
+            "embedding": _loaded("skytorch.embedding_cache", "_embedding_cache"),
+            "profile": _loaded("skytorch.profiles", "_profile_cache"),
+            "handle": _loaded("skytorch.handles", "_handle_cache"),
+        }
+        lookups = CounterMetricFamily("skytorch_cache_lookups", "Cache lookups by result", labels=["cache", "result"])
+        items = GaugeMetricFamily("skytorch_cache_local_items", "Entries in the in-process cache tier", labels=["cache"])
+        redis_errors = CounterMetricFamily("skytorch_cache_redis_errors", "Failed Redis cache calls", labels=["cache"])
+        for name, cache in caches.items():
+            if cache is None:
+                continue
+            stats = cache.stats()
+            for result in ("local_hits", "redis_hits", "misses"):
+                lookups.add_metric([name, result], stats[result])
+            items.add_metric([name], stats["local_items"])
+            redis_errors.add_metric([name], stats["redis_errors"])
+        yield lookups
+        yield items
+        yield redis_errors
+
+        client = _loaded("skytorch.atproto_client", "_atproto_client")
+        if client is not None:
+            stats = client.scheduler.stats()
+            yield _gauge("skytorch_atproto_rate_per_second", "Upstream request rate the scheduler paces to", stats["rate_per_second"])
+            yield _gauge("skytorch_atproto_tokens", "Request slots available in the scheduler bucket", stats["tokens"])
+            yield _counter("skytorch_atproto_throttled", "Upstream 429 responses", stats["throttled"])
+            yield _counter("skytorch_atproto_pauses", "Times the scheduler paused for a rate limit window", stats["pauses"])
+            yield _counter("skytorch_atproto_shared_rate_errors", "Shared Redis rate bucket calls that failed", stats["shared_errors"])
+            yield _counter("skytorch_atproto_coalesced", "Calls served by an identical in-flight request", client.coalesced)
+            queued = GaugeMetricFamily("skytorch_atproto_queued", "Calls waiting in the scheduler", labels=["lane"])
+            waits = CounterMetricFamily("skytorch_atproto_queue_wait_seconds", "Time calls waited in the scheduler", labels=["lane"])
+            for lane, lane_stats in stats["lanes"].items():
+                queued.add_metric([lane], lane_stats["queued"])
+                waits.add_metric([lane], lane_stats["total_wait_seconds"])
+            yield queued
+            yield waits
+            sessions = CounterMetricFamily("skytorch_atproto_sessions", "Access tokens obtained, by how", labels=["source"])
+            for source, count in client.session_counts.items():
+                sessions.add_metric([source], count)
+            yield sessions
+
+
+if ENABLED:
+    REGISTRY.register(StatsCollector())
+
+
+def render_metrics() -> bytes:
+    """
+    Render every metric in the Prometheus text format.
+
+    With ``PROMETHEUS_MULTIPROC_DIR`` set (multi-worker uvicorn or gunicorn),
+    histograms and counters are aggregated across workers; component stats
+    come from the worker serving the scrape.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(StatsCollector())
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
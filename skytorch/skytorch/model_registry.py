@@ -0,0 +1,214 @@
+"""Registry of loaded NLP models with memory-bounded LRU eviction."""
+
+import gc
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from skytorch import metrics
+from skytorch.config import get_settings
+from skytorch.memory import current_rss_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class ModelKey(NamedTuple):
+    """Identifies one loaded model instance."""
+    kind: str
+    name: str
+    device: str = "cpu"
+    precision: str = "float32"
+    backend: str = "torch"
+
+
+class _ModelEntry:
+    """A loaded model plus the bookkeeping used for eviction and reporting."""
+
+    def __init__(self, model: Any, size_bytes: int, load_seconds: float):
+        self.model = model
+        self.size_bytes = size_bytes
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.uses = 0
+
+
+def _parameter_bytes(model: Any) -> int:
+    """Size of a torch module's parameters and buffers, or 0 for non-torch models."""
+    if not hasattr(model, "parameters"):
+        return 0
+    total = 0
+    for tensor in model.parameters():
+        total += tensor.numel() * tensor.element_size()
+    if hasattr(model, "buffers"):
+        for tensor in model.buffers():
+            total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class ModelRegistry:
+    """
+    Hold several loaded models at once, keyed by (kind, name, device, precision, backend).
+
+    Models are evicted least-recently-used first whenever the total estimated
+    size exceeds ``memory_budget_bytes`` (0 disables the budget). The model
+    that was just requested is never evicted, so a single model larger than
+    the budget still loads.
+
+    Loads are single-flight: concurrent first requests for the same key wait
+    on one load instead of each loading their own copy.
+    """
+
+    def __init__(self, memory_budget_bytes: int = 0):
+        self.memory_budget_bytes = memory_budget_bytes
+        self._entries: "OrderedDict[ModelKey, _ModelEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[ModelKey, threading.Lock] = {}
+
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, key: ModelKey, loader: Callable[[], Any]) -> Any:
+        """
+        Return the model for ``key``, loading it with ``loader`` if needed.
+
+        Args:
+            key: Model identity
+            loader: Zero-argument callable that loads and returns the model
+
+        Returns:
+            Loaded model instance
+        """
+        entry = self._touch(key)
+        if entry is not None:
+            return entry.model
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Another thread may have finished loading while we waited
+            entry = self._touch(key)
+            if entry is not None:
+                return entry.model
+
+            rss_before = current_rss_bytes()
+            started = time.perf_counter()
+            model = loader()
+            load_seconds = time.perf_counter() - started
+            metrics.observe_model_load(key.kind, key.backend, load_seconds)
+            size_bytes = _parameter_bytes(model) or max(0, current_rss_bytes() - rss_before)
+
+            entry = _ModelEntry(model, size_bytes, load_seconds)
+            entry.uses = 1
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                self.loads += 1
+                self._evict_over_budget(keep=key)
+
+            logger.info(
+                f"Loaded {key.kind} model {key.name} on {key.device}/{key.precision}/{key.backend} "
+                f"in {load_seconds:.2f}s (~{size_bytes / 1024 / 1024:.0f} MB)"
+            )
+            return model
+
+    def _touch(self, key: ModelKey) -> Optional[_ModelEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry.last_used = time.time()
+                entry.uses += 1
+            return entry
+
+    def _evict_over_budget(self, keep: ModelKey):
+        """Drop least-recently-used models until under budget. Caller holds the lock."""
+        if self.memory_budget_bytes <= 0:
+            return
+        evicted = False
+        while self.total_bytes() > self.memory_budget_bytes:
+            victim = next((key for key in self._entries if key != keep), None)
+            if victim is None:
+                break
+            entry = self._entries.pop(victim)
+            self.evictions += 1
+            evicted = True
+            logger.info(
+                f"Evicted {victim.kind} model {victim.name} "
+                f"(~{entry.size_bytes / 1024 / 1024:.0f} MB) to stay within memory budget"
+            )
+        if evicted:
+            gc.collect()
+
+    def evict(self, key: ModelKey) -> bool:
+        """
+        Remove a model from the registry.
+
+        Returns:
+            True if the model was loaded
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.evictions += 1
+        gc.collect()
+        return True
+
+    def total_bytes(self) -> int:
+        """Estimated memory held by all loaded models."""
+        return sum(entry.size_bytes for entry in self._entries.values())
+
+    def stats(self) -> dict:
+        """Return loaded models (most recently used last) and registry counters."""
+        with self._lock:
+            models = [
+                {
+                    "kind": key.kind,
+                    "name": key.name,
+                    "device": key.device,
+                    "precision": key.precision,
+                    "backend": key.backend,
+                    "size_bytes": entry.size_bytes,
+                    "load_seconds": entry.load_seconds,
+                    "loaded_at": entry.loaded_at,
+                    "last_used": entry.last_used,
+                    "uses": entry.uses,
+                }
+                for key, entry in self._entries.items()
+            ]
+        return {
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "total_bytes": sum(model["size_bytes"] for model in models),
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "models": models,
+        }
+
+
+# Global registry instance (lazy loaded)
+_model_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Get or create the process-wide model registry.
+
+    Returns:
+        ModelRegistry configured from settings
+    """
+    global _model_registry
+
+    if _model_registry is None:
+        with _registry_lock:
+            if _model_registry is None:
+                settings = get_settings()
+                _model_registry = ModelRegistry(
+                    memory_budget_bytes=settings.model_memory_budget_mb * 1024 * 1024
+                )
+
+    return _model_registry
@@ -0,0 +1,55 @@
+"""Newline-delimited JSON streaming helpers."""
+
+import json
+from typing import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Stream NDJSON while the request body is still being read.
+
+    Starlette's StreamingResponse watches for client disconnects by reading
+    from ``receive``, which would swallow request body chunks the body
+    iterator has not consumed yet. Here the body iterator owns ``receive``;
+    a disconnect surfaces as ClientDisconnect from the request stream or as
+    a failed send.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+
+def dumps_line(payload: dict) -> bytes:
+    """Serialize one NDJSON line, including the trailing newline."""
+    if HAS_ORJSON:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(payload) + "\n").encode("utf-8")
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Yield complete non-blank lines from a byte stream, holding at most one partial line."""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if pending.strip():
+        yield pending
@@ -1,29 +1,127 @@
 """Natural Language Processing utilities using spacy and sentence-transformers."""
 
-import os
-from typing import Optional, List
+import logging
+from typing import List, Optional, Set, Tuple
 
-try:
-    import spacy
-    from sentence_transformers import SentenceTransformer
-    HAS_NLP_DEPS = True
-except ImportError:
-    HAS_NLP_DEPS = False
-    spacy = None
-    SentenceTransformer = None
+from skytorch import metrics
+from skytorch.bucketing import encode_bucketed, get_bucketing_stats, parse_boundaries
+from skytorch.chunking import Chunk, chunk_text
+from skytorch.config import get_settings
+from skytorch.embedding_backends import (
+    BACKEND_TORCH,
+    BACKEND_TORCH_INT8,
+    PARITY_CORPUS,
+    QUANTIZED_BACKENDS,
+    forward_features,
+    load_sentence_encoder,
+    parse_backend_map,
+    supports_bucketing,
+)
+from skytorch.imports import has_module, timed_import
+from skytorch.model_registry import ModelKey, get_model_registry
 
+# spacy and sentence-transformers (and with it torch) are only imported when
+# the first model loads, so processes that never run NLP don't pay for them
+HAS_NLP_DEPS = has_module("spacy") and has_module("sentence_transformers")
 
-# Global model instances (lazy loaded)
-_nlp_model: Optional[object] = None
-_sentence_model: Optional[object] = None
+logger = logging.getLogger(__name__)
 
+# Model kinds held in the model registry
+SPACY_MODEL = "spacy"
+SPACY_NER_MODEL = "spacy_ner"
+SENTENCE_TRANSFORMER_MODEL = "sentence_transformer"
 
-def get_spacy_model(model_name: str = "en_core_web_sm"):
+# Pipeline components kept in entity-only mode: the NER component itself
+# plus the embedding layers it may listen to.
+NER_PIPE_NAMES = {"ner", "entity_ruler", "tok2vec", "transformer"}
+
+
+def _load_spacy_model(model_name: str, entities_only: bool = False):
+    try:
+        nlp = timed_import("spacy").load(model_name)
+    except OSError:
+        raise OSError(
+            f"spacy model '{model_name}' not found. "
+            f"Download it with: python -m spacy download {model_name}"
+        )
+    if entities_only:
+        # Tagger, parser, lemmatizer etc. don't affect doc.ents; skip them
+        disabled = [name for name in nlp.pipe_names if name not in NER_PIPE_NAMES]
+        nlp.select_pipes(disable=disabled)
+    return nlp
+
+
+def _sentence_transformer_key(model_name: str, backend: Optional[str] = None) -> ModelKey:
+    settings = get_settings()
+    if backend is None:
+        backend = parse_backend_map(settings.embedding_backends).get(
+            model_name, settings.embedding_backend
+        )
+    if backend == BACKEND_TORCH:
+        return ModelKey(
+            SENTENCE_TRANSFORMER_MODEL, model_name, settings.model_device, settings.model_precision
+        )
+    # Optimized backends run float32 (or int8) on CPU regardless of MODEL_DEVICE/MODEL_PRECISION
+    return ModelKey(SENTENCE_TRANSFORMER_MODEL, model_name, "cpu", "float32", backend)
+
+
+def model_revision(model_name: str) -> Optional[str]:
+    """The pinned ``EMBEDDING_MODEL_REVISION`` for the configured embedding model, else None."""
+    settings = get_settings()
+    if model_name == settings.embedding_model_name and settings.embedding_model_revision:
+        return settings.embedding_model_revision
+    return None
+
+
+def _preload_entries(preload: str) -> List[Tuple[str, str]]:
+    """Parse a ``kind:name`` comma-separated preload string, skipping malformed entries."""
+    entries = []
+    for item in preload.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        kind, _, model_name = item.partition(":")
+        if not kind.strip() or not model_name.strip():
+            logger.warning(f"Ignoring invalid model preload entry: {item}")
+            continue
+        entries.append((kind.strip(), model_name.strip()))
+    return entries
+
+
+def allowed_sentence_models() -> Set[str]:
+    """
+    Sentence transformer models API requests may name.
+    
+    ``EMBEDDING_MODEL_NAME``, the sentence transformers in ``MODEL_PRELOAD``
+    and ``EMBEDDING_BACKENDS``, and anything in ``ALLOWED_MODELS``. Any other
+    name would download and keep another model on request.
+    """
+    settings = get_settings()
+    names = {settings.embedding_model_name}
+    names.update(parse_backend_map(settings.embedding_backends))
+    names.update(name for kind, name in _preload_entries(settings.model_preload) if kind == SENTENCE_TRANSFORMER_MODEL)
+    names.update(name.strip() for name in settings.allowed_models.split(",") if name.strip())
+    return names
+
+
+def check_model_allowed(model_name: str):
+    """
+    Raise unless API requests may use ``model_name``.
+    
+    Raises:
+        ValueError: If the model is not in ``allowed_sentence_models``
+    """
+    if model_name not in allowed_sentence_models():
+        raise ValueError(f"Model '{model_name}' is not allowed; add it to ALLOWED_MODELS to serve it")
+
+
+def get_spacy_model(model_name: str = "en_core_web_sm", entities_only: bool = False):
     """
     Get or load a spacy language model.
     
     Args:
         model_name: Name of the spacy model to load
+        entities_only: Load a trimmed pipeline that only runs what NER needs
         
     Returns:
         Loaded spacy model
@@ -31,47 +129,82 @@ def get_spacy_model(model_name: str = "en_core_web_sm"):
     Raises:
         OSError: If the model is not installed
     """
-    global _nlp_model
-    
     if not HAS_NLP_DEPS:
         raise ImportError(
             "spacy is not installed. Install it with: pip install spacy"
         )
     
-    if _nlp_model is None:
-        try:
-            _nlp_model = spacy.load(model_name)
-        except OSError:
-            raise OSError(
-                f"spacy model '{model_name}' not found. "
-                f"Download it with: python -m spacy download {model_name}"
-            )
-    
-    return _nlp_model
+    return get_model_registry().get(
+        ModelKey(SPACY_NER_MODEL if entities_only else SPACY_MODEL, model_name),
+        lambda: _load_spacy_model(model_name, entities_only=entities_only),
+    )
 
 
-def get_sentence_transformer(model_name: str = "all-MiniLM-L6-v2"):
+def get_sentence_transformer(model_name: str = "all-MiniLM-L6-v2", backend: Optional[str] = None):
     """
     Get or load a sentence transformer model.
     
+    The model is served by the backend configured for it in
+    ``EMBEDDING_BACKENDS`` (falling back to ``EMBEDDING_BACKEND``). The eager
+    torch backend runs on ``MODEL_DEVICE`` with ``MODEL_PRECISION``.
+    
     Args:
         model_name: Name of the sentence transformer model to load
+        backend: Override the configured backend
         
     Returns:
-        Loaded SentenceTransformer model
+        Loaded SentenceTransformer, or a backend with the same ``encode`` interface
     """
-    global _sentence_model
-    
     if not HAS_NLP_DEPS:
         raise ImportError(
             "sentence-transformers is not installed. "
             "Install it with: pip install sentence-transformers"
         )
     
-    if _sentence_model is None:
-        _sentence_model = SentenceTransformer(model_name)
+    key = _sentence_transformer_key(model_name, backend)
+    return get_model_registry().get(
+        key,
+        lambda: metrics.instrument_encoder(
+            load_sentence_encoder(
+                model_name,
+                key.backend,
+                key.device,
+                key.precision,
+                get_settings().onnx_export_dir,
+                revision=model_revision(model_name),
+            ),
+            model_name,
+        ),
+    )
+
+
+def embedding_model_version(model_name: str = "all-MiniLM-L6-v2") -> str:
+    """
+    Version string for embeddings produced by a sentence transformer model.
     
-    return _sentence_model
+    This is the model name, suffixed with the pinned revision when
+    ``EMBEDDING_MODEL_REVISION`` is set, with the precision when the model
+    does not run in float32 and with ``int8`` when it runs on a quantized
+    backend, so vectors from different weights are never labelled the same.
+    
+    Args:
+        model_name: Name of the sentence transformer model
+        
+    Returns:
+        Model version string
+    """
+    key = _sentence_transformer_key(model_name)
+    suffixes = []
+    revision = model_revision(model_name)
+    if revision:
+        suffixes.append(revision)
+    if key.precision != "float32":
+        suffixes.append(key.precision)
+    if key.backend in QUANTIZED_BACKENDS:
+        suffixes.append("int8")
+    if not suffixes:
+        return model_name
+    return f"{model_name}@{'-'.join(suffixes)}"
 
 
 def extract_named_entities(text: str, model_name: str = "en_core_web_sm"):
@@ -99,22 +232,67 @@ def extract_named_entities(text: str, model_name: str = "en_core_web_sm"):
         )
     
     # Get the spacy model
-    nlp = get_spacy_model(model_name)
+    nlp = get_spacy_model(model_name, entities_only=get_settings().ner_entities_only)
     
     # Process the text
     doc = nlp(text)
     
-    # Extract entities
-    entities = []
-    for ent in doc.ents:
-        entities.append({
+    return _doc_entities(doc)
+
+
+def _doc_entities(doc) -> List[dict]:
+    return [
+        {
             "text": ent.text,
             "label": ent.label_,
             "start": ent.start_char,
             "end": ent.end_char,
-        })
+        }
+        for ent in doc.ents
+    ]
+
+
+def extract_named_entities_batch(
+    texts: List[str],
+    model_name: str = "en_core_web_sm",
+    batch_size: int = 64,
+    n_process: int = 1,
+) -> List[List[dict]]:
+    """
+    Extract named entities from many texts by streaming them through ``nlp.pipe``.
     
-    return entities
+    Args:
+        texts: Input texts to extract entities from
+        model_name: Name of the spacy model to use
+        batch_size: Number of texts spacy processes per batch
+        n_process: Number of spacy worker processes
+        
+    Returns:
+        List of entity lists (same shape as ``extract_named_entities``), in input order
+        
+    Raises:
+        ImportError: If spacy is not installed
+        OSError: If the spacy model is not found
+        ValueError: If any text is empty or invalid
+    """
+    if not texts:
+        return []
+    
+    for text in texts:
+        if not text or not text.strip():
+            raise ValueError("Text cannot be empty")
+    
+    if not HAS_NLP_DEPS:
+        raise ImportError(
+            "spacy is not installed. Install it with: pip install spacy"
+        )
+    
+    nlp = get_spacy_model(model_name, entities_only=get_settings().ner_entities_only)
+    
+    return [
+        _doc_entities(doc)
+        for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+    ]
 
 
 def generate_embedding(text: str, model_name: str = "all-MiniLM-L6-v2") -> List[float]:
@@ -145,10 +323,236 @@ def generate_embedding(text: str, model_name: str = "all-MiniLM-L6-v2") -> List[
     model = get_sentence_transformer(model_name)
     
     # Generate embedding
-    embedding = model.encode(text, normalize_embeddings=True)
+    with metrics.inference_timer(model_name, 1):
+        embedding = model.encode(text, normalize_embeddings=True)
     
     # Convert numpy array to list of floats
-    return embedding.tolist()
+    with metrics.stage_timer(model_name, metrics.STAGE_SERIALIZE):
+        return embedding.tolist()
+
+
+def generate_embedding_batch(
+    texts: List[str],
+    model_name: str = "all-MiniLM-L6-v2",
+    batch_size: int = 32,
+    as_numpy: bool = False,
+):
+    """
+    Generate embedding vectors for many texts with a single batched encode call.
+    
+    With ``EMBEDDING_LENGTH_BUCKETING`` on, texts are tokenized once and run
+    in batches of similar token length (see ``skytorch.bucketing``), so
+    short posts are not padded to the length of article chunks batched
+    with them. Vectors are returned in input order either way.
+    
+    Args:
+        texts: Input texts to generate embeddings for
+        model_name: Name of the sentence transformer model to use
+        batch_size: Number of texts per forward pass inside ``model.encode``
+        as_numpy: Return a float32 numpy matrix instead of lists of floats
+        
+    Returns:
+        List of embedding vectors (or an ``(n, dim)`` matrix), in the same order as ``texts``
+        
+    Raises:
+        ImportError: If sentence-transformers is not installed
+        ValueError: If any text is empty or invalid
+    """
+    if not texts:
+        return []
+    
+    for text in texts:
+        if not text or not text.strip():
+            raise ValueError("Text cannot be empty")
+    
+    if not HAS_NLP_DEPS:
+        raise ImportError(
+            "sentence-transformers is not installed. "
+            "Install it with: pip install sentence-transformers"
+        )
+    
+    model = get_sentence_transformer(model_name)
+    settings = get_settings()
+    
+    with metrics.inference_timer(model_name, len(texts)):
+        if settings.embedding_length_bucketing and len(texts) > 1 and supports_bucketing(model):
+            embeddings = encode_bucketed(
+                model,
+                texts,
+                forward_features,
+                batch_size=batch_size,
+                boundaries=parse_boundaries(settings.embedding_bucket_boundaries),
+                stats=get_bucketing_stats(),
+            )
+        else:
+            # One encode call for the whole list; sentence-transformers splits it
+            # into forward passes of ``batch_size`` internally.
+            embeddings = model.encode(
+                texts,
+                batch_size=batch_size,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            )
+    
+    if as_numpy:
+        return embeddings.astype("float32", copy=False)
+    with metrics.stage_timer(model_name, metrics.STAGE_SERIALIZE):
+        return embeddings.tolist()
+
+
+def count_tokens(texts: List[str], model_name: str = "all-MiniLM-L6-v2") -> List[int]:
+    """
+    Count tokens per text with a sentence transformer model's own tokenizer.
+    
+    Args:
+        texts: Input texts
+        model_name: Name of the sentence transformer model whose tokenizer to use
+        
+    Returns:
+        Token count of each text (excluding special tokens), in input order
+    """
+    if not texts:
+        return []
+    
+    model = get_sentence_transformer(model_name)
+    encoded = model.tokenizer(
+        list(texts),
+        add_special_tokens=False,
+        return_attention_mask=False,
+        return_token_type_ids=False,
+    )
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+def chunk_article_text(
+    text: str,
+    model_name: str = "all-MiniLM-L6-v2",
+    target_tokens: int = 256,
+    overlap_ratio: float = 0.12,
+) -> List[Chunk]:
+    """
+    Chunk cleaned article text for embedding with a sentence transformer model.
+    
+    The target size is capped at what the model can encode without
+    truncation, so every chunk is embedded in full.
+    
+    Args:
+        text: Cleaned article text
+        model_name: Name of the sentence transformer model the chunks are for
+        target_tokens: Maximum tokens per chunk
+        overlap_ratio: Fraction of the target repeated between windows of a long paragraph
+        
+    Returns:
+        Chunks in document order
+        
+    Raises:
+        ImportError: If sentence-transformers is not installed
+        ValueError: If text is empty or invalid
+    """
+    if not text or not text.strip():
+        raise ValueError("Text cannot be empty")
+    
+    if not HAS_NLP_DEPS:
+        raise ImportError(
+            "sentence-transformers is not installed. "
+            "Install it with: pip install sentence-transformers"
+        )
+    
+    model = get_sentence_transformer(model_name)
+    max_seq_length = getattr(model, "max_seq_length", None)
+    if max_seq_length:
+        # Leave room for the [CLS]/[SEP] special tokens
+        target_tokens = min(target_tokens, max_seq_length - 2)
+    
+    return chunk_text(
+        text,
+        lambda texts: count_tokens(texts, model_name),
+        target_tokens=target_tokens,
+        overlap_ratio=overlap_ratio,
+    )
+
+
+def check_backend_parity(
+    model_name: str = "all-MiniLM-L6-v2",
+    backend: str = "onnx",
+    texts: Optional[List[str]] = None,
+) -> dict:
+    """
+    Compare a backend's embeddings with the eager torch model's.
+    
+    Args:
+        model_name: Name of the sentence transformer model
+        backend: Backend to check
+        texts: Fixture texts (defaults to the built-in news corpus)
+        
+    Returns:
+        Dict with max and mean cosine deviation (1 - cosine similarity)
+        between the two models' vectors over the corpus
+    """
+    texts = texts or PARITY_CORPUS
+    reference = get_sentence_transformer(model_name, backend=BACKEND_TORCH).encode(
+        texts, normalize_embeddings=True, show_progress_bar=False
+    )
+    candidate = get_sentence_transformer(model_name, backend=backend).encode(
+        texts, normalize_embeddings=True, show_progress_bar=False
+    )
+    deviations = 1.0 - (reference * candidate).sum(axis=1)
+    return {
+        "model_name": model_name,
+        "backend": backend,
+        "texts": len(texts),
+        "max_cosine_deviation": float(deviations.max()),
+        "mean_cosine_deviation": float(deviations.mean()),
+    }
+
+
+def is_fork_shareable(kind: str, model_name: str) -> bool:
+    """
+    Whether a model can be loaded before forking and shared by the workers.
+    
+    spaCy pipelines and torch models on CPU qualify. ONNX Runtime sessions
+    own thread pools that do not survive fork, and CUDA contexts cannot be
+    inherited, so those models are left for each worker to load.
+    
+    Args:
+        kind: Model kind, e.g. ``spacy`` or ``sentence_transformer``
+        model_name: Name of the model
+        
+    Returns:
+        True if the model may be loaded in the pre-fork parent
+    """
+    if kind != SENTENCE_TRANSFORMER_MODEL:
+        return True
+    key = _sentence_transformer_key(model_name)
+    return key.backend in (BACKEND_TORCH, BACKEND_TORCH_INT8) and key.device == "cpu"
+
+
+def preload_models(preload: str, shareable_only: bool = False):
+    """
+    Load models listed in a ``kind:name`` comma-separated preload string.
+    
+    Kinds are ``spacy``, ``spacy_ner`` (entity-only pipeline) and
+    ``sentence_transformer``,
+    e.g. ``spacy:en_core_web_sm,sentence_transformer:all-MiniLM-L6-v2``.
+    
+    Args:
+        preload: Preload list, usually ``settings.model_preload``
+        shareable_only: Skip models that ``is_fork_shareable`` rejects
+    """
+    loaders = {
+        SPACY_MODEL: get_spacy_model,
+        SPACY_NER_MODEL: lambda model_name: get_spacy_model(model_name, entities_only=True),
+        SENTENCE_TRANSFORMER_MODEL: get_sentence_transformer,
+    }
+    for kind, model_name in _preload_entries(preload):
+        loader = loaders.get(kind)
+        if loader is None:
+            logger.warning(f"Ignoring model preload entry of unknown kind: {kind}:{model_name}")
+            continue
+        if shareable_only and not is_fork_shareable(kind, model_name):
+            logger.info(f"Not preloading {kind}:{model_name} before fork; each worker loads its own copy")
+            continue
+        loader(model_name)
 
 
 def initialize_nlp_models(
@@ -156,18 +560,18 @@ def initialize_nlp_models(
     sentence_model: str = "all-MiniLM-L6-v2"
 ):
     """
-    Initialize both NLP models at startup.
+    Initialize NLP models at startup.
+    
+    Loads the given default models plus anything in ``MODEL_PRELOAD``.
     
     Args:
         spacy_model: Name of the spacy model to load
         sentence_model: Name of the sentence transformer model to load
     """
     try:
-        get_spacy_model(spacy_model)
+        get_spacy_model(spacy_model, entities_only=get_settings().ner_entities_only)
         get_sentence_transformer(sentence_model)
+        preload_models(get_settings().model_preload)
     except (OSError, ImportError) as e:
         # Log warning but don't fail startup
-        import logging
-        logger = logging.getLogger(__name__)
         logger.warning(f"NLP models not available: {e}")
-
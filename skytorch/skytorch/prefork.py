@@ -0,0 +1,306 @@
+"""
+Pre-fork server: load models once in a parent process, then fork uvicorn workers that share them.
+
+    python -m skytorch.prefork --host 0.0.0.0 --port 5000 --workers 4
+
+Running ``uvicorn --workers N`` spawns fresh interpreters, so every worker
+imports torch and loads its own copy of each model. Here the parent loads
+the spaCy and CPU torch models into the model registry before forking;
+workers inherit the registry and read the weights from pages they share
+with the parent copy-on-write, so each extra worker only costs its own
+interpreter, request and activation memory.
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+from typing import Dict, Optional
+
+from skytorch.config import get_settings
+from skytorch.memory import PREFORK_PARENT_ENV, process_memory
+
+logger = logging.getLogger("skytorch.prefork")
+
+
+def _torch():
+    try:
+        import torch
+        return torch
+    except ImportError:
+        return None
+
+
+def load_shared_models() -> Dict[str, float]:
+    """
+    Load every fork-shareable model the workers will use into the model registry.
+
+    The vector index snapshot, when configured, is opened here as well.
+
+    Torch runs single-threaded here so no intra-op thread pool exists at
+    fork time; workers size their own. Nothing runs inference in the
+    parent, and the garbage collector is frozen afterwards so workers never
+    write to the inherited objects' headers, which would copy their pages.
+
+    Returns:
+        Mapping of step name to seconds taken
+    """
+    from skytorch.nlp import get_sentence_transformer, get_spacy_model, is_fork_shareable, preload_models
+
+    settings = get_settings()
+    timings: Dict[str, float] = {}
+    torch = _torch()
+    if torch is not None:
+        torch.set_num_threads(1)
+
+    try:
+        started = time.perf_counter()
+        get_spacy_model(settings.spacy_model_name, entities_only=settings.ner_entities_only)
+        timings["load_spacy"] = time.perf_counter() - started
+
+        if is_fork_shareable("sentence_transformer", settings.embedding_model_name):
+            started = time.perf_counter()
+            get_sentence_transformer(settings.embedding_model_name)
+            timings["load_sentence_transformer"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        preload_models(settings.model_preload, shareable_only=True)
+        timings["load_preload"] = time.perf_counter() - started
+    except (OSError, ImportError) as e:
+        # Workers degrade to 503 exactly as they would without pre-forking
+        logger.warning(f"NLP models not available, workers start without shared models: {e}")
+
+    if settings.vector_index_enabled and settings.vector_index_snapshot_dir:
+        from skytorch.vector_index import get_vector_index
+
+        # Workers inherit the memory-mapped snapshot and only apply changes made since
+        started = time.perf_counter()
+        if get_vector_index().load(settings.vector_index_snapshot_dir, mmap=settings.vector_index_mmap):
+            timings["load_vector_index"] = time.perf_counter() - started
+
+    gc.collect()
+    gc.freeze()
+    return timings
+
+
+def _bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _mark_metrics_dead(pid: int):
+    """Drop a dead worker's live gauges from the Prometheus multiprocess files."""
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return
+    try:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(pid)
+    except ImportError:
+        pass
+
+
+class PreforkServer:
+    """
+    Bind the listening socket, load shared models, then fork and supervise workers.
+
+    Workers that exit unexpectedly are replaced from the parent, so the
+    replacement shares the same model pages. SIGTERM or SIGINT stops the
+    workers gracefully.
+    """
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 5000,
+        workers: int = 1,
+        torch_threads: int = 0,
+        memory_report_interval: float = 0.0,
+        graceful_timeout: float = 30.0,
+        log_level: str = "info",
+    ):
+        """
+        Args:
+            host: Address to listen on
+            port: Port to listen on
+            workers: Number of worker processes
+            torch_threads: Torch intra-op threads per worker (0 = CPU count / workers)
+            memory_report_interval: Seconds between per-worker memory log lines (0 disables)
+            graceful_timeout: Seconds workers get to finish before being killed on shutdown
+            log_level: uvicorn log level
+        """
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // self.workers)
+        self.memory_report_interval = memory_report_interval
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+
+        self._socket: Optional[socket.socket] = None
+        self._children: Dict[int, int] = {}
+        self._should_exit = False
+
+    def _run_worker(self, index: int) -> int:
+        """Body of a forked worker: serve the app on the inherited socket until told to stop."""
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, signal.SIG_DFL)
+
+        torch = _torch()
+        if torch is not None:
+            torch.set_num_threads(self.torch_threads)
+
+        import uvicorn
+
+        from skytorch.main import app
+
+        logger.info(f"Worker {index} started (pid {os.getpid()}, {self.torch_threads} torch threads)")
+        server = uvicorn.Server(uvicorn.Config(app, log_level=self.log_level, lifespan="on"))
+        server.run(sockets=[self._socket])
+        return 0 if server.started else 1
+
+    def _spawn(self, index: int):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = self._run_worker(index)
+            except BaseException:
+                logger.exception(f"Worker {index} crashed")
+            finally:
+                os._exit(code)
+        self._children[pid] = index
+
+    def _handle_exit(self, signum, frame):
+        self._should_exit = True
+
+    def _reap(self):
+        """Collect exited workers and replace them unless shutting down."""
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            index = self._children.pop(pid, None)
+            if index is None:
+                continue
+            _mark_metrics_dead(pid)
+            if not self._should_exit:
+                logger.warning(f"Worker {index} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}; restarting")
+                time.sleep(1)
+                self._spawn(index)
+
+    def _report_memory(self):
+        mb = 1024 * 1024
+        parent = process_memory()
+        workers = [memory for memory in map(process_memory, list(self._children)) if memory]
+        total_pss = sum(memory["pss_bytes"] for memory in workers + ([parent] if parent else []))
+        details = ", ".join(
+            f"pid {memory['pid']} uss={memory['uss_bytes'] / mb:.0f}MB pss={memory['pss_bytes'] / mb:.0f}MB"
+            for memory in workers
+        )
+        logger.info(f"Memory: total pss={total_pss / mb:.0f}MB; workers: {details}")
+
+    def _stop_workers(self):
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.graceful_timeout
+        while self._children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self._children):
+            logger.warning(f"Worker pid {pid} did not stop in {self.graceful_timeout:.0f}s; killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            _mark_metrics_dead(pid)
+            self._children.pop(pid, None)
+
+    def run(self) -> int:
+        """Serve until SIGTERM or SIGINT, then stop the workers."""
+        self._socket = _bind(self.host, self.port)
+        os.environ[PREFORK_PARENT_ENV] = str(os.getpid())
+
+        started = time.perf_counter()
+        # Graph replicas serve no models and never import the NLP stack
+        timings = load_shared_models() if get_settings().skytorch_role != "graph" else {}
+        timings_text = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in timings.items())
+        logger.info(f"Loaded shared models in {time.perf_counter() - started:.2f}s ({timings_text or 'none'})")
+
+        # Import the app once here too, so workers share its modules as well
+        import skytorch.main  # noqa: F401
+
+        signal.signal(signal.SIGTERM, self._handle_exit)
+        signal.signal(signal.SIGINT, self._handle_exit)
+
+        for index in range(self.workers):
+            self._spawn(index)
+        logger.info(f"Serving on {self.host}:{self.port} with {self.workers} worker(s)")
+
+        next_report = time.monotonic() + self.memory_report_interval
+        while not self._should_exit:
+            self._reap()
+            if self.memory_report_interval > 0 and time.monotonic() >= next_report:
+                self._report_memory()
+                next_report = time.monotonic() + self.memory_report_interval
+            time.sleep(0.5)
+
+        logger.info("Shutting down workers")
+        self._stop_workers()
+        self._socket.close()
+        return 0
+
+
+def main() -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        prog="python -m skytorch.prefork",
+        description="Serve skytorch from workers forked after the models are loaded.",
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=settings.prefork_workers)
+    parser.add_argument("--torch-threads", type=int, default=settings.prefork_torch_threads, help="Per worker; 0 = CPU count / workers")
+    parser.add_argument(
+        "--memory-report-interval", type=float, default=settings.prefork_memory_report_interval,
+        help="Log per-worker unique and proportional memory every N seconds (0 disables)",
+    )
+    parser.add_argument("--graceful-timeout", type=float, default=30.0)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    if args.workers > 1 and settings.metrics_enabled and not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # Must be set before prometheus_client is imported, so /metrics aggregates every worker
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="skytorch-metrics-")
+
+    return PreforkServer(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        torch_threads=args.torch_threads,
+        memory_report_interval=args.memory_report_interval,
+        graceful_timeout=args.graceful_timeout,
+        log_level=args.log_level,
+    ).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
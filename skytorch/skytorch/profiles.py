@@ -0,0 +1,132 @@
+"""Batched Bluesky profile lookup with an in-process and Redis TTL cache."""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from skytorch.atproto_client import AtprotoClient
+from skytorch.config import get_settings
+from skytorch.ttl_cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+# Most actors app.bsky.actor.getProfiles accepts per call
+PROFILES_PER_CALL = 25
+
+
+def profile_detail(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an AppView detailed profile view to the fields skytorch returns."""
+    return {
+        "did": profile["did"],
+        "handle": profile.get("handle"),
+        "display_name": profile.get("displayName"),
+        "description": profile.get("description"),
+        "avatar": profile.get("avatar"),
+        "banner": profile.get("banner"),
+        "followers_count": profile.get("followersCount"),
+        "follows_count": profile.get("followsCount"),
+        "posts_count": profile.get("postsCount"),
+    }
+
+
+# Global cache instance (lazy loaded)
+_profile_cache: Optional[TieredCache] = None
+
+
+def get_profile_cache() -> Optional[TieredCache]:
+    """
+    Get or create the shared profile cache, keyed by actor (DID or handle).
+
+    Returns:
+        TieredCache configured from settings, or None if caching is disabled
+    """
+    global _profile_cache
+
+    settings = get_settings()
+    if not settings.profile_cache_enabled:
+        return None
+
+    if _profile_cache is None:
+        _profile_cache = TieredCache(
+            "profile",
+            redis_url=settings.redis_url if settings.profile_cache_redis_enabled else None,
+            local_max_items=settings.profile_cache_local_max_items,
+            local_ttl_seconds=settings.profile_cache_local_ttl,
+            redis_ttl_seconds=settings.profile_cache_redis_ttl,
+        )
+
+    return _profile_cache
+
+
+async def fetch_profiles(
+    client: AtprotoClient,
+    actors: Sequence[str],
+    bypass_cache: bool = False,
+    concurrency: int = 4,
+) -> Tuple[List[Optional[Dict[str, Any]]], Dict[str, str], int]:
+    """
+    Look up many profiles, serving what it can from the profile cache.
+
+    Misses are fetched with ``app.bsky.actor.getProfiles`` in chunks of 25,
+    up to ``concurrency`` chunks at a time. Fetched profiles are written
+    back to the cache.
+
+    Args:
+        client: AT Protocol client
+        actors: DIDs or handles
+        bypass_cache: Skip cache lookups (fresh profiles are still cached)
+        concurrency: Maximum getProfiles calls in flight
+
+    Returns:
+        Tuple of (profile or None for each actor in input order,
+        error message by actor for chunks that failed, number of cache hits)
+
+    Raises:
+        AtprotoError, httpx.HTTPError: If every upstream call failed
+    """
+    unique = list(dict.fromkeys(actors))
+    cache = get_profile_cache()
+    found: Dict[str, Dict[str, Any]] = {}
+    if cache is not None and not bypass_cache:
+        for actor, profile in zip(unique, await cache.get_many(unique)):
+            if profile is not None:
+                found[actor] = profile
+    cache_hits = len(found)
+
+    misses = [actor for actor in unique if actor not in found]
+    chunks = [misses[start:start + PROFILES_PER_CALL] for start in range(0, len(misses), PROFILES_PER_CALL)]
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch_chunk(chunk: List[str]) -> Dict[str, Dict[str, Any]]:
+        async with semaphore:
+            result = await client.get_profiles(actors=chunk)
+        # Actors that don't exist are left out of the response; match the
+        # rest back to the requested DID or handle.
+        requested = set(chunk)
+        fetched = {}
+        for view in result.get("profiles", []):
+            profile = profile_detail(view)
+            for actor in (profile["did"], profile["handle"]):
+                if actor in requested:
+                    fetched[actor] = profile
+        return fetched
+
+    errors: Dict[str, str] = {}
+    if chunks:
+        outcomes = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks), return_exceptions=True)
+        failures = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+        if len(failures) == len(chunks):
+            raise failures[0]
+
+        fresh: Dict[str, Dict[str, Any]] = {}
+        for chunk, outcome in zip(chunks, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.warning(f"getProfiles failed for {len(chunk)} actors: {outcome}")
+                errors.update({actor: str(outcome) or type(outcome).__name__ for actor in chunk})
+            else:
+                fresh.update(outcome)
+        found.update(fresh)
+        if cache is not None:
+            await cache.set_many(fresh)
+
+    return [found.get(actor) for actor in actors], errors, cache_hits
@@ -0,0 +1,465 @@
+"""AT Protocol endpoints: follows, followers, profiles and handle resolution."""
+
+import httpx
+from fastapi import APIRouter, HTTPException, status, Query
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+from skytorch.config import get_settings
+from skytorch.ndjson import NDJSONStreamingResponse
+from skytorch.atproto_client import get_atproto_client
+from skytorch.handles import get_handle_cache, normalize_handle, resolve_handles
+from skytorch.profiles import fetch_profiles, get_profile_cache
+from skytorch.graph import (
+    FOLLOWERS,
+    FOLLOWS,
+    PAGE_SIZE,
+    crawl_graph,
+    fetch_graph_page,
+    stream_graph,
+)
+
+router = APIRouter()
+
+
+class FollowProfile(BaseModel):
+    """Model for a follow profile."""
+    did: str = Field(..., description="Decentralized Identifier")
+    handle: Optional[str] = Field(None, description="User handle")
+    display_name: Optional[str] = Field(None, description="Display name")
+    avatar: Optional[str] = Field(None, description="Avatar URL")
+
+
+class FollowsResponse(BaseModel):
+    """Response model for follows."""
+    follows: List[FollowProfile] = Field(..., description="List of profiles the user follows")
+    count: int = Field(..., description="Total number of follows")
+    cursor: Optional[str] = Field(None, description="Cursor for pagination")
+
+
+class FollowersResponse(BaseModel):
+    """Response model for followers."""
+    followers: List[FollowProfile] = Field(..., description="List of profiles that follow the user")
+    count: int = Field(..., description="Total number of followers")
+    cursor: Optional[str] = Field(None, description="Cursor for pagination")
+
+
+class ResolveHandleResponse(BaseModel):
+    """Response model for handle resolution."""
+    did: str = Field(..., description="Decentralized Identifier")
+    handle: Optional[str] = Field(None, description="User handle")
+
+
+class ProfileResponse(BaseModel):
+    """Response model for user profile."""
+    did: str = Field(..., description="Decentralized Identifier")
+    handle: Optional[str] = Field(None, description="User handle")
+    display_name: Optional[str] = Field(None, description="Display name")
+    description: Optional[str] = Field(None, description="Profile description/bio")
+    avatar: Optional[str] = Field(None, description="Avatar URL")
+    banner: Optional[str] = Field(None, description="Banner image URL")
+    followers_count: Optional[int] = Field(None, description="Number of followers")
+    follows_count: Optional[int] = Field(None, description="Number of follows")
+    posts_count: Optional[int] = Field(None, description="Number of posts")
+
+
+def _atproto_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="AT Protocol client not available. Check ATPROTO_HANDLE and ATPROTO_PASSWORD environment variables."
+    )
+
+
+def _atproto_timeout(error: httpx.TimeoutException) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        detail=f"AT Protocol request timed out: {str(error) or type(error).__name__}"
+    )
+
+
+async def _stream_graph_response(
+    direction: str, did: str, cursor: Optional[str], max_records: Optional[int]
+) -> NDJSONStreamingResponse:
+    """Fetch the first page up front, so upstream failures get a proper status, then stream the rest."""
+    try:
+        client = await get_atproto_client()
+        if not client:
+            raise _atproto_unavailable()
+        
+        limit = min(PAGE_SIZE, max_records) if max_records else PAGE_SIZE
+        first_page = await fetch_graph_page(client, direction, did, limit, cursor)
+    except HTTPException:
+        raise
+    except httpx.TimeoutException as e:
+        raise _atproto_timeout(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching {direction}: {str(e)}"
+        )
+    
+    return NDJSONStreamingResponse(stream_graph(
+        crawl_graph(client, direction, did, cursor, max_records, first_page=first_page),
+        cursor,
+    ))
+
+
+@router.get("/follows", response_model=FollowsResponse, status_code=status.HTTP_200_OK)
+async def get_follows(
+    did: str = Query(..., description="Decentralized Identifier to get follows for"),
+    limit: int = Query(100, ge=1, le=100, description="Maximum number of results to return"),
+    cursor: Optional[str] = Query(None, description="Cursor for pagination")
+):
+    """
+    Get the list of profiles that a user follows.
+    
+    Returns an array of profiles (DIDs) that the specified user follows.
+    """
+    try:
+        client = await get_atproto_client()
+        if not client:
+            raise _atproto_unavailable()
+        
+        profiles, next_cursor = await fetch_graph_page(client, FOLLOWS, did, limit, cursor)
+        follows = [FollowProfile(**profile) for profile in profiles]
+        
+        return FollowsResponse(
+            follows=follows,
+            count=len(follows),
+            cursor=next_cursor
+        )
+    except HTTPException:
+        raise
+    except httpx.TimeoutException as e:
+        raise _atproto_timeout(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching follows: {str(e)}"
+        )
+
+
+@router.get("/followers", response_model=FollowersResponse, status_code=status.HTTP_200_OK)
+async def get_followers(
+    did: str = Query(..., description="Decentralized Identifier to get followers for"),
+    limit: int = Query(100, ge=1, le=100, description="Maximum number of results to return"),
+    cursor: Optional[str] = Query(None, description="Cursor for pagination")
+):
+    """
+    Get the list of profiles that follow a user.
+    
+    Returns an array of profiles (DIDs) that follow the specified user.
+    """
+    try:
+        client = await get_atproto_client()
+        if not client:
+            raise _atproto_unavailable()
+        
+        profiles, next_cursor = await fetch_graph_page(client, FOLLOWERS, did, limit, cursor)
+        followers = [FollowProfile(**profile) for profile in profiles]
+        
+        return FollowersResponse(
+            followers=followers,
+            count=len(followers),
+            cursor=next_cursor
+        )
+    except HTTPException:
+        raise
+    except httpx.TimeoutException as e:
+        raise _atproto_timeout(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching followers: {str(e)}"
+        )
+
+
+@router.get("/atproto/scheduler", status_code=status.HTTP_200_OK)
+async def atproto_scheduler_stats():
+    """
+    Report AT Protocol upstream pacing.
+    
+    Includes the token bucket rate (tuned from the service's rate limit
+    headers), throttling events, per-lane queue depth and wait times, and
+    how many calls were coalesced into an identical in-flight request,
+    plus how sessions were obtained (created, refreshed, or adopted from
+    the shared session store) and when the access token expires.
+    """
+    client = await get_atproto_client()
+    if not client:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "coalesced": client.coalesced,
+        "session": client.session_stats(),
+        **client.scheduler.stats(),
+    }
+
+
+@router.get("/follows/all", status_code=status.HTTP_200_OK)
+async def get_all_follows(
+    did: str = Query(..., description="Decentralized Identifier to get follows for"),
+    cursor: Optional[str] = Query(None, description="Resume cursor from a previous crawl"),
+    max_records: Optional[int] = Query(None, ge=1, description="Stop after this many profiles")
+):
+    """
+    Stream every profile a user follows as NDJSON.
+    
+    Walks the whole cursor chain server-side, fetching the next page while
+    the current one is sent. Profile lines are interleaved with
+    ``{"cursor": ...}`` resume points and the stream ends with a
+    ``{"summary": ...}`` line.
+    """
+    return await _stream_graph_response(FOLLOWS, did, cursor, max_records)
+
+
+@router.get("/followers/all", status_code=status.HTTP_200_OK)
+async def get_all_followers(
+    did: str = Query(..., description="Decentralized Identifier to get followers for"),
+    cursor: Optional[str] = Query(None, description="Resume cursor from a previous crawl"),
+    max_records: Optional[int] = Query(None, ge=1, description="Stop after this many profiles")
+):
+    """
+    Stream every profile that follows a user as NDJSON.
+    
+    Walks the whole cursor chain server-side, fetching the next page while
+    the current one is sent. Profile lines are interleaved with
+    ``{"cursor": ...}`` resume points and the stream ends with a
+    ``{"summary": ...}`` line.
+    """
+    return await _stream_graph_response(FOLLOWERS, did, cursor, max_records)
+
+
+@router.get("/resolve_handle", response_model=ResolveHandleResponse, status_code=status.HTTP_200_OK)
+async def resolve_handle(
+    handle: str = Query(..., description="Bluesky handle to resolve (e.g., 'open.news')")
+):
+    """
+    Resolve a Bluesky handle to a DID.
+    
+    Takes a handle (e.g., 'open.news') and returns the corresponding DID.
+    Resolutions, including handles that don't resolve, are cached.
+    """
+    try:
+        client = await get_atproto_client()
+        if not client:
+            raise _atproto_unavailable()
+        
+        dids, errors, _ = await resolve_handles(client, [handle])
+        if errors:
+            raise next(iter(errors.values()))
+        if dids[0] is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Handle not found: {handle}"
+            )
+        
+        return ResolveHandleResponse(
+            did=dids[0],
+            handle=handle
+        )
+    except HTTPException:
+        raise
+    except httpx.TimeoutException as e:
+        raise _atproto_timeout(e)
+    except Exception as e:
+        error_message = str(e)
+        # Check if it's a "handle not found" type error
+        if "not found" in error_message.lower() or "invalid" in error_message.lower():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Handle not found: {handle}"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error resolving handle: {error_message}"
+        )
+
+
+@router.get("/profile", response_model=ProfileResponse, status_code=status.HTTP_200_OK)
+async def get_profile(
+    did: str = Query(..., description="Decentralized Identifier to get profile for")
+):
+    """
+    Get a user's profile information from a DID.
+    
+    Returns profile information including display name, description, avatar, banner,
+    and follower/follow/post counts. Profiles are served from the profile cache
+    when possible.
+    """
+    try:
+        client = await get_atproto_client()
+        if not client:
+            raise _atproto_unavailable()
+        
+        profiles, _, _ = await fetch_profiles(client, [did])
+        if profiles[0] is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Profile not found for DID: {did}"
+            )
+        
+        return ProfileResponse(**profiles[0])
+    except HTTPException:
+        raise
+    except httpx.TimeoutException as e:
+        raise _atproto_timeout(e)
+    except Exception as e:
+        error_message = str(e)
+        # Check if it's a "profile not found" type error
+        if "not found" in error_message.lower() or "invalid" in error_message.lower():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Profile not found for DID: {did}"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching profile: {error_message}"
+        )
+
+
+class ProfilesRequest(BaseModel):
+    """Request model for batched profile lookup."""
+    dids: List[str] = Field(..., description="DIDs (or handles) to look up", min_length=1)
+    bypass_cache: bool = Field(default=False, description="Skip profile cache lookups")
+
+
+class ProfilesResponse(BaseModel):
+    """Response model for batched profile lookup."""
+    profiles: List[Optional[ProfileResponse]] = Field(..., description="Profile for each requested DID in request order, or null")
+    missing: List[str] = Field(..., description="Requested DIDs with no profile (not found or failed), in request order")
+    errors: Dict[str, str] = Field(default_factory=dict, description="Upstream error by DID for lookups that failed")
+    count: int = Field(..., description="Number of profiles found")
+    cache_hits: int = Field(0, description="Number of profiles served from the cache")
+
+
+@router.post("/profiles", response_model=ProfilesResponse, status_code=status.HTTP_200_OK)
+async def get_profiles(request: ProfilesRequest):
+    """
+    Look up many profiles at once.
+    
+    Profiles in the profile cache are served from it; the rest are fetched
+    with ``app.bsky.actor.getProfiles`` in chunks of 25, several chunks
+    concurrently. DIDs without a profile are listed in ``missing``.
+    """
+    settings = get_settings()
+    if len(request.dids) > settings.profile_batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch too large: {len(request.dids)} DIDs (max {settings.profile_batch_max_items})"
+        )
+    
+    try:
+        client = await get_atproto_client()
+        if not client:
+            raise _atproto_unavailable()
+        
+        profiles, errors, cache_hits = await fetch_profiles(
+            client,
+            request.dids,
+            bypass_cache=request.bypass_cache,
+            concurrency=settings.profile_fetch_concurrency,
+        )
+    except HTTPException:
+        raise
+    except httpx.TimeoutException as e:
+        raise _atproto_timeout(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching profiles: {str(e)}"
+        )
+    
+    return ProfilesResponse(
+        profiles=profiles,
+        missing=[did for did, profile in zip(request.dids, profiles) if profile is None],
+        errors=errors,
+        count=sum(1 for profile in profiles if profile is not None),
+        cache_hits=cache_hits,
+    )
+
+
+@router.get("/profiles/cache", status_code=status.HTTP_200_OK)
+async def profiles_cache_stats():
+    """
+    Report profile cache hit/miss counters.
+    """
+    cache = get_profile_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+class ResolveHandlesRequest(BaseModel):
+    """Request model for bulk handle resolution."""
+    handles: List[str] = Field(..., description="Handles to resolve", min_length=1)
+    bypass_cache: bool = Field(default=False, description="Skip handle cache lookups")
+
+
+class ResolvedHandle(BaseModel):
+    """Resolution result for one handle."""
+    handle: str = Field(..., description="Handle as requested")
+    did: Optional[str] = Field(None, description="Decentralized Identifier, or null if not resolved")
+    error: Optional[str] = Field(None, description="Error message if the lookup failed (as opposed to not found)")
+
+
+class ResolveHandlesResponse(BaseModel):
+    """Response model for bulk handle resolution."""
+    results: List[ResolvedHandle] = Field(..., description="Results in request order")
+    resolved: int = Field(..., description="Number of handles resolved")
+    missing: List[str] = Field(..., description="Handles that did not resolve or failed, in request order")
+    cache_hits: int = Field(0, description="Number of handles served from the cache")
+
+
+@router.post("/resolve_handles", response_model=ResolveHandlesResponse, status_code=status.HTTP_200_OK)
+async def resolve_handles_bulk(request: ResolveHandlesRequest):
+    """
+    Resolve many Bluesky handles to DIDs at once.
+    
+    Cached resolutions are served from memory or Redis; the rest are
+    resolved concurrently with a bounded number of upstream calls in flight.
+    """
+    settings = get_settings()
+    if len(request.handles) > settings.handle_batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch too large: {len(request.handles)} handles (max {settings.handle_batch_max_items})"
+        )
+    
+    client = await get_atproto_client()
+    if not client:
+        raise _atproto_unavailable()
+    
+    dids, errors, cache_hits = await resolve_handles(
+        client,
+        request.handles,
+        bypass_cache=request.bypass_cache,
+        concurrency=settings.handle_resolve_concurrency,
+    )
+    
+    results = []
+    for handle, did in zip(request.handles, dids):
+        error = errors.get(normalize_handle(handle))
+        results.append(ResolvedHandle(
+            handle=handle,
+            did=did,
+            error=(str(error) or type(error).__name__) if error is not None else None,
+        ))
+    
+    return ResolveHandlesResponse(
+        results=results,
+        resolved=sum(1 for did in dids if did is not None),
+        missing=[handle for handle, did in zip(request.handles, dids) if did is None],
+        cache_hits=cache_hits,
+    )
+
+
+@router.get("/resolve_handles/cache", status_code=status.HTTP_200_OK)
+async def resolve_handles_cache_stats():
+    """
+    Report handle resolution cache hit/miss counters.
+    """
+    cache = get_handle_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
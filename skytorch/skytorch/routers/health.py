@@ -1,8 +1,13 @@
 """Health check endpoints."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+from skytorch.config import get_settings
+from skytorch.imports import import_timings
+from skytorch.warmup import get_warmup_state
+
 router = APIRouter()
 
 
@@ -21,13 +26,37 @@ async def health_check():
 
 @router.get("/health/ready")
 async def readiness_check():
-    """Readiness check endpoint."""
+    """
+    Readiness check endpoint.
+    
+    Returns 503 until startup model loading and warm-up have finished, so
+    traffic is only routed to warm instances. Also reports the process role
+    and what its imports cost.
+    """
     # TODO: Add database and Redis connection checks
-    return {"status": "ready"}
+    warmup = get_warmup_state()
+    details = {"role": get_settings().skytorch_role, "warmup": warmup.to_dict(), "imports": import_timings()}
+    if not warmup.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "not_ready", **details},
+        )
+    return {"status": "ready", **details}
 
 
 @router.get("/health/live")
 async def liveness_check():
-    """Liveness check endpoint."""
+    """
+    Liveness check endpoint.
+    
+    Returns 503 once startup warm-up has given up, so the orchestrator
+    restarts the instance instead of leaving it unready forever.
+    """
+    warmup = get_warmup_state()
+    if warmup.failed:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "failed", "warmup": warmup.to_dict()},
+        )
     return {"status": "alive"}
 
@@ -0,0 +1,25 @@
+"""Prometheus metrics endpoint."""
+
+from fastapi import APIRouter, HTTPException, Response, status
+
+from skytorch.metrics import CONTENT_TYPE_LATEST, ENABLED, render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def metrics():
+    """
+    Prometheus scrape endpoint.
+    
+    Exposes per-route request latency and in-flight requests, inference
+    stage timings, batch sizes and input lengths, executor queue depth,
+    model load times and memory, cache hit counts, and AT Protocol call
+    latency, errors and pacing.
+    """
+    if not ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Metrics are disabled or prometheus-client is not installed"
+        )
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
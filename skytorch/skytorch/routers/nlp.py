@@ -0,0 +1,786 @@
+"""NLP endpoints: named entities, embeddings, article analysis, vector search and model management."""
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from pydantic import BaseModel, Field
+from typing import List, Optional, Union
+
+from skytorch import metrics
+from skytorch.batching import get_embedding_batcher
+from skytorch.bucketing import get_bucketing_stats, parse_boundaries
+from skytorch.config import get_settings
+from skytorch.embedding_cache import get_embedding_cache
+from skytorch.embeddings import embed_texts
+from skytorch.encoding import (
+    FORMAT_MSGPACK,
+    EmbeddingFormat,
+    embedding_format,
+    encode_vector,
+    encoding_metadata,
+    render,
+    vector_dim,
+)
+from skytorch.executor import InferenceQueueFull, get_inference_executor
+from skytorch.memory import server_memory
+from skytorch.model_registry import get_model_registry
+from skytorch.ndjson import NDJSONStreamingResponse, iter_ndjson
+from skytorch.streaming import stream_embeddings
+from skytorch.vector_index import get_vector_index
+from skytorch.nlp import (
+    check_backend_parity,
+    check_model_allowed,
+    chunk_article_text,
+    embedding_model_version,
+    extract_named_entities,
+    extract_named_entities_batch,
+    generate_embedding,
+)
+
+router = APIRouter()
+
+
+def _inference_busy(error: InferenceQueueFull) -> HTTPException:
+    """Build the fast-fail response returned when the inference queue is full."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"Inference service busy: {str(error)}",
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
+def _require_allowed_model(model_name: str):
+    """Reject a model the service isn't configured to serve, before anything downloads or loads it."""
+    try:
+        check_model_allowed(model_name)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+class TextRequest(BaseModel):
+    """Request model for text input."""
+    text: str = Field(..., description="Text to extract named entities from", min_length=1)
+
+
+class NamedEntity(BaseModel):
+    """Model for a named entity."""
+    text: str = Field(..., description="The entity text")
+    label: str = Field(..., description="The entity type/label (e.g., PERSON, ORG, GPE)")
+    start: int = Field(..., description="Character start position in the original text")
+    end: int = Field(..., description="Character end position in the original text")
+
+
+class EntitiesResponse(BaseModel):
+    """Response model for named entities."""
+    entities: List[NamedEntity] = Field(..., description="List of extracted named entities")
+    count: int = Field(..., description="Total number of entities found")
+
+
+class EmbeddingRequest(BaseModel):
+    """Request model for embedding generation."""
+    text: str = Field(..., description="Text to generate embedding for", min_length=1)
+    model_name: str = Field(default="all-MiniLM-L6-v2", description="Sentence transformer model name")
+    bypass_cache: bool = Field(default=False, description="Skip the embedding cache")
+
+
+class EmbeddingEncoding(BaseModel):
+    """How the vectors in an embedding response are encoded."""
+    encoding: str = Field("array", description="'array' for float arrays, 'bytes' for packed vectors (base64 or msgpack bin)")
+    dtype: str = Field("float32", description="Element type of packed vectors: float32 or float16")
+    byte_order: str = Field("little", description="Byte order of packed vectors")
+    dim: Optional[int] = Field(None, description="Vector dimension")
+
+
+class EmbeddingResponse(EmbeddingEncoding):
+    """Response model for embeddings."""
+    embedding: Union[List[float], str] = Field(..., description="Embedding vector as list of floats, or packed bytes with format=base64/msgpack")
+    model_version: str = Field(..., description="Model name/version used")
+
+
+@router.post("/entities", response_model=EntitiesResponse, status_code=status.HTTP_200_OK)
+async def extract_entities(request: TextRequest):
+    """
+    Extract named entities from text.
+    
+    Accepts a POST request with text and returns a list of named entities
+    (persons, organizations, locations, etc.) found in the text.
+    """
+    try:
+        entities_data = await get_inference_executor().run(extract_named_entities, request.text)
+        entities = [NamedEntity(**entity) for entity in entities_data]
+        
+        return EntitiesResponse(
+            entities=entities,
+            count=len(entities)
+        )
+    except InferenceQueueFull as e:
+        raise _inference_busy(e)
+    except ImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"NLP service not available: {str(e)}"
+        )
+    except OSError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Spacy model not found: {str(e)}"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error processing text: {str(e)}"
+        )
+
+
+class EntitiesBatchItem(BaseModel):
+    """A single document in a batch entities request."""
+    text: str = Field(..., description="Text to extract named entities from")
+    id: Optional[str] = Field(None, description="Client-supplied identifier echoed back in the result")
+
+
+class EntitiesBatchRequest(BaseModel):
+    """Request model for batch named entity extraction."""
+    items: List[EntitiesBatchItem] = Field(..., description="Documents to extract entities from", min_length=1)
+    batch_size: Optional[int] = Field(None, ge=1, le=1000, description="Documents per spacy batch (defaults to NER_BATCH_SIZE)")
+
+
+class EntitiesBatchResult(BaseModel):
+    """Named entities for a single document of a batch request."""
+    index: int = Field(..., description="Position of the document in the request")
+    id: Optional[str] = Field(None, description="Client-supplied identifier")
+    entities: List[NamedEntity] = Field(default_factory=list, description="Entities found in the document")
+    count: int = Field(0, description="Number of entities found in the document")
+    error: Optional[str] = Field(None, description="Error message if the document failed")
+
+
+class EntitiesBatchResponse(BaseModel):
+    """Response model for batch named entities."""
+    results: List[EntitiesBatchResult] = Field(..., description="Results in request order")
+    count: int = Field(..., description="Number of documents processed successfully")
+
+
+@router.post("/entities/batch", response_model=EntitiesBatchResponse, status_code=status.HTTP_200_OK)
+async def extract_entities_batch(request: EntitiesBatchRequest):
+    """
+    Extract named entities from many documents at once.
+    
+    Documents are streamed through spacy's ``nlp.pipe`` with the entity-only
+    pipeline. Results are returned in request order; invalid documents get a
+    per-item error instead of failing the whole batch.
+    """
+    settings = get_settings()
+    if len(request.items) > settings.ner_batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch too large: {len(request.items)} items (max {settings.ner_batch_max_items})"
+        )
+    
+    results = [
+        EntitiesBatchResult(index=index, id=item.id)
+        for index, item in enumerate(request.items)
+    ]
+    valid_indices = []
+    for index, item in enumerate(request.items):
+        if item.text and item.text.strip():
+            valid_indices.append(index)
+        else:
+            results[index].error = "Text cannot be empty"
+    
+    try:
+        entities_per_doc = await get_inference_executor().run(
+            extract_named_entities_batch,
+            [request.items[index].text for index in valid_indices],
+            batch_size=request.batch_size or settings.ner_batch_size,
+            n_process=settings.ner_n_process,
+        )
+    except InferenceQueueFull as e:
+        raise _inference_busy(e)
+    except ImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"NLP service not available: {str(e)}"
+        )
+    except OSError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Spacy model not found: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error processing texts: {str(e)}"
+        )
+    
+    for index, entities_data in zip(valid_indices, entities_per_doc):
+        results[index].entities = [NamedEntity(**entity) for entity in entities_data]
+        results[index].count = len(entities_data)
+    
+    return EntitiesBatchResponse(
+        results=results,
+        count=len(entities_per_doc)
+    )
+
+
+@router.post("/embeddings", response_model=EmbeddingResponse, status_code=status.HTTP_200_OK)
+async def generate_embeddings(
+    request: EmbeddingRequest,
+    output: EmbeddingFormat = Depends(embedding_format),
+):
+    """
+    Generate embedding vector for text.
+    
+    Accepts a POST request with text and returns an embedding vector
+    using sentence-transformers. Use ``format=base64`` or
+    ``Accept: application/msgpack`` for packed float32/float16 vectors.
+    """
+    _require_allowed_model(request.model_name)
+    try:
+        if not request.text.strip():
+            raise ValueError("Text cannot be empty")
+        
+        cache = None if request.bypass_cache else get_embedding_cache()
+        embedding = None
+        if cache is not None:
+            embedding = (await cache.get_many([request.text], request.model_name))[0]
+        
+        if embedding is None:
+            if get_settings().embedding_microbatch_enabled:
+                # Concurrent requests for the same model share one batched encode
+                embedding = await get_embedding_batcher().submit(request.text, request.model_name)
+            else:
+                embedding = await get_inference_executor().run(
+                    generate_embedding, request.text, request.model_name
+                )
+            if cache is not None:
+                await cache.set_many([request.text], request.model_name, [embedding])
+        
+        with metrics.stage_timer(request.model_name, metrics.STAGE_SERIALIZE):
+            return render({
+                "embedding": encode_vector(embedding, output.format, output.dtype),
+                "model_version": embedding_model_version(request.model_name),
+                **encoding_metadata(output.format, output.dtype, len(embedding)),
+            }, output.format)
+    except InferenceQueueFull as e:
+        raise _inference_busy(e)
+    except ImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Embedding service not available: {str(e)}"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error generating embedding: {str(e)}"
+        )
+
+
+@router.get("/embeddings/cache", status_code=status.HTTP_200_OK)
+async def embeddings_cache_stats():
+    """
+    Report embedding cache statistics.
+    
+    Includes in-process and Redis hit counts, misses and the overall hit ratio.
+    """
+    cache = get_embedding_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/embeddings/batcher", status_code=status.HTTP_200_OK)
+async def embeddings_batcher_stats():
+    """
+    Report micro-batching statistics for the single-text embeddings endpoint.
+    
+    Includes batch counts, average batch size and how often each flush
+    reason (``max_batch_size`` or ``max_wait``) fired.
+    """
+    return {
+        "enabled": get_settings().embedding_microbatch_enabled,
+        **get_embedding_batcher().stats(),
+    }
+
+
+@router.get("/embeddings/bucketing", status_code=status.HTTP_200_OK)
+async def embeddings_bucketing_stats():
+    """
+    Report token-length bucketing statistics for batched embedding.
+    
+    Includes the share of computed token slots that were padding, what it
+    would have been with ``SentenceTransformer.encode``'s own length-sorted
+    batches, and per-bucket batch, text and token counts.
+    """
+    settings = get_settings()
+    return {
+        "enabled": settings.embedding_length_bucketing,
+        "boundaries": list(parse_boundaries(settings.embedding_bucket_boundaries)),
+        **get_bucketing_stats().stats(),
+    }
+
+
+@router.get("/models", status_code=status.HTTP_200_OK)
+async def loaded_models():
+    """
+    List models currently held in the model registry.
+    
+    Reports each model's estimated size, load time and usage, plus the
+    registry's memory budget and eviction count.
+    """
+    return get_model_registry().stats()
+
+
+@router.get("/models/memory", status_code=status.HTTP_200_OK)
+async def model_memory():
+    """
+    Report unique and proportional memory per process.
+    
+    Under the pre-fork server this covers the parent holding the shared
+    model weights and every worker, so the cost of one more worker is its
+    unique memory (``uss_bytes``) rather than its RSS.
+    """
+    return server_memory()
+
+
+@router.get("/models/parity", status_code=status.HTTP_200_OK)
+async def model_backend_parity(
+    backend: str = Query(..., description="Backend to check: torch_int8, onnx or onnx_int8"),
+    model_name: str = Query("all-MiniLM-L6-v2", description="Sentence transformer model to check"),
+):
+    """
+    Compare a backend's embeddings with the eager torch model.
+    
+    Encodes a fixed corpus of news-like texts with both and reports the max
+    and mean cosine deviation, so a backend can be checked before it is
+    enabled with EMBEDDING_BACKEND / EMBEDDING_BACKENDS.
+    """
+    _require_allowed_model(model_name)
+    try:
+        return await get_inference_executor().run(check_backend_parity, model_name, backend)
+    except InferenceQueueFull as e:
+        raise _inference_busy(e)
+    except ImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Embedding backend not available: {str(e)}"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error checking backend parity: {str(e)}"
+        )
+
+
+@router.get("/inference/executor", status_code=status.HTTP_200_OK)
+async def inference_executor_stats():
+    """
+    Report inference executor load.
+    
+    Includes queue depth, running tasks, rejected submissions and how long
+    tasks waited for a free worker.
+    """
+    return get_inference_executor().stats()
+
+
+class EmbeddingBatchItem(BaseModel):
+    """A single text in a batch embedding request."""
+    text: str = Field(..., description="Text to generate embedding for")
+    id: Optional[str] = Field(None, description="Client-supplied identifier echoed back in the result")
+    checksum: Optional[str] = Field(None, description="Client-supplied checksum echoed back in the result")
+
+
+class EmbeddingBatchRequest(BaseModel):
+    """Request model for batch embedding generation."""
+    items: List[EmbeddingBatchItem] = Field(..., description="Texts to generate embeddings for", min_length=1)
+    model_name: str = Field(default="all-MiniLM-L6-v2", description="Sentence transformer model name")
+    batch_size: Optional[int] = Field(None, ge=1, le=512, description="Texts per forward pass (defaults to EMBEDDING_BATCH_SIZE)")
+    bypass_cache: bool = Field(default=False, description="Skip the embedding cache")
+
+
+class EmbeddingBatchResult(BaseModel):
+    """Embedding result for a single item of a batch request."""
+    index: int = Field(..., description="Position of the item in the request")
+    id: Optional[str] = Field(None, description="Client-supplied identifier")
+    checksum: Optional[str] = Field(None, description="Client-supplied checksum")
+    embedding: Optional[Union[List[float], str]] = Field(None, description="Embedding vector, or null if the item failed")
+    error: Optional[str] = Field(None, description="Error message if the item failed")
+
+
+class EmbeddingBatchResponse(EmbeddingEncoding):
+    """Response model for batch embeddings."""
+    results: List[EmbeddingBatchResult] = Field(..., description="Results in request order")
+    count: int = Field(..., description="Number of embeddings generated successfully")
+    cache_hits: int = Field(0, description="Number of embeddings served from the cache")
+    model_version: str = Field(..., description="Model name/version used")
+
+
+@router.post("/embeddings/batch", response_model=EmbeddingBatchResponse, status_code=status.HTTP_200_OK)
+async def generate_embeddings_batch(
+    request: EmbeddingBatchRequest,
+    output: EmbeddingFormat = Depends(embedding_format),
+):
+    """
+    Generate embedding vectors for many texts at once.
+    
+    Texts already in the embedding cache are served from it; the rest are run
+    through a single batched ``model.encode`` call. Results are returned in
+    request order; invalid items get a per-item error instead of failing the
+    whole batch. Use ``format=base64`` or ``Accept: application/msgpack`` for
+    packed float32/float16 vectors.
+    """
+    _require_allowed_model(request.model_name)
+    settings = get_settings()
+    if len(request.items) > settings.embedding_batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch too large: {len(request.items)} items (max {settings.embedding_batch_max_items})"
+        )
+    
+    # Results are built as plain dicts and rendered directly, skipping
+    # Pydantic validation of every float in every vector.
+    results = [
+        {"index": index, "id": item.id, "checksum": item.checksum, "embedding": None, "error": None}
+        for index, item in enumerate(request.items)
+    ]
+    valid_indices = []
+    for index, item in enumerate(request.items):
+        if item.text and item.text.strip():
+            valid_indices.append(index)
+        else:
+            results[index]["error"] = "Text cannot be empty"
+    
+    try:
+        embeddings, cache_hits = await embed_texts(
+            [request.items[index].text for index in valid_indices],
+            request.model_name,
+            batch_size=request.batch_size,
+            bypass_cache=request.bypass_cache,
+        )
+    except InferenceQueueFull as e:
+        raise _inference_busy(e)
+    except ImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Embedding service not available: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error generating embeddings: {str(e)}"
+        )
+    
+    with metrics.stage_timer(request.model_name, metrics.STAGE_SERIALIZE):
+        for index, embedding in zip(valid_indices, embeddings):
+            results[index]["embedding"] = encode_vector(embedding, output.format, output.dtype)
+        
+        return render({
+            "results": results,
+            "count": len(embeddings),
+            "cache_hits": cache_hits,
+            "model_version": embedding_model_version(request.model_name),
+            **encoding_metadata(output.format, output.dtype, vector_dim(embeddings)),
+        }, output.format)
+
+
+@router.post("/embeddings/stream", status_code=status.HTTP_200_OK)
+async def stream_embeddings_ndjson(
+    request: Request,
+    model_name: str = Query("all-MiniLM-L6-v2", description="Sentence transformer model name"),
+    batch_size: Optional[int] = Query(None, ge=1, le=1024, description="Records per batch (defaults to EMBEDDING_STREAM_BATCH_SIZE)"),
+    bypass_cache: bool = Query(True, description="Skip the embedding cache"),
+    output: EmbeddingFormat = Depends(embedding_format),
+):
+    """
+    Embed an NDJSON stream of ``{"id": ..., "text": ...}`` records.
+    
+    Intended for re-embedding backfills: a whole backfill can be one
+    long-lived request. Results are streamed back as NDJSON lines of
+    ``{id, embedding, model_version}`` in input order as batches finish,
+    with ``{id, error}`` lines for unusable records, periodic
+    ``{"progress": ...}`` lines and a final ``{"summary": ...}`` line with
+    counts and throughput, plus an ``error`` if the stream stopped early.
+    Ids are echoed exactly as sent. Memory use does not grow with the input size.
+    Use ``format=base64`` for packed float32/float16 vectors.
+    """
+    _require_allowed_model(model_name)
+    if output.format == FORMAT_MSGPACK:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Streaming embeddings support json and base64 formats only"
+        )
+    
+    settings = get_settings()
+    return NDJSONStreamingResponse(
+        stream_embeddings(
+            iter_ndjson(request.stream()),
+            model_name,
+            output.format,
+            output.dtype,
+            batch_size=batch_size or settings.embedding_stream_batch_size,
+            pipeline_depth=settings.embedding_stream_pipeline_depth,
+            progress_every=settings.embedding_stream_progress_every,
+            bypass_cache=bypass_cache,
+        )
+    )
+
+
+class ArticleAnalyzeRequest(BaseModel):
+    """Request model for article analysis."""
+    text: str = Field(..., description="Cleaned article text", min_length=1)
+    model_name: str = Field(default="all-MiniLM-L6-v2", description="Sentence transformer model name")
+    target_tokens: Optional[int] = Field(None, ge=16, le=1024, description="Maximum tokens per chunk (defaults to CHUNK_TARGET_TOKENS)")
+    overlap_ratio: Optional[float] = Field(None, ge=0.0, le=0.5, description="Overlap between windows of a long paragraph (defaults to CHUNK_OVERLAP_RATIO)")
+    bypass_cache: bool = Field(default=False, description="Skip the embedding cache")
+
+
+class ArticleChunkResult(BaseModel):
+    """A chunk of an analyzed article."""
+    chunk_index: int = Field(..., description="Position of the chunk in the article")
+    text: str = Field(..., description="Chunk text")
+    token_count: int = Field(..., description="Token count from the embedding model's tokenizer")
+    checksum: str = Field(..., description="SHA-256 hex digest of the chunk text")
+    start: int = Field(..., description="Character start position in the article text")
+    end: int = Field(..., description="Character end position in the article text")
+    embedding: Union[List[float], str] = Field(..., description="Embedding vector")
+
+
+class ArticleEntity(NamedEntity):
+    """A named entity found in an analyzed article."""
+    chunk_indices: List[int] = Field(default_factory=list, description="Chunks that contain the entity")
+
+
+class ArticleAnalyzeResponse(EmbeddingEncoding):
+    """Response model for article analysis."""
+    chunks: List[ArticleChunkResult] = Field(..., description="Chunks with embeddings, in article order")
+    entities: List[ArticleEntity] = Field(..., description="Named entities found in the article")
+    chunk_count: int = Field(..., description="Number of chunks")
+    entity_count: int = Field(..., description="Number of entities")
+    cache_hits: int = Field(0, description="Number of chunk embeddings served from the cache")
+    model_version: str = Field(..., description="Embedding model name/version used")
+
+
+@router.post("/articles/analyze", response_model=ArticleAnalyzeResponse, status_code=status.HTTP_200_OK)
+async def analyze_article(
+    request: ArticleAnalyzeRequest,
+    output: EmbeddingFormat = Depends(embedding_format),
+):
+    """
+    Chunk, embed and extract entities from an article in one call.
+    
+    The text is chunked on paragraph and sentence boundaries using the
+    embedding model's tokenizer, all chunks are embedded in one batch, and
+    NER runs once over the full text while the chunks are embedded. Each
+    entity lists the chunks that contain it. Chunk embeddings follow the
+    same ``format``/``dtype`` negotiation as the embeddings endpoints.
+    """
+    _require_allowed_model(request.model_name)
+    settings = get_settings()
+    if len(request.text) > settings.analyze_max_chars:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Article too long: {len(request.text)} characters (max {settings.analyze_max_chars})"
+        )
+    
+    executor = get_inference_executor()
+    try:
+        chunks = await executor.run(
+            chunk_article_text,
+            request.text,
+            request.model_name,
+            target_tokens=request.target_tokens or settings.chunk_target_tokens,
+            overlap_ratio=request.overlap_ratio if request.overlap_ratio is not None else settings.chunk_overlap_ratio,
+        )
+        (embeddings, cache_hits), entities_data = await asyncio.gather(
+            embed_texts(
+                [chunk.text for chunk in chunks],
+                request.model_name,
+                bypass_cache=request.bypass_cache,
+            ),
+            executor.run(extract_named_entities, request.text),
+        )
+    except InferenceQueueFull as e:
+        raise _inference_busy(e)
+    except ImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"NLP service not available: {str(e)}"
+        )
+    except OSError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Spacy model not found: {str(e)}"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error analyzing article: {str(e)}"
+        )
+    
+    entities = [
+        {
+            **entity,
+            "chunk_indices": [
+                chunk.chunk_index
+                for chunk in chunks
+                if chunk.start <= entity["start"] and entity["end"] <= chunk.end
+            ],
+        }
+        for entity in entities_data
+    ]
+    
+    with metrics.stage_timer(request.model_name, metrics.STAGE_SERIALIZE):
+        return render({
+            "chunks": [
+                {**chunk._asdict(), "embedding": encode_vector(embedding, output.format, output.dtype)}
+                for chunk, embedding in zip(chunks, embeddings)
+            ],
+            "entities": entities,
+            "chunk_count": len(chunks),
+            "entity_count": len(entities),
+            "cache_hits": cache_hits,
+            "model_version": embedding_model_version(request.model_name),
+            **encoding_metadata(output.format, output.dtype, vector_dim(embeddings)),
+        }, output.format)
+
+
+class SearchRequest(BaseModel):
+    """Request model for vector similarity search."""
+    text: Optional[str] = Field(None, description="Query text, embedded with model_name", min_length=1)
+    vector: Optional[List[float]] = Field(None, description="Query embedding, instead of text")
+    k: int = Field(default=10, ge=1, description="Number of results (at most VECTOR_INDEX_MAX_K)")
+    model_name: str = Field(default="all-MiniLM-L6-v2", description="Sentence transformer model for the query text")
+    article_ids: Optional[List[int]] = Field(None, description="Only search chunks of these articles")
+    exclude_article_ids: Optional[List[int]] = Field(None, description="Skip chunks of these articles")
+    group_by_article: bool = Field(default=False, description="Return each article's best chunk only")
+    min_score: Optional[float] = Field(None, ge=-1.0, le=1.0, description="Minimum cosine similarity")
+    exact: bool = Field(default=False, description="Never use the approximate index")
+
+
+class SearchResult(BaseModel):
+    """A chunk similar to the query."""
+    chunk_id: int = Field(..., description="article_chunks.id")
+    article_id: int = Field(..., description="Article the chunk belongs to")
+    chunk_index: int = Field(..., description="Position of the chunk in its article")
+    score: float = Field(..., description="Cosine similarity to the query")
+
+
+class SearchResponse(BaseModel):
+    """Response model for vector similarity search."""
+    results: List[SearchResult] = Field(..., description="Chunks best first")
+    count: int = Field(..., description="Number of results")
+    method: str = Field(..., description="exact or hnsw")
+    index_size: int = Field(..., description="Chunks in the index")
+    model_version: str = Field(..., description="Embedding version of the indexed chunks")
+
+
+@router.post("/search", response_model=SearchResponse, status_code=status.HTTP_200_OK)
+async def search(request: SearchRequest):
+    """
+    Find the article chunks most similar to a query text or vector.
+    
+    Searches the in-process vector index (``VECTOR_INDEX_ENABLED``), which
+    is loaded from ``article_chunks`` on startup and follows changes every
+    ``VECTOR_INDEX_REFRESH_INTERVAL`` seconds. Results are exact unless the
+    index is large enough for its HNSW graph and the query has no article
+    filters.
+    """
+    if (request.text is None) == (request.vector is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide exactly one of text or vector"
+        )
+    if request.text is not None:
+        _require_allowed_model(request.model_name)
+    settings = get_settings()
+    if request.k > settings.vector_index_max_k:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"k too large: {request.k} (max {settings.vector_index_max_k})"
+        )
+    
+    index = get_vector_index()
+    if not index.loaded:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Vector index not loaded" if settings.vector_index_enabled else "Vector index is disabled"
+        )
+    
+    try:
+        query = request.vector
+        if request.text is not None:
+            model_version = embedding_model_version(request.model_name)
+            if model_version != index.model_version:
+                raise ValueError(f"Index holds {index.model_version} embeddings, not {model_version}")
+            query = (await embed_texts([request.text], request.model_name))[0][0]
+        # Not on the inference executor: a process pool would have to pickle the index
+        hits, method = await asyncio.to_thread(
+            index.search,
+            query,
+            request.k,
+            article_ids=request.article_ids,
+            exclude_article_ids=request.exclude_article_ids,
+            group_by_article=request.group_by_article,
+            min_score=request.min_score,
+            exact=request.exact,
+        )
+    except InferenceQueueFull as e:
+        raise _inference_busy(e)
+    except ImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Embedding service not available: {str(e)}"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error searching: {str(e)}"
+        )
+    
+    return {
+        "results": [hit._asdict() for hit in hits],
+        "count": len(hits),
+        "method": method,
+        "index_size": len(index),
+        "model_version": index.model_version,
+    }
+
+
+@router.get("/search/index", status_code=status.HTTP_200_OK)
+async def search_index_stats():
+    """
+    Report the vector index's size, storage and search counters.
+    
+    ``memory_mapped`` is true when the snapshot's vectors are read from the
+    page cache; only ``tail_rows`` added since then are private memory.
+    """
+    return {
+        "enabled": get_settings().vector_index_enabled,
+        **get_vector_index().stats(),
+    }
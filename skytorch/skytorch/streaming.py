@@ -0,0 +1,203 @@
+"""Streaming NDJSON embedding for bulk re-embedding backfills."""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, List, Optional, Tuple
+
+from skytorch import metrics
+from skytorch.embeddings import embed_texts
+from skytorch.encoding import encode_vector
+from skytorch.executor import InferenceQueueFull
+from skytorch.ndjson import dumps_line
+from skytorch.nlp import embedding_model_version
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# (id, text, error) per input line, in input order; text is None for unusable records
+_Batch = List[Tuple[Any, Optional[str], Optional[str]]]
+
+
+def _parse_record(line: bytes, line_number: int) -> Tuple[Any, Optional[str], Optional[str]]:
+    """
+    Parse one ``{"id": ..., "text": ...}`` line.
+
+    Returns:
+        Tuple of (id, text, error); the id is echoed as sent, and text is None when the record is unusable
+    """
+    try:
+        record = orjson.loads(line) if HAS_ORJSON else json.loads(line)
+    except ValueError:
+        return None, None, f"Line {line_number}: invalid JSON"
+    if not isinstance(record, dict):
+        return None, None, f"Line {line_number}: expected an object with id and text"
+
+    record_id = record.get("id")
+    text = record.get("text")
+    if not isinstance(text, str) or not text.strip():
+        return record_id, None, "Text cannot be empty"
+    return record_id, text, None
+
+
+async def _embed_batch(texts: List[str], model_name: str, batch_size: int, bypass_cache: bool):
+    """Embed one batch, waiting out a full inference queue rather than failing the stream."""
+    while True:
+        try:
+            vectors, _ = await embed_texts(texts, model_name, batch_size=batch_size, bypass_cache=bypass_cache)
+            return vectors
+        except InferenceQueueFull as e:
+            logger.debug(f"Inference queue full, retrying stream batch in {e.retry_after}s")
+            await asyncio.sleep(e.retry_after)
+
+
+def _progress(counts: dict, started: float) -> dict:
+    elapsed = time.perf_counter() - started
+    return {
+        **counts,
+        "elapsed_seconds": round(elapsed, 3),
+        "records_per_second": round(counts["records"] / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def _discard_result(task: asyncio.Task):
+    """Mark an abandoned batch's error as seen, so asyncio doesn't log it as never retrieved."""
+    if not task.cancelled():
+        task.exception()
+
+
+def _summary_line(counts: dict, started: float, model_version: str, error: Optional[Exception] = None) -> bytes:
+    summary = {"summary": {**_progress(counts, started), "model_version": model_version}}
+    if error is not None:
+        summary["error"] = str(error) or type(error).__name__
+    return dumps_line(summary)
+
+
+async def stream_embeddings(
+    lines: AsyncIterator[bytes],
+    model_name: str,
+    fmt: str,
+    dtype: str = "float32",
+    batch_size: int = 64,
+    pipeline_depth: int = 2,
+    progress_every: int = 1000,
+    bypass_cache: bool = True,
+) -> AsyncIterator[bytes]:
+    """
+    Embed an NDJSON stream of ``{id, text}`` records, yielding NDJSON result lines.
+
+    Records are grouped into batches of ``batch_size`` and up to
+    ``pipeline_depth`` batches are submitted to the inference executor at
+    once, so tokenization and inference of the next batch overlap with the
+    current one while results are still written in input order. Reading
+    the request body pauses while the pipeline is full, so memory stays
+    bounded by ``batch_size * pipeline_depth`` regardless of input size.
+
+    Output lines are ``{id, embedding, model_version}`` per record and
+    ``{id, error}`` for records that could not be embedded, one per input
+    line in input order, a ``{"progress": ...}`` line every
+    ``progress_every`` records and a final ``{"summary": ...}`` line. Ids
+    are echoed unchanged. If inference or reading the request fails
+    outright, the summary carries an ``error`` and the stream ends there.
+
+    Args:
+        lines: NDJSON request lines
+        model_name: Name of the sentence transformer model to use
+        fmt: Vector encoding, json or base64
+        dtype: Packed vector dtype for base64
+        batch_size: Records per batch
+        pipeline_depth: Batches in flight at once
+        progress_every: Records between progress lines (0 disables them)
+        bypass_cache: Skip the embedding cache (backfill texts are rarely repeated)
+    """
+    model_version = embedding_model_version(model_name)
+    in_flight: "asyncio.Queue[Optional[Tuple[_Batch, asyncio.Task]]]" = asyncio.Queue(maxsize=pipeline_depth)
+    started = time.perf_counter()
+    counts = {"records": 0, "embedded": 0, "errors": 0}
+
+    async def produce():
+        batch: _Batch = []
+        line_number = 0
+
+        async def submit():
+            texts = [text for _, text, _ in batch if text is not None]
+            task = asyncio.create_task(_embed_batch(texts, model_name, batch_size, bypass_cache)) if texts else None
+            await in_flight.put((list(batch), task))
+            batch.clear()
+
+        try:
+            async for line in lines:
+                line_number += 1
+                batch.append(_parse_record(line, line_number))
+                if len(batch) >= batch_size:
+                    await submit()
+            if batch:
+                await submit()
+        finally:
+            await in_flight.put(None)
+
+    producer = asyncio.create_task(produce())
+    last_progress = 0
+    try:
+        while True:
+            item = await in_flight.get()
+            if item is None:
+                break
+            batch, task = item
+
+            vectors = None
+            batch_error = None
+            if task is not None:
+                try:
+                    vectors = iter(await task)
+                except (ImportError, ValueError) as e:
+                    batch_error = str(e)
+                except Exception as e:
+                    # Inference itself is broken; later batches would fail the same way
+                    logger.exception(f"Embedding stream stopped after {counts['records']} records: {e}")
+                    yield _summary_line(counts, started, model_version, e)
+                    return
+
+            with metrics.stage_timer(model_name, metrics.STAGE_SERIALIZE):
+                output = []
+                for record_id, text, error in batch:
+                    if text is None or batch_error is not None:
+                        output.append(dumps_line({"id": record_id, "error": error or batch_error}))
+                        counts["errors"] += 1
+                    else:
+                        output.append(dumps_line({
+                            "id": record_id,
+                            "embedding": encode_vector(next(vectors), fmt, dtype),
+                            "model_version": model_version,
+                        }))
+                        counts["embedded"] += 1
+            for line in output:
+                yield line
+            counts["records"] += len(batch)
+
+            if progress_every and counts["records"] - last_progress >= progress_every:
+                last_progress = counts["records"]
+                yield dumps_line({"progress": _progress(counts, started)})
+
+        # Surface errors reading the request body
+        try:
+            await producer
+        except Exception as e:
+            logger.exception(f"Embedding stream stopped reading the request after {counts['records']} records: {e}")
+            yield _summary_line(counts, started, model_version, e)
+            return
+        yield _summary_line(counts, started, model_version)
+    finally:
+        producer.cancel()
+        while not in_flight.empty():
+            item = in_flight.get_nowait()
+            if item is not None and item[1] is not None:
+                item[1].cancel()
+                item[1].add_done_callback(_discard_result)
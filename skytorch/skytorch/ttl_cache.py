@@ -0,0 +1,187 @@
+"""Bounded in-process LRU cache with per-entry expiry, and a JSON cache tiered over Redis."""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import redis.asyncio as aioredis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+class LocalTTLCache:
+    """Thread-safe bounded LRU with a default TTL that individual entries may override."""
+
+    def __init__(self, max_items: int, ttl_seconds: int):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._items: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None):
+        """Store a value; a TTL of 0 means the entry never expires."""
+        if self.max_items <= 0:
+            return
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.monotonic() + ttl_seconds if ttl_seconds > 0 else float("inf")
+        with self._lock:
+            self._items[key] = (expires_at, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class TieredCache:
+    """
+    Cache JSON-serializable values in process and in Redis.
+
+    Lookups check the in-process LRU first, then Redis, and copy Redis hits
+    into process. Redis failures are logged and treated as misses, so the
+    cache never takes an endpoint down.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        redis_url: Optional[str] = None,
+        local_max_items: int = 50000,
+        local_ttl_seconds: int = 600,
+        redis_ttl_seconds: int = 3600,
+        key_prefix: Optional[str] = None,
+        redis_timeout: float = 0.5,
+    ):
+        """
+        Args:
+            name: Cache name used in logs
+            redis_url: Redis URL for the shared tier, or None for local only
+            local_max_items: Maximum values held in process
+            local_ttl_seconds: Default lifetime of in-process entries
+            redis_ttl_seconds: Default lifetime of Redis entries
+            key_prefix: Prefix for Redis keys (defaults to ``skytorch:<name>``)
+            redis_timeout: Socket timeout in seconds for Redis calls
+        """
+        self.name = name
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self.key_prefix = key_prefix or f"skytorch:{name}"
+        self._local = LocalTTLCache(local_max_items, local_ttl_seconds)
+        self._redis = None
+        if redis_url and HAS_REDIS:
+            self._redis = aioredis.from_url(
+                redis_url, socket_timeout=redis_timeout, socket_connect_timeout=redis_timeout
+            )
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.redis_errors = 0
+
+    def key(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}"
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[Any]]:
+        """
+        Look up cached values.
+
+        Returns:
+            Cached value for each key, or None for misses, in input order
+        """
+        results: List[Optional[Any]] = [None] * len(keys)
+        remote = []
+        for index, key in enumerate(keys):
+            value = self._local.get(key)
+            if value is not None:
+                results[index] = value
+                self.local_hits += 1
+            else:
+                remote.append(index)
+
+        if remote and self._redis is not None:
+            try:
+                values = await self._redis.mget([self.key(keys[index]) for index in remote])
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"{self.name} cache Redis lookup failed: {e}")
+                values = [None] * len(remote)
+            for index, raw in zip(remote, values):
+                if raw is not None:
+                    value = json.loads(raw)
+                    results[index] = value
+                    self._local.set(keys[index], value)
+                    self.redis_hits += 1
+
+        self.misses += sum(1 for result in results if result is None)
+        return results
+
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        local_ttl_seconds: Optional[int] = None,
+        redis_ttl_seconds: Optional[int] = None,
+    ):
+        """
+        Store values in both tiers.
+
+        Args:
+            items: Values by key; values must not be None
+            local_ttl_seconds: Override the in-process lifetime for these entries
+            redis_ttl_seconds: Override the Redis lifetime for these entries
+        """
+        if not items:
+            return
+        for key, value in items.items():
+            self._local.set(key, value, local_ttl_seconds)
+        self.writes += len(items)
+
+        if self._redis is not None:
+            ttl = self.redis_ttl_seconds if redis_ttl_seconds is None else redis_ttl_seconds
+            try:
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    for key, value in items.items():
+                        pipe.set(self.key(key), json.dumps(value), ex=ttl)
+                    await pipe.execute()
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"{self.name} cache Redis write failed: {e}")
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the local tier size."""
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "redis_enabled": self._redis is not None,
+            "local_items": len(self._local),
+            "local_max_items": self._local.max_items,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": ((self.local_hits + self.redis_hits) / lookups) if lookups else 0.0,
+            "writes": self.writes,
+            "redis_errors": self.redis_errors,
+        }
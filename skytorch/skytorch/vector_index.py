@@ -0,0 +1,1039 @@
+"""
+In-process similarity search over ``article_chunks`` embeddings.
+
+Vectors are unit-normalised and kept in contiguous float16 (or float32)
+NumPy matrices, so an exact search is one matrix-vector product per block
+of rows followed by an ``argpartition`` top-k. The index is built from
+Postgres with keyset pages and kept current from ``updated_at``; appends
+go into a growable tail matrix, so new chunks never force a rebuild.
+Chunks deleted from Postgres are found by periodically comparing ids
+page by page, and the whole index is rebuilt and re-saved on a longer
+timer.
+
+A snapshot written with ``save`` can be opened memory-mapped: its
+vectors are then read from the page cache, shared by every pre-forked
+worker, and only chunks added since the snapshot live in private memory.
+
+With hnswlib installed and ``VECTOR_INDEX_ANN=hnsw``, indexes above
+``VECTOR_INDEX_ANN_MIN_SIZE`` rows also answer unfiltered queries from
+an HNSW graph, which takes its own float32 copy of the vectors. Filtered
+queries are always exact.
+"""
+
+import asyncio
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from skytorch.config import get_settings
+from skytorch.embed_worker import HAS_PSYCOPG2, psycopg2
+
+try:
+    import hnswlib
+    HAS_HNSWLIB = True
+except ImportError:
+    HAS_HNSWLIB = False
+    hnswlib = None
+
+logger = logging.getLogger(__name__)
+
+VECTOR_DTYPES = {"float16": np.float16, "float32": np.float32}
+ANN_METHODS = ("none", "hnsw")
+
+# float16 rows widened to float32 per matrix-vector product; small enough for the buffer to stay in cache
+SEARCH_BLOCK_ROWS = 1024
+
+# Rows copied per step when snapshotting or inserting into the HNSW graph
+COPY_BLOCK_ROWS = 65536
+
+# Pointer to the live snapshot inside a snapshot directory
+SNAPSHOT_POINTER = "CURRENT"
+# Held while building or saving, so one process writes snapshots at a time
+SNAPSHOT_LOCK = "LOCK"
+
+LOAD_SQL = """
+    SELECT id, article_id, chunk_index, embedding_vector::real[]
+    FROM article_chunks
+    WHERE id > %s AND embedding_version = %s AND embedding_vector IS NOT NULL
+    ORDER BY id
+    LIMIT %s
+"""
+
+WATERMARK_SQL = "SELECT max(updated_at) FROM article_chunks"
+
+CHANGES_SQL = """
+    SELECT id, article_id, chunk_index,
+           CASE WHEN embedding_version = %s THEN embedding_vector::real[] END,
+           updated_at
+    FROM article_chunks
+    WHERE (updated_at, id) > (%s::timestamp - %s * interval '1 second', %s)
+    ORDER BY updated_at, id
+    LIMIT %s
+"""
+
+IDS_SQL = """
+    SELECT id
+    FROM article_chunks
+    WHERE id > %s AND embedding_version = %s AND embedding_vector IS NOT NULL
+    ORDER BY id
+    LIMIT %s
+"""
+
+ROWS_BY_ID_SQL = """
+    SELECT id, article_id, chunk_index, embedding_vector::real[]
+    FROM article_chunks
+    WHERE id = ANY(%s) AND embedding_version = %s AND embedding_vector IS NOT NULL
+"""
+
+
+class SearchHit(NamedTuple):
+    """One chunk returned by a search."""
+    chunk_id: int
+    article_id: int
+    chunk_index: int
+    score: float
+
+
+class _View(NamedTuple):
+    """A consistent read-only view of the index taken at the start of a search."""
+    base: np.ndarray
+    tail: np.ndarray
+    chunk_ids: np.ndarray
+    article_ids: np.ndarray
+    chunk_indexes: np.ndarray
+    alive: np.ndarray
+    rows: int
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _grow(array: np.ndarray, needed: int) -> np.ndarray:
+    """Return ``array`` with room for at least ``needed`` rows, doubling capacity."""
+    if len(array) >= needed:
+        return array
+    capacity = max(needed, 2 * len(array), 1024)
+    grown = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the ``k`` highest finite scores, best first.
+
+    Uses ``argpartition`` so only the selected positions are sorted.
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return order[np.isfinite(scores[order])]
+
+
+class VectorIndex:
+    """
+    Chunk embeddings of one embedding version, searchable by cosine similarity.
+
+    Rows are addressed by position: ``[0, base_rows)`` in the base matrix
+    (owned or memory-mapped from a snapshot), the rest in the growable
+    tail. Re-embedded chunks overwrite their tail row, or tombstone their
+    base row and move to the tail. Searches read a view taken under the
+    lock, so they run concurrently with appends.
+    """
+
+    def __init__(
+        self,
+        dtype: str = "float16",
+        ann: str = "none",
+        ann_min_size: int = 100000,
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 200,
+        hnsw_ef_search: int = 64,
+    ):
+        """
+        Args:
+            dtype: Storage dtype of the vectors, float16 or float32
+            ann: Approximate index to keep alongside, none or hnsw
+            ann_min_size: Rows below which searches stay exact
+            hnsw_m: HNSW graph degree
+            hnsw_ef_construction: HNSW candidate list size while inserting
+            hnsw_ef_search: Minimum HNSW candidate list size while searching
+
+        Raises:
+            ValueError: If ``dtype`` or ``ann`` is not recognized
+            ImportError: If ``ann`` is hnsw and hnswlib is not installed
+        """
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unknown vector index dtype '{dtype}' (expected one of: {', '.join(VECTOR_DTYPES)})")
+        if ann not in ANN_METHODS:
+            raise ValueError(f"Unknown vector index ANN method '{ann}' (expected one of: {', '.join(ANN_METHODS)})")
+        if ann == "hnsw" and not HAS_HNSWLIB:
+            raise ImportError("hnswlib is not installed. Install it with: pip install hnswlib")
+
+        self.dtype = dtype
+        self.ann = ann
+        self.ann_min_size = ann_min_size
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.hnsw_ef_search = hnsw_ef_search
+
+        self.model_version: Optional[str] = None
+        self.dim: Optional[int] = None
+        self.loaded = False
+        self.loaded_at: Optional[float] = None
+        self.refreshed_at: Optional[float] = None
+        self.snapshot_path: Optional[str] = None
+        # (updated_at, id) of the last change applied from Postgres
+        self.watermark: Optional[Tuple[str, int]] = None
+        # updated_at of changes applied within the refresh overlap window, by chunk id
+        self.recent_changes: Dict[int, str] = {}
+        # When the contents were last read in full from Postgres, and last compared with it
+        self.built_at: Optional[float] = None
+        self.reconciled_at: Optional[float] = None
+
+        self._lock = threading.Lock()
+        self._base = np.zeros((0, 0), dtype=VECTOR_DTYPES[dtype])
+        self._tail = np.zeros((0, 0), dtype=VECTOR_DTYPES[dtype])
+        self._chunk_ids = np.zeros(0, dtype=np.int64)
+        self._article_ids = np.zeros(0, dtype=np.int64)
+        self._chunk_indexes = np.zeros(0, dtype=np.int32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._base_rows = 0
+        self._rows = 0
+        self._positions: Dict[int, int] = {}
+
+        self._ann_lock = threading.Lock()
+        self._ann_index = None
+        self._ann_rows = 0
+
+        self.searches = 0
+        self.ann_searches = 0
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def empty_copy(self) -> "VectorIndex":
+        """A new, empty index with the same storage and ANN settings."""
+        return VectorIndex(
+            dtype=self.dtype,
+            ann=self.ann,
+            ann_min_size=self.ann_min_size,
+            hnsw_m=self.hnsw_m,
+            hnsw_ef_construction=self.hnsw_ef_construction,
+            hnsw_ef_search=self.hnsw_ef_search,
+        )
+
+    def chunk_ids(self) -> np.ndarray:
+        """Sorted ids of the chunks in the index."""
+        with self._lock:
+            ids = np.fromiter(self._positions, dtype=np.int64, count=len(self._positions))
+        ids.sort()
+        return ids
+
+    def reset(self, model_version: str, dim: Optional[int] = None):
+        """Empty the index and label it with ``model_version``."""
+        with self._lock:
+            self.model_version = model_version
+            self.dim = dim
+            self.loaded = False
+            self.snapshot_path = None
+            self.watermark = None
+            self.recent_changes = {}
+            self.built_at = None
+            self.reconciled_at = None
+            self._base = np.zeros((0, dim or 0), dtype=VECTOR_DTYPES[self.dtype])
+            self._tail = np.zeros((0, dim or 0), dtype=VECTOR_DTYPES[self.dtype])
+            self._chunk_ids = np.zeros(0, dtype=np.int64)
+            self._article_ids = np.zeros(0, dtype=np.int64)
+            self._chunk_indexes = np.zeros(0, dtype=np.int32)
+            self._alive = np.zeros(0, dtype=bool)
+            self._base_rows = 0
+            self._rows = 0
+            self._positions = {}
+        with self._ann_lock:
+            self._ann_index = None
+            self._ann_rows = 0
+
+    def add(
+        self,
+        chunk_ids: Sequence[int],
+        article_ids: Sequence[int],
+        chunk_indexes: Sequence[int],
+        vectors,
+    ) -> int:
+        """
+        Insert chunks, replacing any already in the index.
+
+        Args:
+            chunk_ids: ``article_chunks.id`` of each chunk
+            article_ids: Article of each chunk
+            chunk_indexes: Position of each chunk in its article
+            vectors: ``(len(chunk_ids), dim)`` embeddings; normalised here
+
+        Returns:
+            Number of chunks appended as new rows
+
+        Raises:
+            ValueError: If the vectors' dimension differs from the index's
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(chunk_ids) == 0:
+            return 0
+        if vectors.ndim != 2 or len(vectors) != len(chunk_ids):
+            raise ValueError(f"Expected {len(chunk_ids)} vectors, got an array of shape {vectors.shape}")
+        vectors = _normalize(vectors).astype(VECTOR_DTYPES[self.dtype])
+
+        with self._lock:
+            if not self.dim:
+                self.dim = vectors.shape[1]
+                self._base = np.zeros((0, self.dim), dtype=self._base.dtype)
+                self._tail = np.zeros((0, self.dim), dtype=self._tail.dtype)
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Vector dimension {vectors.shape[1]} does not match the index dimension {self.dim}")
+
+            appends = []
+            overwritten = []
+            moved = []
+            for position, chunk_id in enumerate(chunk_ids):
+                row = self._positions.get(int(chunk_id))
+                if row is not None and row >= self._base_rows:
+                    overwritten.append(row)
+                    self._tail[row - self._base_rows] = vectors[position]
+                    self._article_ids[row] = article_ids[position]
+                    self._chunk_indexes[row] = chunk_indexes[position]
+                    continue
+                if row is not None:
+                    # Base rows may be memory-mapped read-only; move the chunk to the tail
+                    self._alive[row] = False
+                    moved.append(row)
+                appends.append(position)
+
+            if appends:
+                start = self._rows
+                end = start + len(appends)
+                tail_end = end - self._base_rows
+                self._tail = _grow(self._tail, tail_end)
+                self._chunk_ids = _grow(self._chunk_ids, end)
+                self._article_ids = _grow(self._article_ids, end)
+                self._chunk_indexes = _grow(self._chunk_indexes, end)
+                self._alive = _grow(self._alive, end)
+
+                self._tail[start - self._base_rows:tail_end] = vectors[appends]
+                self._chunk_ids[start:end] = np.asarray(chunk_ids)[appends]
+                self._article_ids[start:end] = np.asarray(article_ids)[appends]
+                self._chunk_indexes[start:end] = np.asarray(chunk_indexes)[appends]
+                self._alive[start:end] = True
+                for row, position in enumerate(appends, start):
+                    self._positions[int(chunk_ids[position])] = row
+                self._rows = end
+
+        if overwritten or moved:
+            self._ann_update(overwritten, moved)
+        return len(appends)
+
+    def remove(self, chunk_ids: Iterable[int]) -> int:
+        """
+        Drop chunks from the index.
+
+        Returns:
+            Number of chunks that were in the index
+        """
+        with self._lock:
+            rows = [row for row in (self._positions.pop(int(chunk_id), None) for chunk_id in chunk_ids) if row is not None]
+            self._alive[rows] = False
+        if rows:
+            self._ann_update([], rows)
+        return len(rows)
+
+    def replace_with(self, other: "VectorIndex"):
+        """Take over the contents of ``other``, e.g. a rebuild, in one step under the lock."""
+        with other._lock:
+            state = (
+                other.model_version, other.dim, other.loaded, other.snapshot_path, other.watermark,
+                dict(other.recent_changes), other.built_at, other.reconciled_at,
+                other._base, other._tail, other._chunk_ids, other._article_ids, other._chunk_indexes,
+                other._alive, other._base_rows, other._rows, other._positions,
+            )
+        with self._lock:
+            (
+                self.model_version, self.dim, self.loaded, self.snapshot_path, self.watermark,
+                self.recent_changes, self.built_at, self.reconciled_at,
+                self._base, self._tail, self._chunk_ids, self._article_ids, self._chunk_indexes,
+                self._alive, self._base_rows, self._rows, self._positions,
+            ) = state
+            self.loaded_at = time.time()
+        with self._ann_lock:
+            self._ann_index = None
+            self._ann_rows = 0
+
+    def _view(self) -> _View:
+        with self._lock:
+            return _View(
+                self._base[:self._base_rows],
+                self._tail[:self._rows - self._base_rows],
+                self._chunk_ids,
+                self._article_ids,
+                self._chunk_indexes,
+                self._alive,
+                self._rows,
+            )
+
+    @staticmethod
+    def _score_all(view: _View, query: np.ndarray) -> np.ndarray:
+        scores = np.empty(view.rows, dtype=np.float32)
+        buffer = None
+        offset = 0
+        for matrix in (view.base, view.tail):
+            if matrix.dtype == np.float32:
+                np.dot(matrix, query, out=scores[offset:offset + len(matrix)])
+            else:
+                # BLAS has no float16 kernels: widen one block at a time into a reused buffer
+                if buffer is None:
+                    buffer = np.empty((SEARCH_BLOCK_ROWS, query.shape[0]), dtype=np.float32)
+                for start in range(0, len(matrix), SEARCH_BLOCK_ROWS):
+                    block = matrix[start:start + SEARCH_BLOCK_ROWS]
+                    widened = buffer[:len(block)]
+                    np.copyto(widened, block)
+                    np.dot(widened, query, out=scores[offset + start:offset + start + len(block)])
+            offset += len(matrix)
+        return scores
+
+    def _gather(self, view: _View, rows: np.ndarray) -> np.ndarray:
+        """float32 copy of the vectors at ``rows``."""
+        base_rows = len(view.base)
+        in_base = rows < base_rows
+        vectors = np.empty((len(rows), self.dim or 0), dtype=np.float32)
+        vectors[in_base] = view.base[rows[in_base]]
+        vectors[~in_base] = view.tail[rows[~in_base] - base_rows]
+        return vectors
+
+    def _exact(
+        self,
+        view: _View,
+        query: np.ndarray,
+        article_ids: Optional[Sequence[int]],
+        exclude_article_ids: Optional[Sequence[int]],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Score every live row matching the filters; returns ``(rows, scores)``."""
+        owners = view.article_ids[:view.rows]
+        if article_ids:
+            # A small candidate set: gather its rows rather than scoring everything
+            candidates = np.isin(owners, np.asarray(article_ids, dtype=np.int64)) & view.alive[:view.rows]
+            if exclude_article_ids:
+                candidates &= ~np.isin(owners, np.asarray(exclude_article_ids, dtype=np.int64))
+            rows = np.flatnonzero(candidates)
+            return rows, self._gather(view, rows) @ query
+
+        scores = self._score_all(view, query)
+        scores[~view.alive[:view.rows]] = -np.inf
+        if exclude_article_ids:
+            scores[np.isin(owners, np.asarray(exclude_article_ids, dtype=np.int64))] = -np.inf
+        return np.arange(view.rows), scores
+
+    def search(
+        self,
+        query,
+        k: int = 10,
+        article_ids: Optional[Sequence[int]] = None,
+        exclude_article_ids: Optional[Sequence[int]] = None,
+        group_by_article: bool = False,
+        min_score: Optional[float] = None,
+        exact: bool = False,
+    ) -> Tuple[List[SearchHit], str]:
+        """
+        Find the chunks most similar to ``query``.
+
+        Args:
+            query: Query embedding; normalised here
+            k: Number of results
+            article_ids: Only search chunks of these articles
+            exclude_article_ids: Skip chunks of these articles
+            group_by_article: Return each article's best chunk only, k articles in all
+            min_score: Drop results with a lower cosine similarity
+            exact: Never use the approximate index
+
+        Returns:
+            Tuple of (hits best first, method used: ``exact`` or ``hnsw``)
+
+        Raises:
+            ValueError: If the query's dimension differs from the index's
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        if self.dim and len(query) != self.dim:
+            raise ValueError(f"Query dimension {len(query)} does not match the index dimension {self.dim}")
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        view = self._view()
+        self.searches += 1
+        use_ann = not exact and not article_ids and not exclude_article_ids and self._ann_index is not None
+        if use_ann:
+            self.ann_searches += 1
+        rows = scores = None
+        if not use_ann:
+            rows, scores = self._exact(view, query, article_ids, exclude_article_ids)
+
+        wanted = k
+        while True:
+            if use_ann:
+                try:
+                    found_rows, found_scores = self._ann_query(query, wanted)
+                except RuntimeError:
+                    # Too many deleted neighbours to fill k results; answer exactly
+                    use_ann = False
+                    rows, scores = self._exact(view, query, article_ids, exclude_article_ids)
+                    continue
+            else:
+                order = top_k(scores, wanted)
+                found_rows, found_scores = rows[order], scores[order]
+
+            hits = []
+            seen_articles = set()
+            for row, score in zip(found_rows, found_scores):
+                if min_score is not None and score < min_score:
+                    break
+                if row >= view.rows or not view.alive[row]:
+                    continue
+                article_id = int(view.article_ids[row])
+                if group_by_article:
+                    if article_id in seen_articles:
+                        continue
+                    seen_articles.add(article_id)
+                hits.append(SearchHit(int(view.chunk_ids[row]), article_id, int(view.chunk_indexes[row]), float(score)))
+                if len(hits) == k:
+                    break
+
+            exhausted = len(found_rows) < wanted or wanted >= view.rows
+            if len(hits) >= k or not group_by_article or exhausted:
+                return hits, "hnsw" if use_ann else "exact"
+            # Too many chunks shared an article; widen the candidate list
+            wanted *= 4
+
+    def _ann_query(self, query: np.ndarray, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        with self._ann_lock:
+            index = self._ann_index
+            count = min(count, index.get_current_count())
+            if count == 0:
+                return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+            index.set_ef(max(self.hnsw_ef_search, count))
+            labels, distances = index.knn_query(query, k=count)
+        # The inner-product space reports 1 - dot
+        return labels[0].astype(np.int64), (1.0 - distances[0]).astype(np.float32)
+
+    def _ann_update(self, overwritten: List[int], deleted: List[int]):
+        """Re-insert overwritten rows into the approximate index and hide deleted ones."""
+        view = self._view()
+        with self._ann_lock:
+            if self._ann_index is None:
+                return
+            overwritten = np.asarray([row for row in overwritten if row < self._ann_rows], dtype=np.int64)
+            if len(overwritten):
+                self._ann_index.add_items(self._gather(view, overwritten), overwritten)
+            for row in deleted:
+                if row < self._ann_rows:
+                    self._ann_index.mark_deleted(row)
+
+    def sync_ann(self) -> int:
+        """
+        Build or extend the approximate index to cover every row.
+
+        Does nothing unless ANN is enabled and the index has reached
+        ``ann_min_size`` rows. Only rows added since the last call are
+        inserted into an existing graph.
+
+        Returns:
+            Number of rows inserted
+        """
+        if self.ann != "hnsw" or len(self) < self.ann_min_size:
+            return 0
+        view = self._view()
+        with self._ann_lock:
+            if self._ann_index is None:
+                index = hnswlib.Index(space="ip", dim=self.dim)
+                index.init_index(
+                    max_elements=max(view.rows, 1024),
+                    ef_construction=self.hnsw_ef_construction,
+                    M=self.hnsw_m,
+                    allow_replace_deleted=False,
+                )
+                self._ann_index = index
+                self._ann_rows = 0
+            start = self._ann_rows
+            if view.rows <= start:
+                return 0
+            if view.rows > self._ann_index.get_max_elements():
+                self._ann_index.resize_index(max(view.rows, 2 * self._ann_index.get_max_elements()))
+
+        started = time.perf_counter()
+        for block_start in range(start, view.rows, COPY_BLOCK_ROWS):
+            rows = np.arange(block_start, min(block_start + COPY_BLOCK_ROWS, view.rows))
+            vectors = self._gather(view, rows)
+            with self._ann_lock:
+                self._ann_index.add_items(vectors, rows)
+                dead = rows[~view.alive[rows]]
+                for row in dead:
+                    self._ann_index.mark_deleted(int(row))
+                self._ann_rows = int(rows[-1]) + 1
+        logger.info(f"HNSW index now covers {view.rows} rows (+{view.rows - start} in {time.perf_counter() - started:.1f}s)")
+        return view.rows - start
+
+    def save(self, directory: str) -> str:
+        """
+        Write a compacted snapshot of the live rows under ``directory``.
+
+        Each snapshot goes to a new subdirectory and the ``CURRENT`` pointer
+        is replaced atomically, so readers never see a half-written
+        snapshot; older snapshots are removed afterwards (processes that
+        still map them keep their pages until they let go).
+
+        Returns:
+            Path of the snapshot written
+        """
+        view = self._view()
+        live = np.flatnonzero(view.alive[:view.rows])
+        root = Path(directory)
+        root.mkdir(parents=True, exist_ok=True)
+        # Never reuse a directory: a live index may have the old one memory-mapped
+        path = Path(tempfile.mkdtemp(prefix=f"snapshot-{time.strftime('%Y%m%dT%H%M%S')}-", dir=root))
+
+        vectors = np.lib.format.open_memmap(
+            path / "vectors.npy", mode="w+", dtype=VECTOR_DTYPES[self.dtype], shape=(len(live), self.dim or 0)
+        )
+        for start in range(0, len(live), COPY_BLOCK_ROWS):
+            rows = live[start:start + COPY_BLOCK_ROWS]
+            vectors[start:start + len(rows)] = self._gather(view, rows)
+        vectors.flush()
+        del vectors
+        np.save(path / "chunk_ids.npy", view.chunk_ids[live])
+        np.save(path / "article_ids.npy", view.article_ids[live])
+        np.save(path / "chunk_indexes.npy", view.chunk_indexes[live])
+        with open(path / "meta.json", "w") as f:
+            json.dump({
+                "model_version": self.model_version,
+                "dim": self.dim,
+                "dtype": self.dtype,
+                "rows": int(len(live)),
+                "watermark": self.watermark,
+                "built_at": self.built_at,
+                "reconciled_at": self.reconciled_at,
+                "saved_at": time.time(),
+            }, f)
+
+        temporary = root / f"{SNAPSHOT_POINTER}.tmp"
+        temporary.write_text(path.name)
+        os.replace(temporary, root / SNAPSHOT_POINTER)
+        for old in root.glob("snapshot-*"):
+            if old.name != path.name:
+                shutil.rmtree(old, ignore_errors=True)
+        logger.info(f"Saved vector index snapshot of {len(live)} chunks to {path}")
+        return str(path)
+
+    def load(self, directory: str, mmap: bool = True, model_version: Optional[str] = None) -> bool:
+        """
+        Replace the index contents with the current snapshot under ``directory``.
+
+        Args:
+            directory: Directory ``save`` wrote to
+            mmap: Memory-map the vectors instead of reading them into memory
+            model_version: Only load a snapshot of this embedding version
+
+        Returns:
+            False if there is no snapshot, or it has a different dtype or version
+        """
+        path = current_snapshot(directory)
+        try:
+            with open(Path(path) / "meta.json") as f:
+                meta = json.load(f)
+        except (OSError, TypeError, ValueError):
+            return False
+        path = Path(path)
+        if meta.get("dtype") != self.dtype:
+            logger.warning(f"Ignoring vector index snapshot {path}: it stores {meta.get('dtype')}, not {self.dtype}")
+            return False
+        if model_version is not None and meta.get("model_version") != model_version:
+            logger.info(f"Ignoring vector index snapshot {path}: it holds {meta.get('model_version')}, not {model_version}")
+            return False
+
+        base = np.load(path / "vectors.npy", mmap_mode="r" if mmap else None)
+        chunk_ids = np.load(path / "chunk_ids.npy")
+        article_ids = np.load(path / "article_ids.npy")
+        chunk_indexes = np.load(path / "chunk_indexes.npy")
+        rows = len(chunk_ids)
+        with self._lock:
+            self.model_version = meta["model_version"]
+            self.dim = meta["dim"]
+            self.watermark = tuple(meta["watermark"]) if meta.get("watermark") else None
+            self.recent_changes = {}
+            self.built_at = meta.get("built_at") or meta.get("saved_at")
+            self.reconciled_at = meta.get("reconciled_at") or self.built_at
+            self.snapshot_path = str(path)
+            self._base = base
+            self._tail = np.zeros((0, self.dim), dtype=VECTOR_DTYPES[self.dtype])
+            self._chunk_ids = chunk_ids
+            self._article_ids = article_ids
+            self._chunk_indexes = chunk_indexes
+            self._alive = np.ones(rows, dtype=bool)
+            self._base_rows = rows
+            self._rows = rows
+            self._positions = {int(chunk_id): row for row, chunk_id in enumerate(chunk_ids)}
+            self.loaded = True
+            self.loaded_at = time.time()
+        with self._ann_lock:
+            self._ann_index = None
+            self._ann_rows = 0
+        logger.info(f"Loaded vector index snapshot of {rows} chunks from {path}{' (memory-mapped)' if mmap else ''}")
+        return True
+
+    def stats(self) -> dict:
+        """Report size, memory and search counters."""
+        view = self._view()
+        base_bytes = view.base.nbytes
+        return {
+            "loaded": self.loaded,
+            "model_version": self.model_version,
+            "chunks": len(self),
+            "rows": view.rows,
+            "deleted_rows": view.rows - len(self),
+            "dim": self.dim,
+            "dtype": self.dtype,
+            "base_rows": len(view.base),
+            "tail_rows": len(view.tail),
+            "memory_mapped": isinstance(view.base, np.memmap),
+            "vector_bytes": base_bytes + view.tail.nbytes,
+            "snapshot_path": self.snapshot_path,
+            "watermark": list(self.watermark) if self.watermark else None,
+            "loaded_at": self.loaded_at,
+            "refreshed_at": self.refreshed_at,
+            "built_at": self.built_at,
+            "reconciled_at": self.reconciled_at,
+            "ann": self.ann,
+            "ann_rows": self._ann_rows,
+            "searches": self.searches,
+            "ann_searches": self.ann_searches,
+        }
+
+
+def current_snapshot(directory: str) -> Optional[str]:
+    """Path of the snapshot the ``CURRENT`` pointer under ``directory`` names, or None."""
+    root = Path(directory)
+    try:
+        name = (root / SNAPSHOT_POINTER).read_text().strip()
+    except OSError:
+        return None
+    return str(root / name) if name else None
+
+
+@contextlib.contextmanager
+def snapshot_lock(directory: str, blocking: bool = True) -> Iterator[bool]:
+    """
+    Hold the lock that serializes building and saving snapshots under ``directory``.
+
+    Yields:
+        Whether the lock was taken; always True when ``blocking``
+    """
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    fd = os.open(os.path.join(directory, SNAPSHOT_LOCK), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        yield True
+    finally:
+        os.close(fd)
+
+
+def _add_rows(index: VectorIndex, rows: Sequence[tuple]) -> int:
+    """Add ``(id, article_id, chunk_index, vector)`` rows."""
+    return index.add(
+        [row[0] for row in rows],
+        [row[1] for row in rows],
+        [row[2] for row in rows],
+        np.array([row[3] for row in rows], dtype=np.float32),
+    )
+
+
+def load_from_postgres(index: VectorIndex, conn, model_version: str, page_size: int = 10000) -> int:
+    """
+    Rebuild the index from every ``article_chunks`` row embedded as ``model_version``.
+
+    The change watermark is read before the scan, so rows written while
+    it runs are applied by the next ``refresh_from_postgres``.
+
+    Returns:
+        Number of chunks loaded
+    """
+    started = time.time()
+    with conn.cursor() as cur:
+        cur.execute(WATERMARK_SQL)
+        latest = cur.fetchone()[0]
+    conn.rollback()
+
+    index.reset(model_version)
+    position = 0
+    while True:
+        with conn.cursor() as cur:
+            cur.execute(LOAD_SQL, (position, model_version, page_size))
+            rows = cur.fetchall()
+        conn.rollback()
+        if not rows:
+            break
+        _add_rows(index, rows)
+        position = rows[-1][0]
+
+    # Every row stamped ``latest`` existed before the scan, so none of them is a change
+    index.watermark = (latest.isoformat() if latest is not None else "-infinity", position)
+    index.loaded = True
+    index.built_at = index.reconciled_at = started
+    index.loaded_at = index.refreshed_at = time.time()
+    return len(index)
+
+
+def refresh_from_postgres(index: VectorIndex, conn, page_size: int = 10000, overlap: float = 0.0) -> int:
+    """
+    Apply ``article_chunks`` rows updated since the index's watermark.
+
+    Rows embedded as the index's version are added or replaced; rows
+    whose embedding moved to another version are removed. ``updated_at``
+    is stamped when a writer's transaction starts, so a row can commit
+    after later-stamped rows were already read. Each refresh therefore
+    re-reads ``overlap`` seconds behind the watermark and applies the
+    rows it has not applied at that ``updated_at`` yet. Deleted chunks
+    are not seen here; see ``reconcile_with_postgres``.
+
+    Returns:
+        Number of rows applied
+    """
+    if index.watermark is None:
+        return 0
+    applied = 0
+    updated_at, last_id = index.watermark
+    # The first page starts ``overlap`` seconds back, at any id
+    cursor, shift = (updated_at, last_id if overlap <= 0 else 0), max(overlap, 0.0)
+    while True:
+        with conn.cursor() as cur:
+            cur.execute(CHANGES_SQL, (index.model_version, cursor[0], shift, cursor[1], page_size))
+            rows = cur.fetchall()
+        conn.rollback()
+        if not rows:
+            break
+        changed = [row for row in rows if index.recent_changes.get(row[0]) != row[4].isoformat()]
+        _add_rows(index, [row for row in changed if row[3] is not None])
+        index.remove(row[0] for row in changed if row[3] is None)
+        for row in changed:
+            index.recent_changes[row[0]] = row[4].isoformat()
+        cursor, shift = (rows[-1][4].isoformat(), rows[-1][0]), 0.0
+        index.watermark = max(index.watermark, cursor)
+        applied += len(changed)
+        if len(rows) < page_size:
+            break
+
+    if overlap > 0 and index.watermark[0] != "-infinity":
+        horizon = (datetime.fromisoformat(index.watermark[0]) - timedelta(seconds=overlap)).isoformat()
+        index.recent_changes = {
+            chunk_id: stamp for chunk_id, stamp in index.recent_changes.items() if stamp >= horizon
+        }
+    index.refreshed_at = time.time()
+    return applied
+
+
+def reconcile_with_postgres(index: VectorIndex, conn, page_size: int = 10000) -> Tuple[int, int]:
+    """
+    Remove chunks deleted from Postgres and add embedded chunks the index lacks.
+
+    Deleted rows never show up as changes (``ProcessArticleEmbeddingsJob``
+    deletes an article's chunks and recreates them under new ids), so the
+    ids of every row embedded as the index's version are compared with the
+    index one keyset page at a time. Only missing rows' vectors are read.
+
+    Returns:
+        Tuple of (chunks removed, chunks added)
+    """
+    started = time.time()
+    indexed = index.chunk_ids()
+    removed = added = 0
+    position = 0
+    while True:
+        with conn.cursor() as cur:
+            cur.execute(IDS_SQL, (position, index.model_version, page_size))
+            ids = np.array([row[0] for row in cur.fetchall()], dtype=np.int64)
+        conn.rollback()
+        # The last page also covers every indexed id above it
+        last = int(ids[-1]) if len(ids) == page_size else np.iinfo(np.int64).max
+        page = indexed[(indexed > position) & (indexed <= last)]
+        removed += index.remove(np.setdiff1d(page, ids, assume_unique=True).tolist())
+
+        missing = np.setdiff1d(ids, page, assume_unique=True)
+        if len(missing):
+            with conn.cursor() as cur:
+                cur.execute(ROWS_BY_ID_SQL, (missing.tolist(), index.model_version))
+                rows = cur.fetchall()
+            conn.rollback()
+            if rows:
+                _add_rows(index, rows)
+                added += len(rows)
+        if len(ids) < page_size:
+            break
+        position = last
+
+    index.reconciled_at = started
+    return removed, added
+
+
+def _due(last: Optional[float], interval: float) -> bool:
+    return interval > 0 and time.time() - (last or 0.0) >= interval
+
+
+def _build(index: VectorIndex, conn, model_version: str) -> bool:
+    """
+    Build the index from Postgres, or rebuild it beside the live one and swap it in.
+
+    With a snapshot directory, one process builds and saves at a time;
+    the others wait for an empty index, load what it saved and skip an
+    overdue rebuild rather than running their own.
+
+    Returns:
+        Whether this process built the index
+    """
+    settings = get_settings()
+    snapshot_dir = settings.vector_index_snapshot_dir
+    rebuild = index.loaded
+    lock = snapshot_lock(snapshot_dir, blocking=not rebuild) if snapshot_dir else contextlib.nullcontext(True)
+    with lock as owner:
+        if not owner:
+            return False
+        # Another process may have saved a fresh snapshot while this one waited
+        if (
+            snapshot_dir
+            and current_snapshot(snapshot_dir) != index.snapshot_path
+            and index.load(snapshot_dir, mmap=settings.vector_index_mmap, model_version=model_version)
+            and not _due(index.built_at, settings.vector_index_rebuild_interval)
+        ):
+            return False
+
+        started = time.perf_counter()
+        target = index.empty_copy() if rebuild else index
+        load_from_postgres(target, conn, model_version, settings.vector_index_page_size)
+        logger.info(f"{'Rebuilt' if rebuild else 'Built'} vector index of {len(target)} chunks in {time.perf_counter() - started:.1f}s")
+        if snapshot_dir:
+            target.save(snapshot_dir)
+            # Serve from the snapshot, so workers share its pages
+            index.load(snapshot_dir, mmap=settings.vector_index_mmap)
+        elif rebuild:
+            index.replace_with(target)
+    return True
+
+
+def sync_vector_index(index: VectorIndex, model_version: str) -> dict:
+    """
+    Bring the index up to date with Postgres, loading or building it first if empty.
+
+    A snapshot in ``VECTOR_INDEX_SNAPSHOT_DIR`` for ``model_version`` is
+    loaded when it is newer than what the index holds, otherwise an empty
+    index is built from Postgres and snapshotted. The index is compared
+    with Postgres every ``VECTOR_INDEX_RECONCILE_INTERVAL`` seconds and
+    rebuilt every ``VECTOR_INDEX_REBUILD_INTERVAL`` seconds. Changes since
+    the watermark are then applied and the approximate index extended.
+
+    Returns:
+        Dict of what was done
+
+    Raises:
+        ImportError: If psycopg2 is not installed
+    """
+    if not HAS_PSYCOPG2:
+        raise ImportError("psycopg2 is not installed. Install it with: pip install psycopg2-binary")
+
+    settings = get_settings()
+    snapshot_dir = settings.vector_index_snapshot_dir
+    result = {"snapshot_loaded": False, "built": False, "removed": 0, "restored": 0, "changes": 0, "ann_added": 0}
+    if (
+        snapshot_dir
+        and current_snapshot(snapshot_dir) not in (None, index.snapshot_path)
+        and index.load(snapshot_dir, mmap=settings.vector_index_mmap, model_version=model_version)
+    ):
+        result["snapshot_loaded"] = True
+    if index.loaded and index.model_version != model_version:
+        index.loaded = False
+
+    conn = psycopg2.connect(settings.database_url)
+    try:
+        if not index.loaded or _due(index.built_at, settings.vector_index_rebuild_interval):
+            result["built"] = _build(index, conn, model_version)
+        if _due(index.reconciled_at, settings.vector_index_reconcile_interval):
+            result["removed"], result["restored"] = reconcile_with_postgres(
+                index, conn, settings.vector_index_page_size
+            )
+        result["changes"] = refresh_from_postgres(
+            index, conn, settings.vector_index_page_size, settings.vector_index_refresh_overlap
+        )
+    finally:
+        conn.close()
+    result["ann_added"] = index.sync_ann()
+    return result
+
+
+async def run_vector_index_sync():
+    """Load the index on startup, then apply Postgres changes every ``VECTOR_INDEX_REFRESH_INTERVAL`` seconds."""
+    from skytorch.nlp import embedding_model_version
+
+    settings = get_settings()
+    model_version = settings.vector_index_embedding_version or embedding_model_version(settings.embedding_model_name)
+    index = get_vector_index()
+    while True:
+        try:
+            result = await asyncio.to_thread(sync_vector_index, index, model_version)
+            if result["changes"]:
+                logger.info(f"Vector index applied {result['changes']} changed chunks ({len(index)} chunks)")
+            if result["removed"] or result["restored"]:
+                logger.info(
+                    f"Vector index reconciled with Postgres: removed {result['removed']} deleted chunks, "
+                    f"added {result['restored']} missed chunks"
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Vector index sync failed: {e}")
+        if settings.vector_index_refresh_interval <= 0:
+            return
+        await asyncio.sleep(settings.vector_index_refresh_interval)
+
+
+_vector_index: Optional[VectorIndex] = None
+
+
+def get_vector_index() -> VectorIndex:
+    """Get the process-wide vector index, configured from settings."""
+    global _vector_index
+    if _vector_index is None:
+        settings = get_settings()
+        _vector_index = VectorIndex(
+            dtype=settings.vector_index_dtype,
+            ann=settings.vector_index_ann,
+            ann_min_size=settings.vector_index_ann_min_size,
+            hnsw_m=settings.vector_index_hnsw_m,
+            hnsw_ef_construction=settings.vector_index_hnsw_ef_construction,
+            hnsw_ef_search=settings.vector_index_hnsw_ef_search,
+        )
+    return _vector_index
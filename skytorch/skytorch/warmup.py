@@ -0,0 +1,257 @@
+"""Startup model loading and warm-up, and the readiness state it drives."""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from skytorch.atproto_client import get_atproto_client
+from skytorch.config import get_settings
+from skytorch.executor import get_inference_executor
+
+logger = logging.getLogger(__name__)
+
+# Word counts of the synthetic warm-up texts: a short post, a paragraph and
+# a full article chunk.
+WARMUP_LENGTHS = (16, 64, 220)
+
+_WARMUP_SENTENCE = (
+    "The city council in Portland voted on Tuesday to approve a new transit plan "
+    "after officials from the Department of Transportation presented their report. "
+)
+
+
+class WarmupState:
+    """Progress of startup warm-up, reported by the readiness check."""
+
+    def __init__(self):
+        self.status = "pending"
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.timings: Dict[str, float] = {}
+        self.models_available = False
+        self.attempts = 0
+        self.error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    @property
+    def failed(self) -> bool:
+        return self.status == "failed"
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "models_available": self.models_available,
+            "attempts": self.attempts,
+            "timings": self.timings,
+            "error": self.error,
+        }
+
+
+_warmup_state = WarmupState()
+
+
+def get_warmup_state() -> WarmupState:
+    """Get the process-wide warm-up state."""
+    return _warmup_state
+
+
+def _synthetic_text(words: int) -> str:
+    """Build a news-like text of roughly ``words`` words."""
+    sentence_words = _WARMUP_SENTENCE.split()
+    repeated = sentence_words * (words // len(sentence_words) + 1)
+    return " ".join(repeated[:words])
+
+
+def warm_up_models(spacy_model: str, sentence_model: str, batch_size: int) -> Dict[str, float]:
+    """
+    Load the NLP models and run synthetic inference at representative lengths.
+
+    Args:
+        spacy_model: Name of the spacy model to load
+        sentence_model: Name of the sentence transformer model to load
+        batch_size: Number of texts per warm-up embedding batch
+
+    Returns:
+        Mapping of step name to seconds taken
+
+    Raises:
+        ImportError: If NLP dependencies are not installed
+        OSError: If a model is not found
+    """
+    from skytorch.nlp import (
+        extract_named_entities,
+        generate_embedding_batch,
+        get_sentence_transformer,
+        get_spacy_model,
+        preload_models,
+    )
+
+    timings: Dict[str, float] = {}
+
+    started = time.perf_counter()
+    get_spacy_model(spacy_model, entities_only=get_settings().ner_entities_only)
+    timings["load_spacy"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    get_sentence_transformer(sentence_model)
+    timings["load_sentence_transformer"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    preload_models(get_settings().model_preload)
+    timings["load_preload"] = time.perf_counter() - started
+
+    for words in WARMUP_LENGTHS:
+        text = _synthetic_text(words)
+
+        started = time.perf_counter()
+        generate_embedding_batch([text] * batch_size, sentence_model, batch_size=batch_size)
+        timings[f"embed_{words}_words"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        extract_named_entities(text, spacy_model)
+        timings[f"ner_{words}_words"] = time.perf_counter() - started
+
+    return timings
+
+
+# Timings of this inference worker process's warm-up, set by warm_up_process_worker
+_process_warmup: Dict[str, float] = {}
+
+
+def warm_up_process_worker():
+    """
+    Process-pool initializer: load and warm the models in each new worker process.
+
+    Runs before the worker takes any task, so no request pays for a cold
+    model in a fresh process. Failures are logged rather than raised,
+    because an initializer that raises breaks the whole pool.
+    """
+    settings = get_settings()
+    if settings.skytorch_role == "graph":
+        return
+    try:
+        _process_warmup.update(warm_up_models(
+            settings.spacy_model_name,
+            settings.embedding_model_name,
+            settings.embedding_batch_size,
+        ))
+    except Exception as e:
+        logger.warning(f"Inference worker {os.getpid()} could not warm up: {e}")
+
+
+def _process_warmup_result() -> Tuple[int, Dict[str, float]]:
+    return os.getpid(), dict(_process_warmup)
+
+
+async def _warm_up_process_pool(executor, rounds: int = 120) -> Dict[str, float]:
+    """
+    Start every worker of a process pool and wait until each has warmed up.
+
+    A worker only takes tasks once its initializer has finished, so the
+    pool is warm when every worker PID has answered a probe task.
+
+    Returns:
+        Timings reported by the first worker
+
+    Raises:
+        OSError: If no worker could load the models
+    """
+    seen: Dict[int, Dict[str, float]] = {}
+    for _ in range(rounds):
+        for pid, timings in await asyncio.gather(
+            *(executor.run(_process_warmup_result) for _ in range(executor.max_workers))
+        ):
+            seen[pid] = timings
+        if len(seen) >= executor.max_workers:
+            break
+        await asyncio.sleep(1.0)
+    else:
+        logger.warning(f"Only {len(seen)} of {executor.max_workers} inference workers answered during warm-up")
+    timings = next((timings for timings in seen.values() if timings), {})
+    if not timings:
+        raise OSError("NLP models could not be loaded in the inference workers")
+    return timings
+
+
+async def _warm_up(state: WarmupState, login: bool, load_models: bool):
+    settings = get_settings()
+    if login:
+        started = time.perf_counter()
+        # Not initialize_atproto_client: it only logs failures, and these must reach the retry loop
+        client = await get_atproto_client()
+        if client:
+            await client.ensure_session()
+        state.timings["atproto_login"] = time.perf_counter() - started
+
+    if load_models:
+        executor = get_inference_executor()
+        try:
+            if executor.kind == "process":
+                timings = await _warm_up_process_pool(executor)
+            else:
+                timings = await executor.run(
+                    warm_up_models,
+                    settings.spacy_model_name,
+                    settings.embedding_model_name,
+                    settings.embedding_batch_size,
+                )
+            state.timings.update(timings)
+            state.models_available = True
+        except (OSError, ImportError) as e:
+            state.error = str(e)
+            logger.warning(f"NLP models not available, skipping warm-up: {e}")
+
+
+async def run_startup_warmup(login: bool = True, load_models: bool = True):
+    """
+    Load and warm models in the background, then mark the process ready.
+
+    Models load on the inference executor so the event loop keeps serving
+    health checks meanwhile; with a process pool, every worker process
+    warms its own copy. Missing NLP dependencies or models are logged
+    and do not block readiness, matching how the endpoints degrade to 503.
+    Without AT Protocol credentials no login is attempted. Any other
+    failure, including a failed AT Protocol login, is retried with
+    exponential backoff. After ``WARMUP_MAX_ATTEMPTS`` the state becomes
+    ``failed``, which also fails the liveness check so the instance is
+    restarted instead of staying unready.
+
+    Args:
+        login: Log in to the AT Protocol service
+        load_models: Load and warm the NLP models
+    """
+    settings = get_settings()
+    state = get_warmup_state()
+    state.status = "warming"
+    state.started_at = time.time()
+
+    attempts = max(1, settings.warmup_max_attempts)
+    for attempt in range(1, attempts + 1):
+        state.attempts = attempt
+        try:
+            await _warm_up(state, login, load_models)
+            state.status = "ready"
+            break
+        except Exception as e:
+            state.error = str(e)
+            if attempt == attempts:
+                state.status = "failed"
+                logger.exception(f"Startup warm-up failed after {attempt} attempts: {e}")
+                break
+            delay = settings.warmup_retry_backoff * 2 ** (attempt - 1)
+            logger.warning(f"Startup warm-up attempt {attempt} failed, retrying in {delay:.0f}s: {e}")
+            await asyncio.sleep(delay)
+    state.finished_at = time.time()
+
+    timings_text = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in state.timings.items())
+    logger.info(
+        f"Startup warm-up {state.status} in {state.finished_at - state.started_at:.2f}s"
+        f"{f' ({timings_text})' if timings_text else ''}"
+    )
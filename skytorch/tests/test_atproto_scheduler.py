@@ -0,0 +1,237 @@
+"""UpstreamScheduler pacing and priority lanes, and AtprotoClient request coalescing."""
+
+import asyncio
+import gc
+import time
+
+import httpx
+import pytest
+
+from skytorch.atproto_client import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    AtprotoClient,
+    SharedRateBucket,
+    UpstreamScheduler,
+)
+
+
+def _response(status_code: int = 200, **headers) -> httpx.Response:
+    return httpx.Response(status_code, headers={name.replace("_", "-"): str(value) for name, value in headers.items()})
+
+
+@pytest.mark.asyncio
+async def test_burst_is_immediate_then_paced_at_rate():
+    scheduler = UpstreamScheduler(rate=20.0, burst=3)
+
+    started = time.monotonic()
+    for _ in range(3):
+        await scheduler.acquire()
+    assert time.monotonic() - started < 0.02
+
+    for _ in range(4):
+        await scheduler.acquire()
+    # Four more tokens at 20/s take about 0.2s
+    assert 0.15 <= time.monotonic() - started < 0.4
+    assert scheduler.requests == 7
+
+
+@pytest.mark.asyncio
+async def test_interactive_lane_overtakes_queued_bulk():
+    scheduler = UpstreamScheduler(rate=50.0, burst=1)
+    await scheduler.acquire()
+    order = []
+
+    async def call(name, priority):
+        await scheduler.acquire(priority)
+        order.append(name)
+
+    bulk = [asyncio.create_task(call(f"bulk{i}", PRIORITY_BULK)) for i in range(3)]
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(call("interactive", PRIORITY_INTERACTIVE))
+    await asyncio.gather(*bulk, interactive)
+
+    assert order == ["interactive", "bulk0", "bulk1", "bulk2"]
+    assert scheduler.stats()["lanes"]["bulk"]["requests"] == 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_take_a_token():
+    scheduler = UpstreamScheduler(rate=20.0, burst=1)
+    await scheduler.acquire()
+    gave_up = asyncio.create_task(scheduler.acquire(PRIORITY_INTERACTIVE))
+    await asyncio.sleep(0)
+    gave_up.cancel()
+
+    started = time.monotonic()
+    await scheduler.acquire(PRIORITY_BULK)
+    assert time.monotonic() - started < 0.1
+    assert scheduler.stats()["lanes"]["interactive"]["queued"] == 0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_headers_retune_rate_and_cap_tokens():
+    clock = FakeClock()
+    scheduler = UpstreamScheduler(rate=10.0, burst=20, headroom=0.5, clock=clock)
+    scheduler.observe(_response(ratelimit_limit=3000, ratelimit_remaining=2, ratelimit_policy="3000;w=300"))
+
+    assert scheduler.rate == pytest.approx(5.0)
+    assert scheduler.stats()["tokens"] == pytest.approx(2.0)
+    clock.now += 0.2
+    assert scheduler.stats()["tokens"] == pytest.approx(3.0)
+    clock.now += 60
+    assert scheduler.stats()["tokens"] == pytest.approx(20.0)
+
+
+@pytest.mark.asyncio
+async def test_tokens_earned_before_a_retune_accrue_at_the_old_rate():
+    clock = FakeClock()
+    scheduler = UpstreamScheduler(rate=10.0, burst=20, headroom=1.0, clock=clock)
+    for _ in range(10):
+        await scheduler.acquire()
+    clock.now += 0.5
+
+    scheduler.observe(_response(ratelimit_limit=300, ratelimit_policy="300;w=300"))
+
+    assert scheduler.rate == pytest.approx(1.0)
+    assert scheduler.stats()["tokens"] == pytest.approx(15.0)
+
+
+@pytest.mark.asyncio
+async def test_429_pauses_every_lane():
+    scheduler = UpstreamScheduler(rate=100.0, burst=10)
+    delay = scheduler.observe(_response(429, retry_after=0))
+    assert delay == 0
+    scheduler.pause(0.2)
+
+    started = time.monotonic()
+    await scheduler.acquire()
+    assert time.monotonic() - started >= 0.15
+    assert scheduler.throttled == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_bucket_paces_processes_together():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+
+    def bucket():
+        shared = SharedRateBucket("redis://localhost", "skytorch:test:ratelimit")
+        shared._redis = fakeredis.aioredis.FakeRedis(server=server)
+        return shared
+
+    # Two processes with burst 2 each get two tokens between them, not four
+    first = UpstreamScheduler(rate=10.0, burst=2, shared=bucket())
+    second = UpstreamScheduler(rate=10.0, burst=2, shared=bucket())
+    started = time.monotonic()
+    await first.acquire()
+    await second.acquire()
+    await asyncio.gather(first.acquire(), second.acquire())
+    assert time.monotonic() - started >= 0.15
+
+    # A 429 seen by one process pauses the other
+    first.pause(0.3)
+    await asyncio.sleep(0.01)
+    started = time.monotonic()
+    await second.acquire()
+    assert time.monotonic() - started >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_shared_bucket_falls_back_when_redis_is_down():
+    shared = SharedRateBucket("redis://127.0.0.1:1", "skytorch:test:ratelimit", timeout=0.05)
+    scheduler = UpstreamScheduler(rate=100.0, burst=2, shared=shared)
+
+    await scheduler.acquire()
+    await scheduler.acquire()
+    assert shared.errors == 2
+    assert scheduler.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_identical_queries_in_flight_are_coalesced():
+    calls = []
+    release = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("com.atproto.server.createSession"):
+            return httpx.Response(200, json={"accessJwt": "a", "refreshJwt": "r", "did": "did:plc:me"})
+        calls.append(str(request.url))
+        await release.wait()
+        return httpx.Response(200, json={"did": request.url.params["actor"]})
+
+    client = AtprotoClient("me.test", "password", scheduler=UpstreamScheduler(rate=100.0, burst=10))
+    client._http = httpx.AsyncClient(base_url="https://bsky.test/xrpc/", transport=httpx.MockTransport(handler))
+
+    same = [asyncio.create_task(client.get_profile("alice.test")) for _ in range(3)]
+    other = asyncio.create_task(client.get_profile("bob.test"))
+    await asyncio.sleep(0.05)
+    release.set()
+    results = await asyncio.gather(*same, other)
+
+    assert [result["did"] for result in results] == ["alice.test"] * 3 + ["bob.test"]
+    assert len(calls) == 2
+    assert client.coalesced == 2
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_coalesced_query():
+    release = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("com.atproto.server.createSession"):
+            return httpx.Response(200, json={"accessJwt": "a", "refreshJwt": "r", "did": "did:plc:me"})
+        await release.wait()
+        return httpx.Response(200, json={"did": "did:plc:alice"})
+
+    client = AtprotoClient("me.test", "password", scheduler=UpstreamScheduler(rate=100.0, burst=10))
+    client._http = httpx.AsyncClient(base_url="https://bsky.test/xrpc/", transport=httpx.MockTransport(handler))
+
+    first = asyncio.create_task(client.get_profile("alice.test"))
+    second = asyncio.create_task(client.get_profile("alice.test"))
+    await asyncio.sleep(0.05)
+    first.cancel()
+    release.set()
+
+    assert (await second)["did"] == "did:plc:alice"
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_failed_query_nobody_awaits_is_not_reported_as_unretrieved():
+    release = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("com.atproto.server.createSession"):
+            return httpx.Response(200, json={"accessJwt": "a", "refreshJwt": "r", "did": "did:plc:me"})
+        await release.wait()
+        return httpx.Response(400, json={"error": "InvalidRequest", "message": "Profile not found"})
+
+    client = AtprotoClient("me.test", "password", scheduler=UpstreamScheduler(rate=100.0, burst=10))
+    client._http = httpx.AsyncClient(base_url="https://bsky.test/xrpc/", transport=httpx.MockTransport(handler))
+    loop = asyncio.get_running_loop()
+    unhandled = []
+    loop.set_exception_handler(lambda _, context: unhandled.append(context))
+
+    callers = [asyncio.create_task(client.get_profile("alice.test")) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    for caller in callers:
+        caller.cancel()
+    release.set()
+    await asyncio.sleep(0.05)
+    assert client._in_flight == {}
+    # asyncio reports unretrieved exceptions when the task is collected
+    del callers, caller
+    gc.collect()
+    assert unhandled == []
+    loop.set_exception_handler(None)
+    await client.aclose()
@@ -0,0 +1,78 @@
+"""Shared AT Protocol session stores: Redis and file round trips."""
+
+import base64
+import json
+import os
+import time
+
+import pytest
+
+from skytorch.atproto_session import FileSessionStore, RedisSessionStore, token_expiry
+
+
+def _jwt(expires_at: float) -> str:
+    claims = base64.urlsafe_b64encode(json.dumps({"exp": expires_at}).encode()).decode().rstrip("=")
+    return f"header.{claims}.signature"
+
+
+def _session():
+    return {
+        "did": "did:plc:skytorch",
+        "accessJwt": _jwt(time.time() + 600),
+        "refreshJwt": _jwt(time.time() + 3600),
+    }
+
+
+def test_token_expiry_reads_exp_claim():
+    assert token_expiry(_jwt(1234567890)) == 1234567890
+    assert token_expiry("not-a-jwt") is None
+    assert token_expiry(None) is None
+
+
+@pytest.mark.asyncio
+async def test_redis_store_round_trip_expires_with_refresh_token():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    store = RedisSessionStore("redis://localhost", "skytorch:test:session")
+    store._redis = fakeredis.aioredis.FakeRedis()
+    assert await store.load() is None
+
+    session = _session()
+    await store.save(session)
+
+    assert await store.load() == session
+    assert 3500 < await store._redis.ttl(store.key) <= 3600
+    async with store.lock():
+        assert await store._redis.exists(f"{store.key}:lock")
+
+
+@pytest.mark.asyncio
+async def test_file_store_round_trip_is_private(tmp_path):
+    path = tmp_path / "sessions" / "session.json"
+    store = FileSessionStore(str(path))
+    assert await store.load() is None
+
+    session = _session()
+    await store.save(session)
+
+    assert await store.load() == session
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    assert os.listdir(path.parent) == ["session.json"]
+
+
+@pytest.mark.asyncio
+async def test_file_store_ignores_corrupt_file(tmp_path):
+    path = tmp_path / "session.json"
+    path.write_text("{not json")
+
+    assert await FileSessionStore(str(path)).load() is None
+
+
+@pytest.mark.asyncio
+async def test_file_store_lock_is_released(tmp_path):
+    store = FileSessionStore(str(tmp_path / "session.json"))
+
+    async with store.lock():
+        await store.save(_session())
+    async with store.lock():
+        assert await store.load() is not None
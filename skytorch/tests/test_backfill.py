@@ -0,0 +1,133 @@
+"""Backfill: shard ranges and resuming from a checkpoint."""
+
+import pytest
+
+from skytorch import backfill, nlp
+from skytorch.backfill import Backfill, BackfillRow, Checkpoint, format_duration, shard_range
+
+
+def test_shards_cover_the_id_range_without_overlap():
+    ranges = [shard_range(10, 109, 4, shard) for shard in range(4)]
+
+    assert ranges == [(9, 34), (34, 59), (59, 84), (84, 109)]
+    owned = [set(range(after_id + 1, last_id + 1)) for after_id, last_id in ranges]
+    assert set().union(*owned) == set(range(10, 110))
+    assert sum(len(ids) for ids in owned) == 100
+
+
+def test_uneven_shards_still_cover_every_id():
+    ranges = [shard_range(1, 10, 3, shard) for shard in range(3)]
+
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == 10
+    assert all(previous[1] == current[0] for previous, current in zip(ranges, ranges[1:]))
+
+
+@pytest.mark.parametrize("shards, shard", [(4, 4), (4, -1), (0, 0)])
+def test_shard_out_of_range_is_rejected(shards, shard):
+    with pytest.raises(ValueError):
+        shard_range(1, 100, shards, shard)
+
+
+def test_format_duration():
+    assert format_duration(45) == "45s"
+    assert format_duration(270) == "4m30s"
+    assert format_duration(7500) == "2h05m"
+
+
+class FakeCursor:
+    def __init__(self, count):
+        self.count = count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchone(self):
+        return (self.count,)
+
+
+class FakeConnection:
+    def __init__(self, count):
+        self.count = count
+
+    def cursor(self):
+        return FakeCursor(self.count)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class InMemoryBackfill(Backfill):
+    """Backfill over an in-memory table of chunk versions, stopping after ``stop_after`` pages."""
+
+    def __init__(self, table, checkpoint, stop_after=None, target_version="model@v2"):
+        super().__init__(
+            "postgresql://localhost/skytorch", "all-MiniLM-L6-v2", target_version,
+            after_id=0, last_id=max(table), checkpoint=checkpoint, page_size=3,
+        )
+        self.table = table
+        self.stop_after = stop_after
+        self.pages = []
+
+    def _fetch_page(self, conn, position):
+        ids = [
+            chunk_id for chunk_id, version in sorted(self.table.items())
+            if position < chunk_id <= self.last_id and version != self.target_version
+        ]
+        return [BackfillRow(chunk_id, f"chunk {chunk_id}") for chunk_id in ids[:self.page_size]]
+
+    def _write_page(self, conn, rows, vectors):
+        assert len(vectors) == len(rows)
+        self.pages.append(sorted(row.id for row in rows))
+        for row in rows:
+            self.table[row.id] = self.target_version
+        if self.stop_after is not None and len(self.pages) >= self.stop_after:
+            self.stop()
+
+
+@pytest.fixture
+def no_database(monkeypatch):
+    pytest.importorskip("psycopg2")
+    monkeypatch.setattr(backfill.psycopg2, "connect", lambda url: FakeConnection(count=0))
+    monkeypatch.setattr(nlp, "get_sentence_transformer", lambda model_name: None)
+    monkeypatch.setattr(backfill, "embed_chunks", lambda rows, model_name, batch_size: [[0.0]] * len(rows))
+
+
+def test_stopped_run_resumes_after_the_last_committed_page(tmp_path, no_database):
+    table = {chunk_id: "model@v1" for chunk_id in range(1, 11)}
+    checkpoint = Checkpoint(tmp_path / "shard-0-of-1.json")
+
+    first = InMemoryBackfill(table, checkpoint, stop_after=2)
+    first.run()
+    assert first.pages == [[1, 2, 3], [4, 5, 6]]
+    assert checkpoint.load()["position"] == 6
+
+    # Pretend a chunk before the checkpoint went stale again: a resumed run must not go back for it
+    table[2] = "model@v1"
+    second = InMemoryBackfill(table, checkpoint)
+    second.run()
+
+    assert second.pages == [[7, 8, 9], [10]]
+    assert checkpoint.load()["position"] == 10
+    assert checkpoint.load()["rows"] == 10
+
+
+def test_checkpoint_for_another_version_is_ignored(tmp_path, no_database):
+    table = {chunk_id: "model@v1" for chunk_id in range(1, 5)}
+    checkpoint = Checkpoint(tmp_path / "shard-0-of-1.json")
+    checkpoint.save({"target_version": "model@v0", "after_id": 0, "last_id": 4, "position": 3, "rows": 3})
+
+    run = InMemoryBackfill(table, checkpoint)
+    run.run()
+
+    assert run.pages == [[1, 2, 3], [4]]
+    assert checkpoint.load()["target_version"] == "model@v2"
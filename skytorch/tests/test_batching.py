@@ -0,0 +1,83 @@
+"""MicroBatcher flushing and result routing."""
+
+import asyncio
+import time
+
+import pytest
+
+from skytorch import batching
+from skytorch.batching import FLUSH_MAX_BATCH_SIZE, FLUSH_MAX_WAIT, MicroBatcher
+
+
+class InlineExecutor:
+    async def run(self, fn, *args):
+        return fn(*args)
+
+
+class RecordingEncoder:
+    """Embeds each text as its length and records every batch."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, model_name):
+        self.calls.append((model_name, list(texts)))
+        if "boom" in texts:
+            raise RuntimeError("model failed")
+        return [[float(len(text))] for text in texts]
+
+
+@pytest.fixture
+def encoder(monkeypatch):
+    monkeypatch.setattr(batching, "get_inference_executor", lambda: InlineExecutor())
+    return RecordingEncoder()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_flushes_without_waiting(encoder):
+    batcher = MicroBatcher(encoder, max_batch_size=3, max_wait_ms=10000)
+
+    started = time.monotonic()
+    vectors = await asyncio.gather(*(batcher.submit(text, "m") for text in ("a", "bb", "ccc")))
+
+    assert time.monotonic() - started < 1.0
+    assert vectors == [[1.0], [2.0], [3.0]]
+    assert encoder.calls == [("m", ["a", "bb", "ccc"])]
+    assert batcher.stats()["flush_reasons"] == {FLUSH_MAX_BATCH_SIZE: 1, FLUSH_MAX_WAIT: 0}
+
+
+@pytest.mark.asyncio
+async def test_partial_queue_flushes_after_max_wait(encoder):
+    batcher = MicroBatcher(encoder, max_batch_size=10, max_wait_ms=30)
+
+    first = asyncio.create_task(batcher.submit("a", "m"))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(batcher.submit("bb", "m"))
+    await asyncio.sleep(0)
+    assert not first.done()
+
+    assert await asyncio.gather(first, second) == [[1.0], [2.0]]
+    assert encoder.calls == [("m", ["a", "bb"])]
+    stats = batcher.stats()
+    assert stats["flush_reasons"] == {FLUSH_MAX_BATCH_SIZE: 0, FLUSH_MAX_WAIT: 1}
+    assert stats["average_batch_size"] == 2.0 and stats["queued"] == {}
+
+
+@pytest.mark.asyncio
+async def test_models_are_batched_separately(encoder):
+    batcher = MicroBatcher(encoder, max_batch_size=2, max_wait_ms=10)
+
+    await asyncio.gather(batcher.submit("a", "m1"), batcher.submit("b", "m2"), batcher.submit("c", "m1"))
+
+    assert sorted(encoder.calls) == [("m1", ["a", "c"]), ("m2", ["b"])]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_fails_every_caller_in_it(encoder):
+    batcher = MicroBatcher(encoder, max_batch_size=2, max_wait_ms=10)
+
+    results = await asyncio.gather(batcher.submit("boom", "m"), batcher.submit("ok", "m"), return_exceptions=True)
+
+    assert [str(result) for result in results] == ["model failed", "model failed"]
+    with pytest.raises(ValueError):
+        await batcher.submit("  ", "m")
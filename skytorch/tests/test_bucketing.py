@@ -0,0 +1,50 @@
+"""Token-length bucketing and the padding it reports."""
+
+import numpy as np
+
+from skytorch.bucketing import BucketingStats, encode_bucketed, encode_order_batches, plan_batches
+
+
+class FakeTokenizerModel:
+    """Tokenizes to one token per word, right-padded like SentenceTransformer.tokenize."""
+
+    def tokenize(self, texts):
+        width = max(len(text.split()) for text in texts)
+        mask = np.array([[1] * len(text.split()) + [0] * (width - len(text.split())) for text in texts])
+        return {"input_ids": mask * 7, "attention_mask": mask}
+
+
+def _forward(model, features):
+    # One vector per row: [real tokens, padded width]
+    mask = features["attention_mask"]
+    return np.stack([mask.sum(1), np.full(len(mask), mask.shape[1])], axis=1).astype(np.float32)
+
+
+def test_encode_order_batches_sort_longest_first():
+    assert encode_order_batches([3, 9, 1, 5], 2) == [[1, 3], [0, 2]]
+
+
+def test_saved_padding_is_measured_against_encode_batches():
+    lengths = [4, 10, 5, 9]
+    stats = BucketingStats()
+    stats.record(lengths, plan_batches(lengths, 2, (100,)), 2, (100,), [length * 6 for length in lengths])
+
+    result = stats.stats()
+    # Request order would pad to 38 slots, but encode's own sort already gets 30
+    assert result["padded_tokens"] == 30
+    assert result["padded_tokens_saved"] == 0
+    assert result["unbucketed_padding_ratio"] == result["padding_ratio"]
+
+
+def test_encode_bucketed_pads_each_batch_to_its_own_longest_text():
+    texts = ["a " * 30, "b", "c " * 3, "d " * 20]
+    stats = BucketingStats()
+
+    vectors = encode_bucketed(FakeTokenizerModel(), texts, _forward, batch_size=2, boundaries=(4, 32), normalize=False, stats=stats)
+
+    assert vectors[:, 0].tolist() == [30, 1, 3, 20]
+    assert vectors[:, 1].tolist() == [30, 3, 3, 30]
+    assert stats.stats()["buckets"] == {
+        "<=4": {"batches": 1, "texts": 2, "tokens": 4},
+        "<=32": {"batches": 1, "texts": 2, "tokens": 50},
+    }
@@ -0,0 +1,92 @@
+"""Embed worker: bisecting failed batches and acknowledging what was written."""
+
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+fakeredis = pytest.importorskip("fakeredis")
+
+from skytorch.embed_worker import EmbedWorker, parse_article_ids  # noqa: E402
+
+BAD_ARTICLE = 5
+
+
+class FakeEmbedWorker(EmbedWorker):
+    """Embeds every article except BAD_ARTICLE, without Postgres or a model."""
+
+    def __init__(self):
+        super().__init__("redis://localhost", "postgresql://localhost/skytorch", read_count=16)
+        self.redis = fakeredis.FakeRedis(decode_responses=True)
+        self.attempts = []
+        self.written = []
+        self.postgres_down = False
+
+    def _embed_articles(self, article_ids, model_version):
+        self.attempts.append(list(article_ids))
+        if self.postgres_down:
+            raise psycopg2.OperationalError("could not connect to server")
+        if BAD_ARTICLE in article_ids:
+            raise ValueError("text too long")
+        self.written.extend(article_ids)
+        return 2 * len(article_ids)
+
+
+@pytest.fixture
+def worker():
+    worker = FakeEmbedWorker()
+    worker.ensure_group()
+    return worker
+
+
+def _deliver(worker, values):
+    for value in values:
+        worker.redis.xadd(worker.stream, {"article_id": str(value)})
+    return worker.read()
+
+
+def _pending(worker):
+    return worker.redis.xpending(worker.stream, worker.group)["pending"]
+
+
+def test_failing_batch_is_bisected_and_only_the_bad_article_dead_lettered(worker):
+    messages = _deliver(worker, range(1, 9))
+
+    worker.process(messages)
+
+    assert sorted(worker.written) == [1, 2, 3, 4, 6, 7, 8]
+    assert worker.attempts[:3] == [[1, 2, 3, 4, 5, 6, 7, 8], [1, 2, 3, 4], [5, 6, 7, 8]]
+    dead = worker.redis.xrange(worker.dead_stream)
+    assert [fields["article_id"] for _, fields in dead] == [str(BAD_ARTICLE)]
+    assert dead[0][1]["error"] == "ValueError: text too long"
+    assert _pending(worker) == 0
+    assert worker.stats()["articles"] == 7
+    assert worker.stats()["chunks"] == 14
+    assert worker.dead_lettered == 1
+
+
+def test_postgres_outage_leaves_messages_unacknowledged(worker):
+    messages = _deliver(worker, range(1, 5))
+    worker.postgres_down = True
+
+    worker.process(messages)
+
+    assert worker.attempts == [[1, 2, 3, 4]]
+    assert _pending(worker) == 4
+    assert worker.redis.xlen(worker.dead_stream) == 0
+    assert worker.batches == 0
+
+
+def test_invalid_messages_are_dead_lettered(worker):
+    worker.redis.xadd(worker.stream, {"article_id": "not-a-number"})
+    messages = _deliver(worker, [3, 3])
+
+    worker.process(messages)
+
+    assert worker.attempts == [[3]]
+    assert worker.redis.xlen(worker.dead_stream) == 1
+    assert _pending(worker) == 0
+
+
+def test_parse_article_ids_keeps_order_and_drops_duplicates():
+    messages = [("1-0", {"article_id": "7"}), ("2-0", {"article_id": "3"}), ("3-0", {"article_id": "7"}), ("4-0", {})]
+
+    assert parse_article_ids(messages) == ([7, 3], ["4-0"])
@@ -0,0 +1,85 @@
+"""Embedding cache hits, keys and how embed_texts uses them."""
+
+import numpy as np
+import pytest
+
+from skytorch import embeddings
+from skytorch.config import get_settings
+from skytorch.embedding_cache import EmbeddingCache
+
+
+class InlineExecutor:
+    async def run(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+class FakeModel:
+    """Embeds each text as [length, 1] and records which texts it saw."""
+
+    def __init__(self):
+        self.seen = []
+
+    def __call__(self, texts, model_name, batch_size=None, as_numpy=False):
+        self.seen.extend(texts)
+        return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = FakeModel()
+    cache = EmbeddingCache(redis_url=None)
+    monkeypatch.setattr(embeddings, "get_embedding_cache", lambda: cache)
+    monkeypatch.setattr(embeddings, "get_inference_executor", lambda: InlineExecutor())
+    monkeypatch.setattr(embeddings, "generate_embedding_batch", model)
+    model.cache = cache
+    return model
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_skip_the_model(model):
+    vectors, hits = await embeddings.embed_texts(["hello world", "abc"], "all-MiniLM-L6-v2")
+    assert hits == 0
+    assert model.seen == ["hello world", "abc"]
+
+    # Same text after whitespace normalization, plus one new text
+    again, hits = await embeddings.embed_texts(["  hello \n world ", "new text", "abc"], "all-MiniLM-L6-v2")
+
+    assert hits == 2
+    assert model.seen == ["hello world", "abc", "new text"]
+    assert again.tolist() == [[11.0, 1.0], [8.0, 1.0], [3.0, 1.0]]
+    assert model.cache.stats()["local_hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_bypass_cache_always_runs_the_model(model):
+    await embeddings.embed_texts(["abc"], "all-MiniLM-L6-v2")
+    _, hits = await embeddings.embed_texts(["abc"], "all-MiniLM-L6-v2", bypass_cache=True)
+
+    assert hits == 0
+    assert model.seen == ["abc", "abc"]
+
+
+@pytest.mark.asyncio
+async def test_float16_storage_round_trips():
+    cache = EmbeddingCache(redis_url=None, dtype="float16")
+    await cache.set_many(["abc"], "all-MiniLM-L6-v2", [[0.5, -0.25]])
+
+    (vector,) = await cache.get_many(["abc"], "all-MiniLM-L6-v2")
+
+    assert vector.dtype == np.float32
+    assert vector.tolist() == [0.5, -0.25]
+
+
+def test_key_includes_the_model_version(monkeypatch):
+    cache = EmbeddingCache(redis_url=None)
+    settings = get_settings()
+    model_name = settings.embedding_model_name
+
+    unpinned = cache.key("hello", model_name)
+    monkeypatch.setattr(settings, "embedding_model_revision", "abc123")
+    pinned = cache.key("hello", model_name)
+
+    assert unpinned.startswith(f"skytorch:embedding:{model_name}:")
+    assert pinned.startswith(f"skytorch:embedding:{model_name}@abc123:")
+    assert unpinned.rsplit(":", 1)[1] == pinned.rsplit(":", 1)[1]
+    assert cache.key("hello", "other-model") != unpinned
@@ -0,0 +1,72 @@
+"""Embedding response encodings: packed vectors survive a render/decode round trip."""
+
+import base64
+import json
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from skytorch.encoding import (
+    FORMAT_BASE64,
+    FORMAT_JSON,
+    FORMAT_MSGPACK,
+    encode_vector,
+    encoding_metadata,
+    negotiate_format,
+    render,
+)
+
+msgpack = pytest.importorskip("msgpack")
+
+VECTORS = [np.array([0.25, -1.5, 3.0], dtype=np.float32), None]
+
+
+def _payload(fmt, dtype="float32"):
+    return {
+        "embeddings": [encode_vector(vector, fmt, dtype) for vector in VECTORS],
+        **encoding_metadata(fmt, dtype, 3),
+    }
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_msgpack_round_trip(dtype):
+    response = render(_payload(FORMAT_MSGPACK, dtype), FORMAT_MSGPACK)
+
+    assert response.media_type == "application/msgpack"
+    body = msgpack.unpackb(response.body, raw=False)
+    assert body["encoding"] == "bytes"
+    assert body["dtype"] == dtype
+    decoded = np.frombuffer(body["embeddings"][0], dtype="<f4" if dtype == "float32" else "<f2")
+    np.testing.assert_array_equal(decoded, VECTORS[0])
+    assert body["embeddings"][1] is None
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_base64_round_trip(dtype):
+    response = render(_payload(FORMAT_BASE64, dtype), FORMAT_BASE64)
+
+    body = json.loads(response.body)
+    assert body["encoding"] == "bytes"
+    assert body["byte_order"] == "little"
+    packed = base64.b64decode(body["embeddings"][0])
+    decoded = np.frombuffer(packed, dtype="<f4" if dtype == "float32" else "<f2")
+    np.testing.assert_array_equal(decoded, VECTORS[0])
+    assert body["embeddings"][1] is None
+
+
+def test_json_keeps_float_arrays():
+    response = render(_payload(FORMAT_JSON), FORMAT_JSON)
+
+    body = json.loads(response.body)
+    assert body["encoding"] == "array"
+    assert body["embeddings"] == [[0.25, -1.5, 3.0], None]
+
+
+def test_negotiate_format():
+    assert negotiate_format(None, "application/x-msgpack") == FORMAT_MSGPACK
+    assert negotiate_format("BASE64", "application/msgpack") == FORMAT_BASE64
+    assert negotiate_format(None, None) == FORMAT_JSON
+    with pytest.raises(HTTPException) as excinfo:
+        negotiate_format("xml", None)
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,98 @@
+"""InferenceExecutor backpressure and slot accounting."""
+
+import asyncio
+import threading
+
+import pytest
+
+from skytorch.executor import InferenceExecutor, InferenceQueueFull
+
+
+@pytest.fixture
+def executor():
+    executor = InferenceExecutor(kind="thread", max_workers=1, max_queue=1, retry_after=3)
+    yield executor
+    executor.shutdown(wait=False)
+
+
+@pytest.fixture
+def release():
+    """Blocks work in the pool until set; always set afterwards so no worker thread hangs."""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+async def _until(condition, timeout: float = 2.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+@pytest.mark.asyncio
+async def test_full_executor_rejects_new_work(executor, release):
+    running = asyncio.create_task(executor.run(release.wait))
+    queued = asyncio.create_task(executor.run(lambda: "queued"))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(InferenceQueueFull) as rejected:
+        await executor.run(lambda: "rejected")
+
+    assert rejected.value.retry_after == 3
+    assert rejected.value.depth == 1
+    assert executor.stats()["rejected"] == 1
+    release.set()
+    assert await running is True
+    assert await queued == "queued"
+    assert executor.stats()["completed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_holds_its_slot_until_the_work_finishes(executor, release):
+    running = asyncio.create_task(executor.run(release.wait))
+    await asyncio.sleep(0.01)
+    running.cancel()
+    await asyncio.sleep(0.01)
+
+    # The work already started in the pool, so the caller giving up frees nothing
+    assert executor.stats()["running"] == 1
+    queued = asyncio.create_task(executor.run(lambda: "queued"))
+    await asyncio.sleep(0.01)
+    with pytest.raises(InferenceQueueFull):
+        await executor.run(lambda: "too soon")
+
+    release.set()
+    assert await queued == "queued"
+    await _until(lambda: executor.stats()["running"] == 0)
+    assert await executor.run(lambda: "after") == "after"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_queued_work_releases_its_slot_at_once(executor, release):
+    running = asyncio.create_task(executor.run(release.wait))
+    queued = asyncio.create_task(executor.run(lambda: "never"))
+    await asyncio.sleep(0.01)
+    queued.cancel()
+    await asyncio.sleep(0.01)
+
+    assert executor.stats()["queue_depth"] == 0
+    replacement = asyncio.create_task(executor.run(lambda: "replacement"))
+    await asyncio.sleep(0.01)
+    release.set()
+    assert await replacement == "replacement"
+    assert await running is True
+
+
+@pytest.mark.asyncio
+async def test_failed_work_releases_its_slot(executor):
+    def fail():
+        raise RuntimeError("inference failed")
+
+    with pytest.raises(RuntimeError):
+        await executor.run(fail)
+
+    assert executor.stats()["failed"] == 1
+    await _until(lambda: executor.stats()["running"] == 0)
+    assert await executor.run(lambda: "next") == "next"
@@ -0,0 +1,77 @@
+"""resolve_handles: positive and negative caching of handle resolution."""
+
+import types
+
+import httpx
+import pytest
+
+from skytorch import handles
+from skytorch.atproto_client import AtprotoError
+from skytorch.handles import resolve_handles
+from skytorch.ttl_cache import TieredCache
+
+
+class FakeClient:
+    """resolveHandle that knows a fixed set of handles."""
+
+    def __init__(self, dids, down=()):
+        self.dids = dids
+        self.down = set(down)
+        self.calls = []
+
+    async def resolve_handle(self, handle):
+        self.calls.append(handle)
+        if handle in self.down:
+            raise httpx.ConnectError("upstream unavailable")
+        if handle not in self.dids:
+            raise AtprotoError(400, "InvalidRequest", "Unable to resolve handle")
+        return {"did": self.dids[handle]}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = TieredCache("handle", redis_url=None)
+    monkeypatch.setattr(handles, "get_handle_cache", lambda: cache)
+    monkeypatch.setattr(handles, "get_settings", lambda: types.SimpleNamespace(handle_cache_negative_ttl=60))
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_resolved_and_unknown_handles_are_cached(cache):
+    client = FakeClient({"alice.bsky.social": "did:plc:alice"})
+
+    dids, errors, cache_hits = await resolve_handles(client, ["@Alice.bsky.social", "nobody.bsky.social"])
+    assert dids == ["did:plc:alice", None]
+    assert errors == {}
+    assert cache_hits == 0
+
+    dids, errors, cache_hits = await resolve_handles(client, ["alice.bsky.social", "nobody.bsky.social"])
+    assert dids == ["did:plc:alice", None]
+    assert cache_hits == 2
+    assert client.calls == ["alice.bsky.social", "nobody.bsky.social"]
+
+
+@pytest.mark.asyncio
+async def test_upstream_failures_are_reported_and_not_cached(cache):
+    client = FakeClient({"alice.bsky.social": "did:plc:alice"}, down=["alice.bsky.social"])
+
+    dids, errors, _ = await resolve_handles(client, ["alice.bsky.social"])
+    assert dids == [None]
+    assert isinstance(errors["alice.bsky.social"], httpx.ConnectError)
+
+    client.down.clear()
+    dids, errors, cache_hits = await resolve_handles(client, ["alice.bsky.social"])
+    assert dids == ["did:plc:alice"]
+    assert errors == {}
+    assert cache_hits == 0
+
+
+@pytest.mark.asyncio
+async def test_bypass_cache_resolves_again(cache):
+    client = FakeClient({"alice.bsky.social": "did:plc:alice"})
+    await resolve_handles(client, ["alice.bsky.social"])
+
+    _, _, cache_hits = await resolve_handles(client, ["alice.bsky.social"], bypass_cache=True)
+
+    assert cache_hits == 0
+    assert client.calls == ["alice.bsky.social", "alice.bsky.social"]
@@ -0,0 +1,90 @@
+"""ModelRegistry LRU eviction under a memory budget and single-flight loads."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from skytorch.model_registry import ModelKey, ModelRegistry
+
+
+class FakeTensor:
+    def __init__(self, size_bytes: int):
+        self.size_bytes = size_bytes
+
+    def numel(self) -> int:
+        return self.size_bytes
+
+    def element_size(self) -> int:
+        return 1
+
+
+class FakeModel:
+    """Looks like a torch module whose parameters take ``size_bytes``."""
+
+    def __init__(self, name: str, size_bytes: int):
+        self.name = name
+        self._parameters = [FakeTensor(size_bytes)]
+
+    def parameters(self):
+        return iter(self._parameters)
+
+
+def _key(name: str) -> ModelKey:
+    return ModelKey("sentence_transformer", name)
+
+
+def _load(registry: ModelRegistry, name: str, size_bytes: int = 100) -> FakeModel:
+    return registry.get(_key(name), lambda: FakeModel(name, size_bytes))
+
+
+def _loaded(registry: ModelRegistry) -> list:
+    return [model["name"] for model in registry.stats()["models"]]
+
+
+def test_least_recently_used_model_is_evicted_over_budget():
+    registry = ModelRegistry(memory_budget_bytes=250)
+    _load(registry, "a")
+    _load(registry, "b")
+    _load(registry, "a")
+
+    _load(registry, "c")
+
+    assert _loaded(registry) == ["a", "c"]
+    assert registry.evictions == 1
+    assert registry.total_bytes() == 200
+
+
+def test_cached_models_are_returned_without_loading_again():
+    registry = ModelRegistry(memory_budget_bytes=0)
+    first = _load(registry, "a")
+
+    assert _load(registry, "a") is first
+    assert registry.loads == 1
+    assert registry.stats()["models"][0]["uses"] == 2
+
+
+def test_model_over_budget_still_loads_and_evicts_the_rest():
+    registry = ModelRegistry(memory_budget_bytes=250)
+    _load(registry, "a")
+    _load(registry, "b")
+
+    big = _load(registry, "big", size_bytes=1000)
+
+    assert big.name == "big"
+    assert _loaded(registry) == ["big"]
+    assert registry.evictions == 2
+
+
+def test_concurrent_first_requests_share_one_load():
+    registry = ModelRegistry()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return FakeModel("a", 100)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        models = list(pool.map(lambda _: registry.get(_key("a"), loader), range(4)))
+
+    assert len(calls) == 1
+    assert all(model is models[0] for model in models)
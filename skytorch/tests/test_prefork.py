@@ -0,0 +1,82 @@
+"""Pre-fork server: which models the parent may share, and worker supervision."""
+
+import os
+
+import pytest
+
+from skytorch import prefork
+from skytorch.config import get_settings
+from skytorch.nlp import is_fork_shareable
+from skytorch.prefork import PreforkServer
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "model_device", "cpu")
+    monkeypatch.setattr(settings, "embedding_backend", "torch")
+    monkeypatch.setattr(settings, "embedding_backends", "")
+    return settings
+
+
+def test_cpu_torch_models_are_fork_shareable(settings, monkeypatch):
+    assert is_fork_shareable("spacy", "en_core_web_sm")
+    assert is_fork_shareable("sentence_transformer", "all-MiniLM-L6-v2")
+
+    monkeypatch.setattr(settings, "embedding_backend", "torch_int8")
+    assert is_fork_shareable("sentence_transformer", "all-MiniLM-L6-v2")
+
+
+def test_onnx_and_cuda_models_are_left_to_workers(settings, monkeypatch):
+    monkeypatch.setattr(settings, "embedding_backends", "all-MiniLM-L6-v2=onnx_int8")
+    assert not is_fork_shareable("sentence_transformer", "all-MiniLM-L6-v2")
+    assert is_fork_shareable("sentence_transformer", "other-model")
+
+    monkeypatch.setattr(settings, "embedding_backends", "")
+    monkeypatch.setattr(settings, "model_device", "cuda")
+    assert not is_fork_shareable("sentence_transformer", "all-MiniLM-L6-v2")
+    assert is_fork_shareable("spacy", "en_core_web_sm")
+
+
+class ExitingServer(PreforkServer):
+    """Forks workers that exit at once with the given status."""
+
+    def __init__(self, status: int):
+        super().__init__(workers=1)
+        self.status = status
+
+    def _run_worker(self, index: int) -> int:
+        return self.status
+
+
+def _wait_for_exit(server: PreforkServer):
+    for pid in list(server._children):
+        os.waitid(os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+
+
+def test_exited_worker_is_replaced_with_the_same_index(monkeypatch):
+    monkeypatch.setattr(prefork.time, "sleep", lambda seconds: None)
+    server = ExitingServer(status=3)
+    server._spawn(0)
+    first_pid = next(iter(server._children))
+    _wait_for_exit(server)
+
+    server._reap()
+
+    assert list(server._children.values()) == [0]
+    assert first_pid not in server._children
+    server._should_exit = True
+    _wait_for_exit(server)
+    server._reap()
+    assert server._children == {}
+
+
+def test_workers_are_not_replaced_while_shutting_down():
+    server = ExitingServer(status=0)
+    server._spawn(0)
+    server._handle_exit(None, None)
+    _wait_for_exit(server)
+
+    server._reap()
+
+    assert server._children == {}
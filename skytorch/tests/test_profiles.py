@@ -0,0 +1,67 @@
+"""fetch_profiles: chunked getProfiles calls with per-chunk failure isolation."""
+
+import httpx
+import pytest
+
+from skytorch import profiles
+from skytorch.profiles import PROFILES_PER_CALL, fetch_profiles
+
+
+class FakeClient:
+    """Answers getProfiles for every actor, except chunks naming a failing actor."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    async def get_profiles(self, actors):
+        self.calls.append(list(actors))
+        if self.failing & set(actors):
+            raise httpx.ConnectError("upstream unavailable")
+        return {"profiles": [{"did": f"did:plc:{actor}", "handle": actor} for actor in actors]}
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.setattr(profiles, "get_profile_cache", lambda: None)
+
+
+def _actors(count):
+    return [f"user{i}.bsky.social" for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_failed_chunk_leaves_other_chunks_intact():
+    actors = _actors(PROFILES_PER_CALL + 5)
+    bad = actors[-1]
+    client = FakeClient(failing=[bad])
+
+    results, errors, cache_hits = await fetch_profiles(client, actors)
+
+    assert len(client.calls) == 2
+    assert [profile["handle"] for profile in results[:PROFILES_PER_CALL]] == actors[:PROFILES_PER_CALL]
+    assert results[PROFILES_PER_CALL:] == [None] * 5
+    assert set(errors) == set(actors[PROFILES_PER_CALL:])
+    assert errors[bad] == "upstream unavailable"
+    assert cache_hits == 0
+
+
+@pytest.mark.asyncio
+async def test_every_chunk_failing_raises():
+    actors = _actors(PROFILES_PER_CALL + 1)
+    client = FakeClient(failing=[actors[0], actors[-1]])
+
+    with pytest.raises(httpx.ConnectError):
+        await fetch_profiles(client, actors)
+
+
+@pytest.mark.asyncio
+async def test_duplicates_are_fetched_once_and_returned_in_input_order():
+    client = FakeClient()
+    actors = ["b.bsky.social", "a.bsky.social", "b.bsky.social"]
+
+    results, errors, _ = await fetch_profiles(client, actors)
+
+    assert client.calls == [["b.bsky.social", "a.bsky.social"]]
+    assert [profile["handle"] for profile in results] == actors
+    assert errors == {}
@@ -0,0 +1,90 @@
+"""NDJSON bulk embedding: output order, echoed ids and the final summary."""
+
+import json
+
+import numpy as np
+import pytest
+
+from skytorch import streaming
+
+
+async def _lines(*records, fail_after=None):
+    for number, record in enumerate(records, 1):
+        if fail_after is not None and number > fail_after:
+            raise OSError("client disconnected")
+        yield (record if isinstance(record, str) else json.dumps(record)).encode()
+
+
+async def _collect(lines, **options) -> list:
+    output = []
+    async for line in streaming.stream_embeddings(lines, "all-MiniLM-L6-v2", "json", batch_size=2, **options):
+        output.append(json.loads(line))
+    return output
+
+
+@pytest.fixture
+def embed(monkeypatch):
+    calls = []
+
+    async def embed_texts(texts, model_name, batch_size, bypass_cache):
+        calls.append(list(texts))
+        if embed.error is not None:
+            raise embed.error
+        return np.array([[float(len(text)), 0.0] for text in texts], dtype=np.float32), None
+
+    embed.error = None
+    embed.calls = calls
+    monkeypatch.setattr(streaming, "embed_texts", embed_texts)
+    return embed
+
+
+@pytest.mark.asyncio
+async def test_results_keep_input_order_and_echo_ids_unchanged(embed):
+    output = await _collect(_lines(
+        {"id": 1, "text": "one"},
+        {"id": "b", "text": ""},
+        "not json",
+        {"id": [3], "text": "three!"},
+        {"text": "no id"},
+    ))
+
+    records, summary = output[:-1], output[-1]
+    assert [record["id"] for record in records] == [1, "b", None, [3], None]
+    assert records[0]["embedding"] == [3.0, 0.0]
+    assert records[1]["error"] == "Text cannot be empty"
+    assert records[2]["error"] == "Line 3: invalid JSON"
+    assert records[3]["embedding"] == [6.0, 0.0]
+    assert summary["summary"]["records"] == 5
+    assert summary["summary"]["embedded"] == 3 and summary["summary"]["errors"] == 2
+    assert "error" not in summary
+
+
+@pytest.mark.asyncio
+async def test_value_error_fails_only_that_batch(embed):
+    embed.error = ValueError("text too long")
+
+    output = await _collect(_lines({"id": 1, "text": "a"}, {"id": 2, "text": "b"}))
+
+    assert [record.get("error") for record in output[:-1]] == ["text too long", "text too long"]
+    assert output[-1]["summary"]["errors"] == 2 and "error" not in output[-1]
+
+
+@pytest.mark.asyncio
+async def test_unexpected_inference_error_still_ends_with_a_summary(embed):
+    embed.error = TypeError("backend exploded")
+
+    output = await _collect(_lines(*({"id": number, "text": "x"} for number in range(5))))
+
+    assert output == [output[-1]]
+    assert output[-1]["error"] == "backend exploded"
+    assert output[-1]["summary"]["records"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failure_reading_the_request_ends_with_a_summary(embed):
+    output = await _collect(_lines(*({"id": number, "text": "x"} for number in range(5)), fail_after=3))
+
+    # The third record's batch was still filling when the read failed
+    assert [record["id"] for record in output[:-1]] == [0, 1]
+    assert output[-1]["error"] == "client disconnected"
+    assert output[-1]["summary"]["embedded"] == 2
@@ -0,0 +1,313 @@
+"""VectorIndex tombstones and snapshots, and keeping it in step with article_chunks."""
+
+import types
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from skytorch import vector_index
+from skytorch.vector_index import VectorIndex
+
+T0 = datetime(2024, 5, 1, 12, 0, 0)
+
+
+def _vectors(count: int, dim: int = 8, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+
+
+def _index(count: int = 20, dtype: str = "float32") -> VectorIndex:
+    index = VectorIndex(dtype=dtype)
+    index.reset("v1")
+    ids = np.arange(1, count + 1)
+    index.add(ids, ids // 4, ids % 4, _vectors(count))
+    return index
+
+
+class FakeCursor:
+    """Answers vector_index's queries from an in-memory article_chunks table."""
+
+    def __init__(self, table: "FakeChunks"):
+        self.table = table
+        self.result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=()):
+        rows = sorted(self.table.rows.values(), key=lambda row: row["id"])
+        if sql == vector_index.WATERMARK_SQL:
+            self.result = [(max((row["updated_at"] for row in rows), default=None),)]
+        elif sql == vector_index.LOAD_SQL:
+            after, version, limit = params
+            self.result = [
+                (row["id"], row["article_id"], row["chunk_index"], row["vector"])
+                for row in rows if row["id"] > after and row["version"] == version
+            ][:limit]
+        elif sql == vector_index.CHANGES_SQL:
+            version, stamp, shift, last_id, limit = params
+            since = datetime.min if stamp == "-infinity" else datetime.fromisoformat(stamp) - timedelta(seconds=shift)
+            changed = sorted(
+                (row for row in rows if (row["updated_at"], row["id"]) > (since, last_id)),
+                key=lambda row: (row["updated_at"], row["id"]),
+            )
+            self.result = [
+                (row["id"], row["article_id"], row["chunk_index"],
+                 row["vector"] if row["version"] == version else None, row["updated_at"])
+                for row in changed
+            ][:limit]
+        elif sql == vector_index.IDS_SQL:
+            after, version, limit = params
+            self.result = [(row["id"],) for row in rows if row["id"] > after and row["version"] == version][:limit]
+        elif sql == vector_index.ROWS_BY_ID_SQL:
+            ids, version = params
+            self.result = [
+                (row["id"], row["article_id"], row["chunk_index"], row["vector"])
+                for row in rows if row["id"] in ids and row["version"] == version
+            ]
+        else:
+            raise AssertionError(f"Unexpected query: {sql}")
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+
+class FakeChunks:
+    """A psycopg2-like connection over ``{id: row}``."""
+
+    def __init__(self):
+        self.rows = {}
+
+    def put(self, chunk_id: int, updated_at: datetime, version: str = "v1", vector=None):
+        self.rows[chunk_id] = {
+            "id": chunk_id,
+            "article_id": chunk_id // 4,
+            "chunk_index": chunk_id % 4,
+            "vector": list(_vectors(1, seed=chunk_id)[0] if vector is None else vector),
+            "version": version,
+            "updated_at": updated_at,
+        }
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def chunks():
+    table = FakeChunks()
+    for chunk_id in range(1, 11):
+        table.put(chunk_id, T0)
+    return table
+
+
+def test_replacing_a_snapshot_row_tombstones_it_and_moves_it_to_the_tail(tmp_path):
+    index = _index()
+    index.save(str(tmp_path))
+    loaded = VectorIndex(dtype="float32")
+    assert loaded.load(str(tmp_path), mmap=True)
+
+    query = _vectors(1, seed=99)[0]
+    loaded.add([5], [1], [1], [query])
+
+    stats = loaded.stats()
+    assert stats["base_rows"] == 20
+    assert stats["tail_rows"] == 1
+    assert stats["deleted_rows"] == 1
+    assert len(loaded) == 20
+    hits, _ = loaded.search(query, 3)
+    assert hits[0].chunk_id == 5
+    assert [hit.chunk_id for hit in hits].count(5) == 1
+
+
+def test_replacing_a_tail_row_overwrites_it_in_place():
+    index = _index()
+    query = _vectors(1, seed=99)[0]
+    index.add([5], [1], [1], [query])
+
+    stats = index.stats()
+    assert stats["tail_rows"] == 20
+    assert stats["deleted_rows"] == 0
+    hits, _ = index.search(query, 1)
+    assert hits[0].chunk_id == 5
+
+
+def test_removed_and_tombstoned_rows_are_dropped_from_snapshots(tmp_path):
+    index = _index()
+    index.save(str(tmp_path))
+    loaded = VectorIndex(dtype="float32")
+    loaded.load(str(tmp_path))
+    loaded.add([3], [0], [3], _vectors(1, seed=7))
+    assert loaded.remove([4, 999]) == 1
+
+    loaded.save(str(tmp_path))
+    compacted = VectorIndex(dtype="float32")
+    assert compacted.load(str(tmp_path))
+    stats = compacted.stats()
+    assert stats["chunks"] == stats["rows"] == stats["base_rows"] == 19
+    assert 4 not in compacted.chunk_ids()
+    hits, _ = compacted.search(_vectors(1, seed=7)[0], 1)
+    assert hits[0].chunk_id == 3
+
+
+def test_load_ignores_a_snapshot_of_another_version(tmp_path):
+    _index().save(str(tmp_path))
+
+    other = VectorIndex(dtype="float32")
+    assert not other.load(str(tmp_path), model_version="v2")
+    assert not other.loaded
+    assert other.load(str(tmp_path), model_version="v1")
+
+
+def test_refresh_applies_changes_and_advances_the_watermark(chunks):
+    index = VectorIndex(dtype="float32")
+    assert vector_index.load_from_postgres(index, chunks, "v1", page_size=3) == 10
+    assert index.watermark == (T0.isoformat(), 10)
+
+    t1 = T0 + timedelta(minutes=1)
+    chunks.put(11, t1)
+    chunks.put(4, t1, version="v2")
+    assert vector_index.refresh_from_postgres(index, chunks, page_size=2) == 2
+
+    assert index.watermark == (t1.isoformat(), 11)
+    assert 11 in index.chunk_ids()
+    assert 4 not in index.chunk_ids()
+    assert vector_index.refresh_from_postgres(index, chunks, page_size=2) == 0
+
+
+def test_refresh_overlap_picks_up_rows_that_commit_late(chunks):
+    index = VectorIndex(dtype="float32")
+    vector_index.load_from_postgres(index, chunks, "v1")
+    t2 = T0 + timedelta(minutes=2)
+    chunks.put(12, t2)
+    vector_index.refresh_from_postgres(index, chunks, overlap=60)
+
+    # Stamped before the watermark by a transaction that committed after it was read
+    chunks.put(11, t2 - timedelta(seconds=30))
+    without_overlap = VectorIndex(dtype="float32")
+    without_overlap.replace_with(index)
+    assert vector_index.refresh_from_postgres(without_overlap, chunks) == 0
+    assert vector_index.refresh_from_postgres(index, chunks, overlap=60) == 1
+
+    assert 11 in index.chunk_ids()
+    assert index.watermark == (t2.isoformat(), 12)
+
+
+def test_refresh_overlap_does_not_reapply_rows_it_has_seen(chunks, tmp_path):
+    index = VectorIndex(dtype="float32")
+    vector_index.load_from_postgres(index, chunks, "v1")
+    index.save(str(tmp_path))
+    loaded = VectorIndex(dtype="float32")
+    loaded.load(str(tmp_path))
+
+    # A loaded snapshot has not seen the rows in its window yet, so it applies them once
+    assert vector_index.refresh_from_postgres(loaded, chunks, overlap=60) == 10
+    assert vector_index.refresh_from_postgres(loaded, chunks, overlap=60) == 0
+
+    t1 = T0 + timedelta(seconds=10)
+    chunks.put(3, t1, vector=_vectors(1, seed=50)[0])
+    assert vector_index.refresh_from_postgres(loaded, chunks, overlap=60) == 1
+    assert vector_index.refresh_from_postgres(loaded, chunks, overlap=60) == 0
+    assert loaded.stats()["tail_rows"] == 10
+
+    # Entries older than the overlap window are forgotten
+    chunks.put(4, t1 + timedelta(minutes=5))
+    vector_index.refresh_from_postgres(loaded, chunks, overlap=60)
+    assert set(loaded.recent_changes) == {4}
+
+
+def test_reconcile_removes_deleted_chunks_and_restores_missed_ones(chunks):
+    index = VectorIndex(dtype="float32")
+    vector_index.load_from_postgres(index, chunks, "v1")
+
+    # Recreated under new ids, as ProcessArticleEmbeddingsJob does, by a
+    # transaction stamped too long before it committed for the refresh to see
+    for chunk_id in (2, 3, 10):
+        del chunks.rows[chunk_id]
+    chunks.put(20, T0 - timedelta(minutes=5))
+    chunks.put(21, T0 - timedelta(minutes=5))
+    assert vector_index.refresh_from_postgres(index, chunks) == 0
+
+    removed, added = vector_index.reconcile_with_postgres(index, chunks, page_size=3)
+
+    assert (removed, added) == (3, 2)
+    assert index.chunk_ids().tolist() == [1, 4, 5, 6, 7, 8, 9, 20, 21]
+    assert index.reconciled_at is not None
+    assert vector_index.reconcile_with_postgres(index, chunks, page_size=3) == (0, 0)
+
+
+def test_reconcile_empties_the_index_when_every_chunk_is_gone(chunks):
+    index = VectorIndex(dtype="float32")
+    vector_index.load_from_postgres(index, chunks, "v1")
+    chunks.rows.clear()
+
+    assert vector_index.reconcile_with_postgres(index, chunks, page_size=4) == (10, 0)
+    assert len(index) == 0
+
+
+@pytest.fixture
+def sync_settings(chunks, tmp_path, monkeypatch):
+    settings = types.SimpleNamespace(
+        database_url="postgresql://test",
+        vector_index_snapshot_dir=str(tmp_path / "snapshots"),
+        vector_index_mmap=True,
+        vector_index_page_size=4,
+        vector_index_refresh_overlap=60.0,
+        vector_index_reconcile_interval=0.0,
+        vector_index_rebuild_interval=3600.0,
+    )
+    monkeypatch.setattr(vector_index, "get_settings", lambda: settings)
+    monkeypatch.setattr(vector_index, "HAS_PSYCOPG2", True)
+    monkeypatch.setattr(vector_index, "psycopg2", types.SimpleNamespace(connect=lambda url: chunks))
+    return settings
+
+
+def test_sync_builds_once_and_other_processes_load_the_snapshot(chunks, sync_settings):
+    first = VectorIndex(dtype="float32")
+    assert vector_index.sync_vector_index(first, "v1")["built"]
+    assert first.stats()["memory_mapped"]
+
+    second = VectorIndex(dtype="float32")
+    result = vector_index.sync_vector_index(second, "v1")
+    assert result["snapshot_loaded"] and not result["built"]
+    assert second.snapshot_path == first.snapshot_path
+    assert second.chunk_ids().tolist() == list(range(1, 11))
+
+
+def test_sync_rebuilds_and_resaves_when_due(chunks, sync_settings):
+    index = VectorIndex(dtype="float32")
+    vector_index.sync_vector_index(index, "v1")
+    first_snapshot = index.snapshot_path
+    del chunks.rows[5]
+
+    assert not vector_index.sync_vector_index(index, "v1")["built"]
+    assert 5 in index.chunk_ids()
+
+    index.built_at -= 3600
+    assert vector_index.sync_vector_index(index, "v1")["built"]
+    assert 5 not in index.chunk_ids()
+    assert index.snapshot_path != first_snapshot
+    assert vector_index.current_snapshot(sync_settings.vector_index_snapshot_dir) == index.snapshot_path
+
+
+def test_sync_reconciles_when_due(chunks, sync_settings):
+    sync_settings.vector_index_reconcile_interval = 600.0
+    index = VectorIndex(dtype="float32")
+    vector_index.sync_vector_index(index, "v1")
+    del chunks.rows[5]
+
+    index.reconciled_at -= 600
+    result = vector_index.sync_vector_index(index, "v1")
+    assert result["removed"] == 1 and not result["built"]
+    assert 5 not in index.chunk_ids()
@@ -0,0 +1,70 @@
+"""Startup warm-up retries and the readiness state."""
+
+import types
+
+import httpx
+import pytest
+
+from skytorch import warmup
+
+
+class FlakyClient:
+    """Fails ``failures`` session checks, then succeeds."""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    async def ensure_session(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise httpx.ConnectError("connection refused")
+
+
+@pytest.fixture
+def state(monkeypatch):
+    settings = types.SimpleNamespace(warmup_max_attempts=3, warmup_retry_backoff=0.01)
+    monkeypatch.setattr(warmup, "get_settings", lambda: settings)
+    fresh = warmup.WarmupState()
+    monkeypatch.setattr(warmup, "_warmup_state", fresh)
+    return fresh
+
+
+def _use_client(monkeypatch, client):
+    async def get_atproto_client():
+        return client
+
+    monkeypatch.setattr(warmup, "get_atproto_client", get_atproto_client)
+
+
+@pytest.mark.asyncio
+async def test_failed_login_is_retried_until_ready(state, monkeypatch):
+    client = FlakyClient(failures=1)
+    _use_client(monkeypatch, client)
+
+    await warmup.run_startup_warmup(login=True, load_models=False)
+
+    assert state.ready
+    assert state.attempts == 2
+    assert client.calls == 2
+    assert "atproto_login" in state.timings
+
+
+@pytest.mark.asyncio
+async def test_login_that_keeps_failing_marks_warmup_failed(state, monkeypatch):
+    _use_client(monkeypatch, FlakyClient(failures=10))
+
+    await warmup.run_startup_warmup(login=True, load_models=False)
+
+    assert state.failed
+    assert state.attempts == 3
+    assert "connection refused" in state.error
+
+
+@pytest.mark.asyncio
+async def test_no_credentials_skips_login(state, monkeypatch):
+    _use_client(monkeypatch, None)
+
+    await warmup.run_startup_warmup(login=True, load_models=False)
+
+    assert state.ready and state.attempts == 1